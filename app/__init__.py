@@ -1,65 +1,76 @@
+import atexit
+import functools
 import logging
+import threading
 from flask import Flask
 from .extensions import apifairy, ma, cache
-from .adapters.email import EmailNotificationAdapter
-from .adapters.slack import SlackNotificationAdapter
+from .adapters.dead_letter import InMemoryDeadLetterStore
+from .admission import AdmissionController
+from .reload import ConfigWatcher, RoutingReloader
+from .logs import (
+    add_request_id_header,
+    bind_request_id,
+    configure_logging,
+    unbind_request_id,
+)
+from .metrics import QueueDepthSampler
+from .readiness import ReadinessMonitor
+from .tracing import (
+    configure_tracing,
+    end_request_trace,
+    start_request_trace,
+    tag_response,
+)
+from .factories import (
+    build_idempotency_store,
+    build_message_broker,
+    build_notification_channels,
+    build_router,
+    build_status_store,
+    close_notification_channels,
+    configured_channel_names,
+    import_adapters,
+)
+from .use_cases.dispatch import QueuedAssistanceRequestDispatcher
 from .use_cases.handle_request import HandleAssistanceRequest
+from .use_cases.publish import PublishAssistanceRequest
 
 
 def create_app(config_name):
-    logging.basicConfig(
-        level=logging.INFO,
-        format="[%(asctime)s.%(msecs)03d] [%(levelname)s] [%(name)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
     app = Flask(__name__)
     app.config.from_object(config_name)
+    configure_logging(app.config)
+    configure_tracing(app.config)
 
     logging.getLogger(__name__).info(f"Flask app created with config: {config_name}")
 
-    email_adapter = EmailNotificationAdapter()
-    slack_token = app.config.get("SLACK_BOT_TOKEN")
-    slack_channel_id = app.config.get("SLACK_CHANNEL_ID")
+    app.router = build_router(app.config)
 
-    slack_adapter = None
-    if not slack_token:
-        logging.warning(
-            "SLACK_BOT_TOKEN not configured. Slack notifications will not be sent."
-        )
-    elif not slack_channel_id:
-        logging.warning(
-            "SLACK_CHANNEL_ID not configured. Slack notifications will not be sent."
-        )
-    else:
-        try:
-            slack_adapter = SlackNotificationAdapter(
-                token=slack_token, channel_id=slack_channel_id
-            )
-        except ValueError as e:
-            logging.error(f"Error initializing Slack adapter: {e}")
-        except Exception as e:
-            logging.error(
-                f"Unexpected error initializing Slack adapter: {e}", exc_info=True
-            )
+    if app.config.get("PREFORK"):
+        # Only what never changes is built here, so a preloading server
+        # shares it with its workers; threads and connections do not
+        # survive a fork and are started in each worker instead.
+        import_adapters(app.config)
+        lock = threading.Lock()
 
-    notification_channels = {
-        "sales": slack_adapter,
-        "pricing": email_adapter,
-    }
+        def start():
+            if hasattr(app, "assistance_request_handler"):
+                return
+            with lock:
+                if not hasattr(app, "assistance_request_handler"):
+                    _start(app)
 
-    active_channels = {
-        topic: adapter
-        for topic, adapter in notification_channels.items()
-        if adapter is not None
-    }
-
-    notification_channels = active_channels
-    assistance_request_handler = HandleAssistanceRequest(active_channels)
+        app.start = start
+        app.before_request(start)
+    else:
+        _start(app)
 
-    # Make the use case handler available
-    # Routes can access this via current_app.assistance_request_handler
-    app.assistance_request_handler = assistance_request_handler
+    app.before_request(bind_request_id)
+    app.before_request(start_request_trace)
+    app.after_request(add_request_id_header)
+    app.after_request(tag_response)
+    app.teardown_request(end_request_trace)
+    app.teardown_request(unbind_request_id)
 
     # Initialize extensions
     ma.init_app(app)  # Initialize Marshmallow before APIFairy
@@ -67,10 +78,169 @@ def create_app(config_name):
     cache.init_app(app)
 
     # Import and Register Blueprints
+    from .api import admin_bp
     from .api import health_bp
+    from .api import metrics_bp
     from .api import notify_bp
 
     app.register_blueprint(health_bp, url_prefix="/v1/health")
     app.register_blueprint(notify_bp, url_prefix="/v1/notify")
+    app.register_blueprint(admin_bp, url_prefix="/v1/admin")
+    app.register_blueprint(metrics_bp, url_prefix="/v1/metrics")
 
     return app
+
+
+def _start(app: Flask) -> None:
+    """Builds the channels, stores and dispatcher and starts their threads."""
+    dead_letters = InMemoryDeadLetterStore(app.config["DEAD_LETTER_MAX_ENTRIES"])
+    notification_channels = build_notification_channels(app.config, dead_letters)
+    # Registered first so it runs after the dispatcher has drained. The
+    # channels are looked up at exit since a reload may have replaced them.
+    atexit.register(lambda: close_notification_channels(app.notification_channels))
+    router = app.router
+    # Deliveries are only tracked when they happen in this process.
+    statuses = (
+        build_status_store(app.config)
+        if app.config.get("DISPATCH_MODE") != "broker"
+        else None
+    )
+    if statuses is not None:
+        atexit.register(statuses.close)
+    assistance_request_handler = HandleAssistanceRequest(
+        notification_channels,
+        router=router,
+        fan_out_workers=app.config["ROUTING_FAN_OUT_WORKERS"],
+        statuses=statuses,
+    )
+
+    def lane_depth(name):
+        # Looked up on every sample: a reload may have replaced the channel.
+        channel = app.notification_channels.get(name)
+        return channel.stats().get("queue_depth", 0) if channel else 0
+
+    queue_depths = {
+        f"lane:{name}": functools.partial(lane_depth, name)
+        for name, channel in notification_channels.items()
+        if "queue_depth" in channel.stats()
+    }
+    app.notification_channels = notification_channels
+    app.configured_channels = configured_channel_names(app.config)
+    saturation = {}
+
+    reload_path = app.config.get("CONFIG_RELOAD_PATH")
+    if reload_path:
+
+        def publish(channels, router):
+            app.notification_channels = channels
+            app.configured_channels = configured_channel_names(reloader.settings)
+            app.router = router
+
+        reloader = RoutingReloader(
+            assistance_request_handler,
+            app.config,
+            dead_letters,
+            drain_seconds=app.config["CONFIG_RELOAD_DRAIN_SECONDS"],
+            on_reload=publish,
+        )
+        watcher = ConfigWatcher(
+            reload_path, reloader.apply, app.config["CONFIG_RELOAD_INTERVAL"]
+        )
+        watcher.start()
+        watcher.install_signal_handler()
+        atexit.register(watcher.stop)
+        app.config_watcher = watcher
+
+    dispatcher = None
+    if app.config.get("DISPATCH_MODE") == "queue":
+        outbox_path = app.config.get("OUTBOX_PATH")
+        outbox = None
+        if outbox_path:
+            from .adapters.outbox import SQLiteOutbox
+
+            outbox = SQLiteOutbox(
+                outbox_path,
+                synchronous=app.config["OUTBOX_SYNC"],
+                lease_seconds=app.config["OUTBOX_LEASE_SECONDS"],
+            )
+        dispatcher = QueuedAssistanceRequestDispatcher(
+            assistance_request_handler,
+            workers=app.config["DISPATCH_WORKERS"],
+            queue_size=app.config["DISPATCH_QUEUE_SIZE"],
+            outbox=outbox,
+            lane_weights=app.config["DISPATCH_LANE_WEIGHTS"],
+            topic_priorities=app.config["TOPIC_PRIORITIES"],
+            strict_priority=app.config["DISPATCH_SCHEDULER"] == "strict",
+            replay_interval=app.config["OUTBOX_LEASE_SECONDS"],
+        )
+        dispatcher.start()
+        dispatcher.replay()
+        queue_depths["dispatch"] = lambda: dispatcher.queue_depth
+
+        def lane_fill(lane):
+            return dispatcher.lane_depth(lane), dispatcher.queue_size
+
+        for lane in app.config["DISPATCH_LANE_WEIGHTS"]:
+            queue_depths[f"dispatch:{lane}"] = functools.partial(
+                dispatcher.lane_depth, lane
+            )
+            saturation[f"dispatch:{lane}"] = functools.partial(lane_fill, lane)
+        atexit.register(
+            dispatcher.shutdown, timeout=app.config["DISPATCH_SHUTDOWN_TIMEOUT"]
+        )
+        assistance_request_handler = dispatcher
+    elif app.config.get("DISPATCH_MODE") == "broker":
+        broker = build_message_broker(app.config)
+        if app.config.get("BROKER_BACKEND") == "memory":
+            # Nothing outside this process can read an in-memory broker,
+            # so consume it here.
+            threading.Thread(
+                target=broker.consume,
+                args=(assistance_request_handler.execute,),
+                name="broker-consumer",
+                daemon=True,
+            ).start()
+            atexit.register(broker.stop)
+        atexit.register(broker.close)
+        assistance_request_handler = PublishAssistanceRequest(broker)
+
+    sampler = QueueDepthSampler(queue_depths, app.config["METRICS_SAMPLE_INTERVAL"])
+    sampler.start()
+    atexit.register(sampler.stop)
+
+    app.dead_letters = dead_letters
+    app.statuses = statuses
+    app.idempotency = build_idempotency_store(app.config)
+    app.admission = AdmissionController(
+        max_in_flight=app.config["ADMISSION_MAX_IN_FLIGHT"],
+        client_rate=app.config["CLIENT_RATE_LIMIT"],
+        client_burst=app.config["CLIENT_RATE_BURST"],
+        dispatcher=dispatcher,
+        lane_limit=int(
+            app.config["DISPATCH_QUEUE_SIZE"] * app.config["ADMISSION_LANE_THRESHOLD"]
+        ),
+        max_retry_after=app.config["ADMISSION_MAX_RETRY_AFTER"],
+    )
+    if app.admission.max_in_flight:
+        saturation["in_flight"] = lambda: (
+            app.admission.in_flight,
+            app.admission.max_in_flight,
+        )
+
+    # Answers GET /v1/health/ready from memory.
+    readiness = ReadinessMonitor(
+        lambda: app.notification_channels,
+        lambda: app.configured_channels,
+        saturation,
+        interval=app.config["READINESS_INTERVAL"],
+        probe_interval=app.config["READINESS_PROBE_INTERVAL"],
+        probe_ttl=app.config["READINESS_PROBE_TTL"],
+        max_utilization=app.config["READINESS_MAX_UTILIZATION"],
+    )
+    readiness.start()
+    atexit.register(readiness.stop)
+    app.readiness = readiness
+
+    # Make the use case handler available
+    # Routes can access this via current_app.assistance_request_handler
+    app.assistance_request_handler = assistance_request_handler
@@ -0,0 +1,15 @@
+import logging
+
+from app.ports.notification import AsyncNotificationChannel
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEmailNotificationAdapter(AsyncNotificationChannel):
+    """An asyncio notification channel that sends emails (mocked)."""
+
+    async def send(self, topic: str, message: str) -> None:
+        """Logs the notification message instead of sending an email."""
+        logger.info("[Mock Email] To: %s_channel@example.com", topic)
+        logger.info("[Mock Email] Subject: New Request - Topic: %s", topic)
+        logger.info("[Mock Email] Body: %s", message)
@@ -0,0 +1,91 @@
+import logging
+from typing import Optional
+
+import aiohttp
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from app.ports.notification import AsyncNotificationChannel, RateLimitedError
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSlackNotificationAdapter(AsyncNotificationChannel):
+    """Sends notifications to a Slack channel over a shared aiohttp session."""
+
+    def __init__(
+        self,
+        token: str,
+        channel_id: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_connections: int = 100,
+    ):
+        """Initializes the adapter with Slack token and channel ID.
+
+        Args:
+            token: The Slack Bot token.
+            channel_id: The ID of the target Slack channel.
+            session: Session to share with other clients, also settable
+                with ``use_session``. When omitted, the adapter opens its
+                own on first use and closes it in ``close``.
+            max_connections: Connection pool size of the adapter's own session.
+        """
+        if not token:
+            raise ValueError("Slack token cannot be empty.")
+        if not channel_id:
+            raise ValueError("Slack channel ID cannot be empty.")
+
+        self.token = token
+        self.channel_id = channel_id
+        self.max_connections = max_connections
+        self._session = session
+        self._owns_session = session is None
+        self._client: Optional[AsyncWebClient] = None
+        logger.info(
+            f"AsyncSlackNotificationAdapter initialized for channel {channel_id}"
+        )
+
+    @property
+    def client(self) -> AsyncWebClient:
+        # aiohttp sessions belong to an event loop, so the client is created
+        # on first use from inside the running loop.
+        if self._client is None:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.max_connections)
+                )
+            self._client = AsyncWebClient(token=self.token, session=self._session)
+        return self._client
+
+    def use_session(self, session: aiohttp.ClientSession) -> None:
+        """Sends through ``session``, owned and closed by the caller."""
+        self._session = session
+        self._owns_session = False
+        self._client = None
+
+    async def send(self, topic: str, message: str) -> None:
+        """Sends a message to the configured Slack channel."""
+        text = f"*New Assistance Request - Topic: {topic}*\n> {message}"
+        try:
+            await self.client.chat_postMessage(
+                channel=self.channel_id, text=text, mrkdwn=True
+            )
+            logger.info("Message sent to Slack channel %s", self.channel_id)
+        except SlackApiError as e:
+            if getattr(e.response, "status_code", None) == 429:
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                raise RateLimitedError(
+                    f"Slack rate limited channel {self.channel_id}", retry_after
+                ) from e
+            logger.error(
+                f"Error sending message to Slack channel {self.channel_id}: {e.response['error']}",
+                exc_info=True,
+            )
+            raise
+
+    async def close(self) -> None:
+        """Closes the adapter's own aiohttp session."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._client = None
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from app.ports.notification import NotificationChannel, RateLimitedError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a channel whose circuit is open."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        # Seconds until the circuit lets a probe call through; 0 when it
+        # already does and only the probe slots are taken.
+        self.retry_after = retry_after
+
+
+class CircuitBreakerNotificationChannel(NotificationChannel):
+    """Stops calling a failing channel until it has had time to recover.
+
+    Outcomes are tracked over a sliding time window. Once enough calls were
+    made and the failure rate crosses the threshold, the circuit opens and
+    sends fail immediately with ``CircuitOpenError``. After ``open_seconds``
+    a limited number of probe calls are let through (half-open); a success
+    closes the circuit, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        channel: NotificationChannel,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_seconds: float = 30.0,
+        open_seconds: float = 15.0,
+        half_open_max_calls: int = 1,
+        name: Optional[str] = None,
+    ):
+        """Initializes a closed circuit.
+
+        Args:
+            channel: The channel being protected.
+            failure_rate_threshold: Failure ratio (0-1) that opens the circuit.
+            minimum_calls: Calls in the window before the rate is evaluated.
+            window_seconds: Age of the oldest outcome taken into account.
+            open_seconds: Time the circuit stays open before probing.
+            half_open_max_calls: Concurrent probe calls while half-open.
+            name: Label used in logs.
+        """
+        if not 0 < failure_rate_threshold <= 1:
+            raise ValueError("Failure rate threshold must be between 0 and 1.")
+
+        self.channel = channel
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.name = name or type(channel).__name__
+
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: ``closed``, ``open`` or ``half_open``."""
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def send(self, topic: str, message: str) -> None:
+        """Sends through the wrapped channel unless the circuit is open."""
+        self._call(lambda: self.channel.send(topic=topic, message=message))
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Sends the batch through the wrapped channel unless the circuit is open."""
+        self._call(lambda: self.channel.send_batch(topic=topic, messages=messages))
+
+    def stats(self) -> Dict[str, Any]:
+        """Adds the circuit state and window failure rate to the channel stats."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            calls = len(self._outcomes)
+            stats = {
+                "circuit": self._current_state(now),
+                "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+                "rejected": self._rejected,
+            }
+        return {**self.channel.stats(), **stats}
+
+    def probe(self) -> None:
+        # Probes bypass the circuit: they are how an open one is noticed
+        # to be recovering.
+        self.channel.probe()
+
+    def close(self) -> None:
+        """Closes the wrapped channel."""
+        self.channel.close()
+
+    def _call(self, send: Callable[[], None]) -> None:
+        probe = self._before_call()
+        try:
+            send()
+        except RateLimitedError:
+            # Throttling means the service is up; it is not a failure.
+            self._after_call(probe, success=True)
+            raise
+        except Exception:
+            self._after_call(probe, success=False)
+            raise
+        self._after_call(probe, success=True)
+
+    def _current_state(self, now: float) -> str:
+        # Caller must hold the lock.
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+            logger.info(f"Circuit for {self.name} is half-open, probing")
+        return self._state
+
+    def _trim(self, now: float) -> None:
+        # Caller must hold the lock.
+        horizon = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < horizon:
+            _, success = self._outcomes.popleft()
+            if not success:
+                self._failures -= 1
+
+    def _before_call(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._rejected += 1
+            retry_after = max(0.0, self._opened_at + self.open_seconds - now)
+        raise CircuitOpenError(f"Circuit for {self.name} is open", retry_after)
+
+    def _after_call(self, probe: bool, success: bool) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if probe:
+                self._probes -= 1
+                if success:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self._failures = 0
+                    logger.info(f"Circuit for {self.name} closed after probe")
+                else:
+                    self._open(now)
+                return
+            if self._state != CLOSED:
+                return
+
+            self._outcomes.append((now, success))
+            if not success:
+                self._failures += 1
+            self._trim(now)
+            calls = len(self._outcomes)
+            if (
+                calls >= self.minimum_calls
+                and self._failures / calls >= self.failure_rate_threshold
+            ):
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        # Caller must hold the lock.
+        self._state = OPEN
+        self._opened_at = now
+        logger.warning(
+            f"Circuit for {self.name} opened for {self.open_seconds}s "
+            f"({self._failures}/{len(self._outcomes)} recent calls failed)"
+        )
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.ports.notification import NotificationChannel
+from app.tracking import Delivery, current_delivery, report_failed
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingNotificationChannel(NotificationChannel):
+    """Merges bursts of messages per topic into one ``send_batch`` call.
+
+    Messages are buffered until the topic's window expires or ``max_items``
+    messages are waiting, so the wrapped channel is called once per window
+    instead of once per message. The deliveries being tracked for the
+    buffered messages are merged, so the batch is reported for each.
+    """
+
+    def __init__(
+        self, channel: NotificationChannel, window_seconds: float, max_items: int = 20
+    ):
+        """Initializes the coalescing stage.
+
+        Args:
+            channel: The channel receiving the merged batches.
+            window_seconds: How long the first buffered message may wait.
+            max_items: Buffered messages that trigger an immediate flush.
+        """
+        if window_seconds <= 0:
+            raise ValueError("Coalescing window must be positive.")
+        if max_items < 1:
+            raise ValueError("Coalescing batch size must be positive.")
+
+        self.channel = channel
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self._buffers: Dict[str, List[str]] = {}
+        self._deliveries: Dict[str, List[Delivery]] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flusher = threading.Thread(
+            target=self._run, name="coalescing-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def send(self, topic: str, message: str) -> None:
+        """Buffers the message for the next batch of its topic."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Coalescing channel is closed.")
+            buffer = self._buffers.setdefault(topic, [])
+            buffer.append(message)
+            delivery = current_delivery.get()
+            if delivery is not None:
+                self._deliveries.setdefault(topic, []).append(delivery)
+            if len(buffer) == 1:
+                self._deadlines[topic] = time.monotonic() + self.window_seconds
+                self._condition.notify()
+            batch = self._take(topic) if len(buffer) >= self.max_items else None
+        if batch:
+            self._deliver(topic, *batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """Adds the number of buffered messages to the wrapped channel's stats."""
+        with self._condition:
+            buffered = sum(len(buffer) for buffer in self._buffers.values())
+        return {**self.channel.stats(), "buffered": buffered}
+
+    def probe(self) -> None:
+        self.channel.probe()
+
+    def close(self) -> None:
+        """Flushes every buffered message and stops the flusher thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._flusher.join()
+        self.channel.close()
+
+    def _take(self, topic: str) -> Optional[Tuple[List[str], List[Delivery]]]:
+        # Caller must hold the condition lock.
+        self._deadlines.pop(topic, None)
+        messages = self._buffers.pop(topic, None)
+        if messages is None:
+            return None
+        return messages, self._deliveries.pop(topic, [])
+
+    def _deliver(
+        self, topic: str, messages: List[str], deliveries: List[Delivery]
+    ) -> None:
+        merged = None
+        if deliveries:
+            first = deliveries[0]
+            merged = Delivery(
+                first.store,
+                tuple(rid for d in deliveries for rid in d.request_ids),
+                first.channel,
+            )
+        token = current_delivery.set(merged)
+        try:
+            self.channel.send_batch(topic=topic, messages=messages)
+            logger.info(
+                f"Delivered {len(messages)} coalesced messages for topic '{topic}' "
+                f"via {type(self.channel).__name__}"
+            )
+        except Exception as e:
+            report_failed(e)
+            logger.error(
+                f"Failed to deliver {len(messages)} coalesced messages for topic "
+                f"'{topic}': {e}",
+                exc_info=True,
+            )
+        finally:
+            current_delivery.reset(token)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    now = time.monotonic()
+                    due = [t for t, d in self._deadlines.items() if d <= now]
+                    if due:
+                        break
+                    timeout = (
+                        min(self._deadlines.values()) - now if self._deadlines else None
+                    )
+                    self._condition.wait(timeout)
+                if self._closed:
+                    due = list(self._buffers)
+                batches = [(topic, self._take(topic)) for topic in due]
+                closed = self._closed
+
+            for topic, batch in batches:
+                if batch:
+                    self._deliver(topic, *batch)
+            if closed:
+                return
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.ports.dead_letter import DeadLetter, DeadLetterStore
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryDeadLetterStore(DeadLetterStore):
+    """Keeps the most recent dead letters in memory, dropping the oldest."""
+
+    def __init__(self, max_entries: int = 10000):
+        """Initializes an empty store.
+
+        Args:
+            max_entries: Dead letters kept before the oldest are discarded.
+        """
+        self.max_entries = max_entries
+        self._letters: "OrderedDict[str, DeadLetter]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._letters)
+
+    def add(
+        self,
+        channel: str,
+        topic: str,
+        messages: Tuple[str, ...],
+        error: str,
+        attempts: int,
+    ) -> DeadLetter:
+        """Stores the failed messages, evicting the oldest letter when full."""
+        letter = DeadLetter(
+            letter_id=uuid.uuid4().hex,
+            channel=channel,
+            topic=topic,
+            messages=tuple(messages),
+            error=error,
+            attempts=attempts,
+            failed_at=time.time(),
+        )
+        with self._lock:
+            self._letters[letter.letter_id] = letter
+            while len(self._letters) > self.max_entries:
+                _, dropped = self._letters.popitem(last=False)
+                logger.warning(
+                    f"Dead-letter store full, discarding letter {dropped.letter_id}"
+                )
+        logger.error(
+            f"Dead-lettered {len(messages)} message(s) for topic '{topic}' via "
+            f"{channel} after {attempts} attempt(s): {error}"
+        )
+        return letter
+
+    def list(self, limit: int = 100) -> List[DeadLetter]:
+        """Returns up to ``limit`` letters, newest first."""
+        with self._lock:
+            letters = list(reversed(self._letters.values()))
+        return letters[:limit]
+
+    def get(self, letter_id: str) -> Optional[DeadLetter]:
+        """Returns the letter without removing it."""
+        return self._letters.get(letter_id)
+
+    def pop(self, letter_id: str) -> Optional[DeadLetter]:
+        """Removes the letter so it can be redriven."""
+        with self._lock:
+            return self._letters.pop(letter_id, None)
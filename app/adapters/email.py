@@ -10,6 +10,6 @@ class EmailNotificationAdapter(NotificationChannel):
 
     def send(self, topic: str, message: str) -> None:
         """Logs the notification message instead of sending an email."""
-        logger.info(f"[Mock Email] To: {topic}_channel@example.com")
-        logger.info(f"[Mock Email] Subject: New Request - Topic: {topic}")
-        logger.info(f"[Mock Email] Body: {message}")
+        logger.info("[Mock Email] To: %s_channel@example.com", topic)
+        logger.info("[Mock Email] Subject: New Request - Topic: %s", topic)
+        logger.info("[Mock Email] Body: %s", message)
@@ -0,0 +1,85 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from flask_caching import Cache
+
+from app.ports.idempotency import IdempotencyStore
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Bounded LRU of idempotency keys whose entries expire after their TTL."""
+
+    def __init__(self, max_entries: int = 100000):
+        """Initializes an empty store.
+
+        Args:
+            max_entries: Keys kept before the least recently used are evicted.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def claim(self, key: str, result: Any, ttl: float) -> Optional[Any]:
+        """Stores the result unless a live entry exists, which is returned instead."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            self._entries[key] = (now + ttl, result)
+            self._entries.move_to_end(key)
+            # Expired entries reach the front as they stop being used.
+            while self._entries:
+                oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+                if len(self._entries) <= self.max_entries and expires_at > now:
+                    break
+                del self._entries[oldest_key]
+        return None
+
+    def release(self, key: str) -> None:
+        """Removes the key if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class CacheIdempotencyStore(IdempotencyStore):
+    """Keeps idempotency keys in a Flask-Caching backend shared by all workers.
+
+    Use with a shared backend such as ``RedisCache`` so that a retry hitting
+    another worker process is still recognised.
+    """
+
+    def __init__(self, cache: Cache, prefix: str = "idempotency:"):
+        """Initializes the store.
+
+        Args:
+            cache: The initialized Flask-Caching instance.
+            prefix: Prepended to every key stored in the cache.
+        """
+        self.cache = cache
+        self.prefix = prefix
+
+    def claim(self, key: str, result: Any, ttl: float) -> Optional[Any]:
+        """Adds the key atomically; returns the stored result if it existed."""
+        cache_key = self.prefix + key
+        timeout = max(1, math.ceil(ttl))
+        for _ in range(2):
+            if self.cache.add(cache_key, result, timeout=timeout):
+                return None
+            existing = self.cache.get(cache_key)
+            if existing is not None:
+                return existing
+            # The entry expired between add and get; try to claim it again.
+        return None
+
+    def release(self, key: str) -> None:
+        """Deletes the key from the cache."""
+        self.cache.delete(self.prefix + key)
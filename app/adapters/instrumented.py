@@ -0,0 +1,81 @@
+import time
+from typing import Any, Dict, Sequence
+
+from prometheus_client import Histogram
+
+from app.metrics import SEND_FAILURES, SEND_SECONDS
+from app.ports.notification import NotificationChannel
+from app.tracing import span
+from app.tracking import report_sent
+
+
+class InstrumentedNotificationChannel(NotificationChannel):
+    """Records send latency and failures of the wrapped channel.
+
+    Labelled histogram children are looked up once per topic, so a send
+    costs two clock reads and one histogram update. Successful sends are
+    also reported to the delivery being tracked, if any, and timed as a
+    span of the current trace.
+    """
+
+    def __init__(self, channel: NotificationChannel):
+        """Initializes the wrapper.
+
+        Args:
+            channel: The adapter whose sends are measured.
+        """
+        self.channel = channel
+        self.adapter = type(channel).__name__
+        self._span_name = f"{self.adapter}.send"
+        self._histograms: Dict[str, Histogram] = {}
+
+    def send(self, topic: str, message: str) -> None:
+        """Sends through the wrapped channel and records the outcome."""
+        histogram = self._histogram(topic)
+        start = time.perf_counter()
+        try:
+            with span(self._span_name, topic=topic):
+                self.channel.send(topic=topic, message=message)
+        except Exception as e:
+            self._failed(topic, e)
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start)
+        report_sent()
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Sends the batch through the wrapped channel and records the outcome."""
+        histogram = self._histogram(topic)
+        start = time.perf_counter()
+        try:
+            with span(self._span_name, topic=topic, messages=len(messages)):
+                self.channel.send_batch(topic=topic, messages=messages)
+        except Exception as e:
+            self._failed(topic, e)
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start)
+        report_sent()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.channel.stats()
+
+    def probe(self) -> None:
+        self.channel.probe()
+
+    def close(self) -> None:
+        """Closes the wrapped channel."""
+        self.channel.close()
+
+    def _histogram(self, topic: str) -> Histogram:
+        histogram = self._histograms.get(topic)
+        if histogram is None:
+            histogram = self._histograms[topic] = SEND_SECONDS.labels(
+                topic=topic, adapter=self.adapter
+            )
+        return histogram
+
+    def _failed(self, topic: str, error: Exception) -> None:
+        SEND_FAILURES.labels(
+            topic=topic, adapter=self.adapter, error=type(error).__name__
+        ).inc()
@@ -0,0 +1,68 @@
+import logging
+import queue
+import threading
+from typing import Callable
+
+from app.domain.models import AssistanceRequest
+from app.ports.broker import MessageBroker
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryMessageBroker(MessageBroker):
+    """In-process broker for tests and local runs without RabbitMQ."""
+
+    def __init__(self, poll_interval: float = 0.1):
+        """Initializes an empty broker.
+
+        Args:
+            poll_interval: Seconds a consumer waits for a message before
+                checking whether it was asked to stop.
+        """
+        self.poll_interval = poll_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._stopping = threading.Event()
+        self.acked = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of published messages not yet consumed."""
+        return self._queue.qsize()
+
+    def publish(self, request: AssistanceRequest) -> None:
+        """Queues the request for the consumer."""
+        self._queue.put(request)
+
+    def consume(
+        self,
+        on_message: Callable[[AssistanceRequest], None],
+        prefetch_count: int = 50,
+        ack_batch_size: int = 25,
+    ) -> None:
+        """Delivers queued requests to ``on_message`` until stopped.
+
+        Messages are handed over one at a time, so ``prefetch_count`` and
+        ``ack_batch_size`` have no effect here.
+        """
+        self._stopping.clear()
+        while not self._stopping.is_set():
+            try:
+                request = self._queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+            try:
+                on_message(request)
+                self.acked += 1
+            except Exception as e:
+                logger.error(
+                    f"Failed to process message for topic '{request.topic}': {e}",
+                    exc_info=True,
+                )
+
+    def stop(self) -> None:
+        """Makes ``consume`` return once the current message is processed."""
+        self._stopping.set()
+
+    def close(self) -> None:
+        """Nothing to release for the in-memory broker."""
+        pass
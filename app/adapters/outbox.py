@@ -0,0 +1,240 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Optional, Sequence
+
+from app.domain.models import AssistanceRequest
+from app.ports.outbox import Outbox, OutboxEntry
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    acked_at REAL
+);
+CREATE TABLE IF NOT EXISTS outbox_owners (
+    owner TEXT PRIMARY KEY,
+    lease_until REAL NOT NULL
+);
+"""
+
+
+class _PendingAppend:
+    __slots__ = ("payload", "entry_id", "error")
+
+    def __init__(self, payload: str):
+        self.payload = payload
+        self.entry_id: Optional[int] = None
+        self.error: Optional[Exception] = None
+
+
+class SQLiteOutbox(Outbox):
+    """Append-only outbox stored in a SQLite database in WAL mode.
+
+    Appends use group commit: concurrent callers queue their entries and
+    whichever caller gets the write lock first commits all of them in one
+    transaction, so a single fsync covers the whole group. Acknowledgements
+    are buffered and written together with the next group.
+
+    Each open outbox owns the entries it appended under a random token and
+    holds a lease on that token, renewed from a thread. Entries whose
+    owner's lease expired (the process died) or was given up (it closed)
+    are claimed by the next ``claim_undelivered``, in one write transaction
+    so that two processes never claim the same entry.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        synchronous: str = "NORMAL",
+        ack_batch_size: int = 64,
+        compact_threshold: int = 1000,
+        lease_seconds: float = 30.0,
+    ):
+        """Opens (or creates) the outbox database.
+
+        Args:
+            path: Location of the SQLite database file.
+            synchronous: SQLite ``synchronous`` level. In WAL mode ``NORMAL``
+                survives a process crash, ``FULL`` also survives power loss
+                at the price of an fsync per group commit.
+            ack_batch_size: Buffered acknowledgements that force a write.
+            compact_threshold: Acknowledged entries that trigger compaction.
+            lease_seconds: Time after which the entries of a process that
+                stopped renewing its lease may be claimed by another.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ack_batch_size = ack_batch_size
+        self.compact_threshold = compact_threshold
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        if synchronous.upper() not in ("NORMAL", "FULL"):
+            raise ValueError("Outbox synchronous mode must be NORMAL or FULL.")
+        self._conn.execute(f"PRAGMA synchronous={synchronous.upper()}")
+        self._conn.executescript(_SCHEMA)
+
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._appends: List[_PendingAppend] = []
+        self._acks: List[int] = []
+        self._acked_since_compact = 0
+        self._renew()
+        self._closed = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._run_heartbeat, name="outbox-lease", daemon=True
+        )
+        self._heartbeat.start()
+        logger.info(f"Outbox opened at {path}")
+
+    def append(self, request: AssistanceRequest) -> int:
+        """Records the request, sharing the commit with concurrent callers."""
+        return self.append_many([request])[0]
+
+    def append_many(self, requests: Sequence[AssistanceRequest]) -> List[int]:
+        """Records all requests in the same group commit."""
+        batch = [_PendingAppend(json.dumps(request.to_dict())) for request in requests]
+        with self._pending_lock:
+            self._appends.extend(batch)
+        with self._write_lock:
+            if batch and batch[-1].entry_id is None and batch[-1].error is None:
+                self._flush()
+        for pending in batch:
+            if pending.error is not None:
+                raise pending.error
+        return [pending.entry_id for pending in batch]
+
+    def ack(self, entry_id: int) -> None:
+        """Buffers the acknowledgement; it is persisted with the next write."""
+        with self._pending_lock:
+            self._acks.append(entry_id)
+            should_flush = len(self._acks) >= self.ack_batch_size
+        if should_flush:
+            with self._write_lock:
+                self._flush()
+                if self._acked_since_compact >= self.compact_threshold:
+                    self._compact()
+
+    def claim_undelivered(self) -> List[OutboxEntry]:
+        """Takes over undelivered entries whose owner's lease has ended."""
+        with self._write_lock:
+            self._flush()
+            now = time.time()
+            # IMMEDIATE takes the write lock before reading the leases.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                claimed = self._conn.execute(
+                    "UPDATE outbox SET owner = ? WHERE acked_at IS NULL AND "
+                    "owner NOT IN "
+                    "(SELECT owner FROM outbox_owners WHERE lease_until > ?) "
+                    "RETURNING id, payload",
+                    (self.owner, now),
+                ).fetchall()
+                self._conn.execute(
+                    "DELETE FROM outbox_owners WHERE lease_until <= ?", (now,)
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+        return [
+            OutboxEntry(entry_id=entry_id, request=AssistanceRequest(**json.loads(p)))
+            for entry_id, p in sorted(claimed)
+        ]
+
+    def compact(self) -> int:
+        """Deletes acknowledged entries and truncates the write-ahead log."""
+        with self._write_lock:
+            self._flush()
+            return self._compact()
+
+    def close(self) -> None:
+        """Persists buffered acknowledgements, gives up the lease and closes.
+
+        Entries still unacknowledged become claimable by other processes.
+        """
+        self._closed.set()
+        self._heartbeat.join()
+        with self._write_lock:
+            self._flush()
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM outbox_owners WHERE owner = ?", (self.owner,)
+                )
+            self._conn.close()
+
+    def _renew(self) -> None:
+        with self._write_lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO outbox_owners (owner, lease_until) "
+                    "VALUES (?, ?)",
+                    (self.owner, time.time() + self.lease_seconds),
+                )
+
+    def _run_heartbeat(self) -> None:
+        while not self._closed.wait(self.lease_seconds / 3):
+            try:
+                self._renew()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to renew outbox lease: {e}", exc_info=True)
+
+    def _flush(self) -> None:
+        # Caller must hold the write lock.
+        with self._pending_lock:
+            appends, self._appends = self._appends, []
+            acks, self._acks = self._acks, []
+        if not appends and not acks:
+            return
+
+        now = time.time()
+        try:
+            with self._conn:
+                cursor = self._conn.cursor()
+                for pending in appends:
+                    cursor.execute(
+                        "INSERT INTO outbox (payload, owner, created_at) "
+                        "VALUES (?, ?, ?)",
+                        (pending.payload, self.owner, now),
+                    )
+                    pending.entry_id = cursor.lastrowid
+                if acks:
+                    cursor.executemany(
+                        "UPDATE outbox SET acked_at = ? WHERE id = ?",
+                        [(now, entry_id) for entry_id in acks],
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write to outbox {self.path}: {e}", exc_info=True)
+            for pending in appends:
+                pending.entry_id = None
+                pending.error = e
+            with self._pending_lock:
+                self._acks[:0] = acks
+            return
+
+        self._acked_since_compact += len(acks)
+
+    def _compact(self) -> int:
+        # Caller must hold the write lock.
+        with self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM outbox WHERE acked_at IS NOT NULL"
+            ).rowcount
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._acked_since_compact = 0
+        if removed:
+            logger.info(f"Compacted outbox: removed {removed} delivered entries")
+        return removed
@@ -0,0 +1,204 @@
+import json
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import pika
+from pika.exceptions import AMQPConnectionError, ChannelClosedByBroker
+
+from app.domain.models import AssistanceRequest
+from app.ports.broker import MessageBroker
+
+logger = logging.getLogger(__name__)
+
+
+class RabbitMQBroker(MessageBroker):
+    """Publishes and consumes assistance requests through a RabbitMQ queue."""
+
+    def __init__(
+        self,
+        url: str,
+        queue_name: str = "assistance_requests",
+        confirm_delivery: bool = True,
+        ack_flush_interval: float = 0.5,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        """Initializes the broker. Connections are opened lazily.
+
+        Args:
+            url: AMQP URL of the RabbitMQ server.
+            queue_name: Durable queue carrying the requests.
+            confirm_delivery: Wait for the broker to confirm each publish.
+            ack_flush_interval: Maximum seconds a processed message waits
+                for its batched acknowledgement.
+            reconnect_delay: Upper bound of the first wait before the
+                consumer reconnects; it doubles with each failed attempt.
+            max_reconnect_delay: Cap for the wait between two reconnections.
+        """
+        if not url:
+            raise ValueError("RabbitMQ URL cannot be empty.")
+
+        self.parameters = pika.URLParameters(url)
+        self.queue_name = queue_name
+        self.confirm_delivery = confirm_delivery
+        self.ack_flush_interval = ack_flush_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # BlockingConnection is not thread safe, so each publishing thread
+        # keeps its own connection.
+        self._local = threading.local()
+        self._stopping = threading.Event()
+
+    def _open_channel(self):
+        connection = pika.BlockingConnection(self.parameters)
+        channel = connection.channel()
+        channel.queue_declare(queue=self.queue_name, durable=True)
+        return connection, channel
+
+    def _publisher_channel(self):
+        channel = getattr(self._local, "channel", None)
+        if channel is None or channel.is_closed:
+            connection, channel = self._open_channel()
+            if self.confirm_delivery:
+                channel.confirm_delivery()
+            self._local.connection = connection
+            self._local.channel = channel
+        return channel
+
+    def publish(self, request: AssistanceRequest) -> None:
+        """Publishes the request as a persistent JSON message."""
+        body = json.dumps(request.to_dict()).encode()
+        properties = pika.BasicProperties(
+            content_type="application/json", delivery_mode=2
+        )
+        try:
+            self._publisher_channel().basic_publish(
+                exchange="",
+                routing_key=self.queue_name,
+                body=body,
+                properties=properties,
+            )
+        except AMQPConnectionError:
+            # The cached connection may have been dropped; retry once on a new one.
+            self._local.channel = None
+            self._publisher_channel().basic_publish(
+                exchange="",
+                routing_key=self.queue_name,
+                body=body,
+                properties=properties,
+            )
+
+    def consume(
+        self,
+        on_message: Callable[[AssistanceRequest], None],
+        prefetch_count: int = 50,
+        ack_batch_size: int = 25,
+    ) -> None:
+        """Consumes requests, acknowledging them in batches, until ``stop``.
+
+        A lost connection is reopened with jittered exponential backoff.
+        The broker redelivers what it had not received an acknowledgement
+        for, including messages processed since the last batched ack.
+        """
+        # The broker stops delivering once prefetch_count messages are unacked,
+        # so a larger batch would never fill up.
+        ack_batch_size = max(1, min(ack_batch_size, prefetch_count))
+        self._stopping.clear()
+        delay = self.reconnect_delay
+        while not self._stopping.is_set():
+            try:
+                connection, channel = self._open_channel()
+            except AMQPConnectionError as e:
+                wait = random.uniform(0, delay)
+                logger.warning(
+                    f"Cannot connect to RabbitMQ: {e}; retrying in {wait:.1f}s"
+                )
+                self._stopping.wait(wait)
+                delay = min(self.max_reconnect_delay, delay * 2)
+                continue
+
+            delay = self.reconnect_delay
+            try:
+                self._consume(
+                    connection, channel, on_message, prefetch_count, ack_batch_size
+                )
+            except (AMQPConnectionError, ChannelClosedByBroker) as e:
+                logger.warning(f"Lost connection to RabbitMQ: {e}; reconnecting")
+            finally:
+                if connection.is_open:
+                    connection.close()
+
+    def _consume(
+        self,
+        connection,
+        channel,
+        on_message: Callable[[AssistanceRequest], None],
+        prefetch_count: int,
+        ack_batch_size: int,
+    ) -> None:
+        channel.basic_qos(prefetch_count=prefetch_count)
+
+        unacked = 0
+        last_tag: Optional[int] = None
+        last_flush = time.monotonic()
+
+        def flush_acks():
+            nonlocal unacked, last_tag, last_flush
+            if last_tag is not None:
+                channel.basic_ack(delivery_tag=last_tag, multiple=True)
+            unacked = 0
+            last_tag = None
+            last_flush = time.monotonic()
+
+        def handle(ch, method, properties, body):
+            nonlocal unacked, last_tag
+            try:
+                request = AssistanceRequest(**json.loads(body))
+            except (ValueError, TypeError) as e:
+                logger.error(f"Discarding malformed broker message: {e}")
+                ch.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+                return
+
+            try:
+                on_message(request)
+            except Exception as e:
+                logger.error(
+                    f"Failed to process message for topic '{request.topic}': {e}",
+                    exc_info=True,
+                )
+                ch.basic_nack(
+                    delivery_tag=method.delivery_tag, requeue=not method.redelivered
+                )
+                return
+
+            unacked += 1
+            last_tag = method.delivery_tag
+            if unacked >= ack_batch_size:
+                flush_acks()
+
+        channel.basic_consume(queue=self.queue_name, on_message_callback=handle)
+        logger.info(
+            f"Consuming from '{self.queue_name}' (prefetch {prefetch_count}, "
+            f"ack batch {ack_batch_size})"
+        )
+
+        while not self._stopping.is_set():
+            connection.process_data_events(time_limit=self.ack_flush_interval)
+            if time.monotonic() - last_flush >= self.ack_flush_interval:
+                flush_acks()
+        flush_acks()
+
+    def stop(self) -> None:
+        """Makes ``consume`` return after acknowledging processed messages."""
+        self._stopping.set()
+
+    def close(self) -> None:
+        """Closes the publishing connection of the calling thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and connection.is_open:
+            connection.close()
+        self._local.channel = None
+        self._local.connection = None
@@ -0,0 +1,298 @@
+import contextvars
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from app.ports.notification import NotificationChannel, RateLimitedError
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initializes a full bucket.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum number of tokens, i.e. the allowed burst.
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive.")
+        if capacity < 1:
+            raise ValueError("Token bucket capacity must be at least 1.")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Takes tokens if available.
+
+        Returns:
+            0 if the tokens were taken, otherwise the seconds until they will be.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def take(self, tokens: float) -> None:
+        """Takes tokens even if that leaves the bucket in debt.
+
+        Later acquisitions wait until the debt is refilled.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blocks until the tokens are taken and returns the time waited."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+class RateLimitedNotificationChannel(NotificationChannel):
+    """Paces sends to a channel through its own lane and token bucket.
+
+    ``send`` queues the message and returns; a lane thread sends queued
+    messages no faster than the bucket allows. When the channel reports
+    ``RateLimitedError`` the lane pauses for the requested time and then
+    retries the same message, so rate limiting never drops a message.
+    """
+
+    def __init__(
+        self,
+        channel: NotificationChannel,
+        rate: float,
+        burst: float = 1,
+        max_queue: int = 10000,
+        name: Optional[str] = None,
+    ):
+        """Initializes the lane and starts its thread.
+
+        Args:
+            channel: The channel receiving the paced sends.
+            rate: Sends per second allowed on this lane.
+            burst: Sends allowed back to back after an idle period.
+            max_queue: Messages that may wait in the lane before ``send`` blocks.
+            name: Label used in logs and the lane thread name.
+        """
+        self.channel = channel
+        self.name = name or type(channel).__name__
+        # Replaced by another lane's bucket when both pace the same API.
+        self.bucket = TokenBucket(rate=rate, capacity=burst)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._paused_until = 0.0
+        self._last_wait = 0.0
+        self._average_wait = 0.0
+        self._sent = 0
+        self._rate_limited = 0
+        self._closing = False
+        self._lane = threading.Thread(
+            target=self._run, name=f"rate-limit-{self.name}", daemon=True
+        )
+        self._lane.start()
+
+    def send(self, topic: str, message: str) -> None:
+        """Queues the message on the lane."""
+        context = contextvars.copy_context()
+        self._queue.put(
+            (
+                lambda: context.run(self.channel.send, topic=topic, message=message),
+                topic,
+                time.monotonic(),
+            )
+        )
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Queues the batch on the lane; it uses a single token."""
+        messages = list(messages)
+        context = contextvars.copy_context()
+        self._queue.put(
+            (
+                lambda: context.run(
+                    self.channel.send_batch, topic=topic, messages=messages
+                ),
+                topic,
+                time.monotonic(),
+            )
+        )
+
+    def submit(self, topic: str, send: Callable[[], None]) -> None:
+        """Queues a send prepared by the caller, paced like the lane's own.
+
+        Used by the retry layer below the lane so that retries share the
+        token bucket and rate-limit pauses with first attempts; ``send``
+        may raise ``RateLimitedError`` to pause the lane.
+
+        Raises:
+            RuntimeError: If the lane is closing.
+        """
+        if self._closing:
+            raise RuntimeError(f"Lane {self.name} is closed.")
+        context = contextvars.copy_context()
+        self._queue.put((lambda: context.run(send), topic, time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Reports lane depth, waiting time and rate-limit pauses."""
+        return {
+            **self.channel.stats(),
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "last_wait_seconds": round(self._last_wait, 3),
+            "average_wait_seconds": round(self._average_wait, 3),
+            "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "sent": self._sent,
+            "rate_limited": self._rate_limited,
+        }
+
+    def probe(self) -> None:
+        self.channel.probe()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Sends what is still queued (up to ``timeout``) and stops the lane."""
+        self._closing = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._lane.join(timeout)
+        if self._lane.is_alive():
+            logger.warning(
+                f"Rate-limited lane {self.name} closed with "
+                f"{self._queue.qsize()} messages pending"
+            )
+        self.channel.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                # Retries submitted just before the lane closed.
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                self._queue.put(_STOP)
+            send, topic, enqueued_at = item
+            self._deliver(send, topic, enqueued_at)
+
+    def _deliver(
+        self, send: Callable[[], None], topic: str, enqueued_at: float
+    ) -> None:
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            self.bucket.acquire()
+
+            wait = time.monotonic() - enqueued_at
+            self._last_wait = wait
+            self._average_wait += 0.1 * (wait - self._average_wait)
+            try:
+                send()
+                self._sent += 1
+                return
+            except RateLimitedError as e:
+                self._rate_limited += 1
+                self._paused_until = time.monotonic() + e.retry_after
+                logger.warning(
+                    f"Lane {self.name} paused for {e.retry_after}s after rate limit"
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to send message for topic '{topic}' on lane "
+                    f"{self.name}: {e}",
+                    exc_info=True,
+                )
+                return
+
+
+class PacedNotificationChannel(NotificationChannel):
+    """Paces sends to a channel in the caller's thread.
+
+    Unlike the lane of ``RateLimitedNotificationChannel``, ``send`` only
+    returns once the message was sent, so callers know the outcome. When
+    the channel reports ``RateLimitedError`` the caller sleeps for the
+    requested time and sends the same message again.
+    """
+
+    def __init__(
+        self,
+        channel: NotificationChannel,
+        rate: float = 0.0,
+        burst: float = 1,
+        name: Optional[str] = None,
+    ):
+        """Initializes the pacing.
+
+        Args:
+            channel: The channel receiving the paced sends.
+            rate: Sends per second allowed; 0 only honours rate limits
+                reported by the channel.
+            burst: Sends allowed back to back after an idle period.
+            name: Label used in logs.
+        """
+        self.channel = channel
+        self.name = name or type(channel).__name__
+        self.bucket = TokenBucket(rate=rate, capacity=burst) if rate > 0 else None
+        self._paused_until = 0.0
+        self._rate_limited = 0
+
+    def send(self, topic: str, message: str) -> None:
+        self._pace(lambda: self.channel.send(topic=topic, message=message))
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Sends the batch; it uses a single token."""
+        self._pace(lambda: self.channel.send_batch(topic=topic, messages=messages))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.channel.stats(), "rate_limited": self._rate_limited}
+
+    def probe(self) -> None:
+        self.channel.probe()
+
+    def close(self) -> None:
+        self.channel.close()
+
+    def _pace(self, send: Callable[[], None]) -> None:
+        while True:
+            # Shared by every caller, so one rate limit pauses them all.
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                send()
+                return
+            except RateLimitedError as e:
+                self._rate_limited += 1
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + e.retry_after
+                )
+                logger.warning(
+                    f"{self.name} paused for {e.retry_after}s after rate limit"
+                )
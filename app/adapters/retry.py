@@ -0,0 +1,418 @@
+import contextvars
+import functools
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.adapters.circuit_breaker import CircuitOpenError
+from app.ports.dead_letter import DeadLetterStore
+from app.ports.notification import (
+    NotificationChannel,
+    PartialDeliveryError,
+    RateLimitedError,
+)
+from app.tracking import report_failed, report_retrying
+
+logger = logging.getLogger(__name__)
+
+_FATAL_ERRORS = (ValueError, TypeError, KeyError)
+
+
+def default_is_retryable(error: Exception) -> bool:
+    """Treats programming and input errors as fatal and everything else as transient."""
+    return not isinstance(error, _FATAL_ERRORS)
+
+
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter."""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        is_retryable: Callable[[Exception], bool] = default_is_retryable,
+        max_wait: float = 300.0,
+    ):
+        """Initializes the policy.
+
+        Args:
+            max_attempts: Total attempts, including the first one.
+            base_delay: Upper bound of the delay before the first retry.
+            max_delay: Cap for the delay between two attempts.
+            is_retryable: Tells transient errors from fatal ones.
+            max_wait: Total seconds a message may wait for open circuits
+                and rate limits, which spend no attempt, before it is
+                dead-lettered.
+        """
+        if max_attempts < 1:
+            raise ValueError("Retry policy needs at least one attempt.")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.is_retryable = is_retryable
+        self.max_wait = max_wait
+
+    def delay(self, attempt: int) -> float:
+        """Returns the jittered delay to wait after the given failed attempt."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class RetryScheduler:
+    """Fires delayed retries from a single timer thread.
+
+    The scheduler is shared by the channels built together. Tasks should
+    only hand the retry off, so that a slow channel cannot hold up the
+    retries of the others. Each channel ``attach``es on creation and, when
+    closed, ``cancel``s its own pending retries and ``release``s the
+    scheduler, which stops with the last one.
+    """
+
+    def __init__(self):
+        self._heap: List[
+            Tuple[float, int, Callable[[], None], Callable[[], None], object]
+        ] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._users = 0
+        self._thread = threading.Thread(
+            target=self._run, name="retry-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of retries waiting to run."""
+        return len(self._heap)
+
+    def attach(self) -> None:
+        """Registers a channel, which must ``release`` the scheduler when closed."""
+        with self._condition:
+            self._users += 1
+
+    def release(self) -> None:
+        """Stops the scheduler once the last channel released it."""
+        with self._condition:
+            self._users -= 1
+            last = self._users <= 0
+        if last:
+            self.close()
+
+    def schedule(
+        self,
+        delay: float,
+        task: Callable[[], None],
+        on_cancel: Callable[[], None],
+        owner: object = None,
+    ) -> None:
+        """Runs ``task`` after ``delay`` seconds, or ``on_cancel`` if cancelled.
+
+        Args:
+            delay: Seconds to wait.
+            task: Runs on the timer thread and must return quickly.
+            on_cancel: Runs instead when the retry is cancelled.
+            owner: The retries of an owner can be cancelled together.
+        """
+        context = contextvars.copy_context()
+        task = functools.partial(context.run, task)
+        on_cancel = functools.partial(context.run, on_cancel)
+        with self._condition:
+            if self._closed:
+                on_cancel()
+                return
+            heapq.heappush(
+                self._heap,
+                (time.monotonic() + delay, next(self._counter), task, on_cancel, owner),
+            )
+            self._condition.notify()
+
+    def cancel(self, owner: object) -> None:
+        """Cancels the pending retries of ``owner``, running their ``on_cancel``."""
+        with self._condition:
+            cancelled = [entry for entry in self._heap if entry[4] is owner]
+            if not cancelled:
+                return
+            self._heap = [entry for entry in self._heap if entry[4] is not owner]
+            heapq.heapify(self._heap)
+            self._condition.notify()
+        for _, _, _, on_cancel, _ in cancelled:
+            on_cancel()
+
+    def close(self) -> None:
+        """Stops the scheduler and cancels every pending retry."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            cancelled, self._heap = self._heap, []
+            self._condition.notify()
+        for _, _, _, on_cancel, _ in cancelled:
+            on_cancel()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._heap and self._heap[0][0] <= time.monotonic():
+                        break
+                    timeout = (
+                        self._heap[0][0] - time.monotonic() if self._heap else None
+                    )
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+                _, _, task, _, _ = heapq.heappop(self._heap)
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Scheduled retry failed unexpectedly: {e}", exc_info=True)
+
+
+class RetryingNotificationChannel(NotificationChannel):
+    """Retries failed sends in the background and dead-letters what cannot be sent.
+
+    The first attempt runs in the caller. Transient failures are retried in
+    the background, so callers never wait for backoff: the scheduler times
+    the retries and hands each one to this channel's own retry thread.
+    Fatal failures, and messages that run out of attempts, go to the
+    dead-letter store. A send rejected by an open circuit is retried once
+    the circuit lets calls through again, without spending an attempt but
+    for at most the policy's ``max_wait`` in total.
+    When a batch fails with ``PartialDeliveryError`` only its undelivered
+    messages are retried. A send rejected with ``RateLimitedError`` is
+    retried after its ``retry_after`` the same way, unless a rate-limited
+    lane sits above this channel: set ``resubmit`` to that lane's
+    ``submit`` so that the lane handles rate limits and retries are paced
+    with the first attempts instead of bypassing it.
+    """
+
+    def __init__(
+        self,
+        channel: NotificationChannel,
+        policy: RetryPolicy,
+        scheduler: RetryScheduler,
+        dead_letters: DeadLetterStore,
+        name: Optional[str] = None,
+    ):
+        """Initializes the retry layer.
+
+        Args:
+            channel: The channel whose sends are retried.
+            policy: Backoff and classification rules.
+            scheduler: Runs the delayed retries.
+            dead_letters: Receives messages that cannot be delivered.
+            name: Channel label stored with dead letters.
+        """
+        self.channel = channel
+        self.policy = policy
+        self.scheduler = scheduler
+        self.dead_letters = dead_letters
+        self.name = name or type(channel).__name__
+        # Queues a retry on the rate-limited lane above; see the class doc.
+        self.resubmit: Optional[Callable[[str, Callable[[], None]], None]] = None
+        # Takes over the retries still pending on close, e.g. the channel
+        # replacing this one after a reload; they are dead-lettered if None.
+        self.successor: Optional[NotificationChannel] = None
+        self._retrying = 0
+        self._dead_lettered = 0
+        self._retries = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"retry-{self.name}"
+        )
+        scheduler.attach()
+
+    def send(self, topic: str, message: str) -> None:
+        """Sends the message, scheduling retries if it fails."""
+        self._attempt(topic, (message,), 1)
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Sends the batch, retrying and dead-lettering what it did not deliver."""
+        self._attempt(topic, tuple(messages), 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Adds retry and dead-letter counters to the wrapped channel's stats."""
+        return {
+            **self.channel.stats(),
+            "retrying": self._retrying,
+            "dead_lettered": self._dead_lettered,
+        }
+
+    def probe(self) -> None:
+        self.channel.probe()
+
+    def close(self) -> None:
+        """Passes on this channel's pending retries and closes the channel.
+
+        Pending retries go to ``successor`` if set, else to the dead-letter
+        store. Retries already handed off finish first; the retries of
+        other channels sharing the scheduler are left alone.
+        """
+        self.scheduler.cancel(self)
+        self._retries.shutdown(wait=True)
+        # Retries that failed again while shutting down were rescheduled.
+        self.scheduler.cancel(self)
+        self.scheduler.release()
+        self.channel.close()
+
+    def _attempt(
+        self,
+        topic: str,
+        messages: Tuple[str, ...],
+        attempt: int,
+        waited: float = 0.0,
+    ) -> None:
+        try:
+            if len(messages) == 1:
+                self.channel.send(topic=topic, message=messages[0])
+            else:
+                self.channel.send_batch(topic=topic, messages=list(messages))
+        except RateLimitedError as e:
+            if self.resubmit is not None:
+                # The lane above pauses and sends the message again.
+                raise
+            self._wait(topic, messages, e, attempt, waited)
+        except Exception as e:
+            error = e
+            if isinstance(error, PartialDeliveryError):
+                # The first messages were delivered: only the rest is retried.
+                messages, error = error.remaining, error.error
+            if isinstance(error, (CircuitOpenError, RateLimitedError)):
+                self._wait(topic, messages, error, attempt, waited)
+                return
+            if not self.policy.is_retryable(error):
+                self._dead_letter(topic, messages, error, attempt)
+                return
+            if attempt >= self.policy.max_attempts:
+                self._dead_letter(topic, messages, error, attempt)
+                return
+
+            delay = self.policy.delay(attempt)
+            logger.warning(
+                f"Attempt {attempt} for topic '{topic}' via {self.name} failed: "
+                f"{error}; retrying in {delay:.2f}s"
+            )
+            self._retrying += 1
+            report_retrying(error)
+            self.scheduler.schedule(
+                delay,
+                lambda: self._due(topic, messages, error, attempt + 1, waited),
+                lambda: self._cancel(topic, messages, error, attempt),
+                owner=self,
+            )
+
+    def _wait(
+        self,
+        topic: str,
+        messages: Tuple[str, ...],
+        error: Union[CircuitOpenError, RateLimitedError],
+        attempt: int,
+        waited: float,
+    ) -> None:
+        # Nothing was sent: an open circuit or a rate limit only says when to
+        # come back, so waiting for it does not spend an attempt. Burning
+        # attempts would dead-letter the message before the channel recovers;
+        # max_wait still bounds how long a long outage holds it.
+        delay = error.retry_after + random.uniform(0, self.policy.base_delay)
+        if waited + delay > self.policy.max_wait:
+            self._dead_letter(topic, messages, error, attempt - 1)
+            return
+        logger.info(
+            "%s via %s; retrying topic '%s' in %.2fs",
+            type(error).__name__,
+            self.name,
+            topic,
+            delay,
+        )
+        self._retrying += 1
+        report_retrying(error)
+        self.scheduler.schedule(
+            delay,
+            lambda: self._due(topic, messages, error, attempt, waited + delay),
+            lambda: self._cancel(topic, messages, error, attempt - 1),
+            owner=self,
+        )
+
+    def _due(
+        self,
+        topic: str,
+        messages: Tuple[str, ...],
+        error: Exception,
+        attempt: int,
+        waited: float,
+    ) -> None:
+        # On the scheduler's thread, shared by every channel: only hand off.
+        self._retrying -= 1
+        try:
+            self._retries.submit(
+                contextvars.copy_context().run,
+                self._retry,
+                topic,
+                messages,
+                attempt,
+                waited,
+            )
+        except RuntimeError:
+            # Closed while the retry was due.
+            self._abandon(topic, messages, error, attempt - 1)
+
+    def _retry(
+        self, topic: str, messages: Tuple[str, ...], attempt: int, waited: float
+    ) -> None:
+        if self.resubmit is not None:
+            try:
+                # The lane waits for a token and handles rate limits.
+                self.resubmit(
+                    topic,
+                    functools.partial(self._attempt, topic, messages, attempt, waited),
+                )
+                return
+            except RuntimeError:
+                # The lane is closing: send from here.
+                pass
+        try:
+            self._attempt(topic, messages, attempt, waited)
+        except RateLimitedError as e:
+            # Nobody upstream is waiting for this retry, so honour the delay
+            # here without spending an attempt.
+            self._wait(topic, messages, e, attempt, waited)
+
+    def _cancel(
+        self, topic: str, messages: Tuple[str, ...], error: Exception, attempt: int
+    ) -> None:
+        self._retrying -= 1
+        self._abandon(topic, messages, error, attempt)
+
+    def _abandon(
+        self, topic: str, messages: Tuple[str, ...], error: Exception, attempts: int
+    ) -> None:
+        if self.successor is not None:
+            try:
+                if len(messages) == 1:
+                    self.successor.send(topic=topic, message=messages[0])
+                else:
+                    self.successor.send_batch(topic=topic, messages=list(messages))
+                return
+            except Exception as e:
+                logger.error(f"{self.name} could not hand over a retry: {e}")
+        self._dead_letter(topic, messages, error, attempts)
+
+    def _dead_letter(
+        self, topic: str, messages: Tuple[str, ...], error: Exception, attempts: int
+    ) -> None:
+        self._dead_lettered += 1
+        report_failed(error)
+        self.dead_letters.add(
+            channel=self.name,
+            topic=topic,
+            messages=messages,
+            error=f"{type(error).__name__}: {error}",
+            attempts=attempts,
+        )
@@ -1,14 +1,45 @@
 import logging
+import threading
+from typing import Optional, Sequence
+
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
-from app.ports.notification import NotificationChannel
+from app.adapters.retry import default_is_retryable
+from app.ports.notification import NotificationChannel, RateLimitedError
 
 logger = logging.getLogger(__name__)
 
+# Slack error codes that will fail again no matter how often they are retried.
+FATAL_SLACK_ERRORS = frozenset(
+    {
+        "account_inactive",
+        "channel_not_found",
+        "invalid_auth",
+        "invalid_arguments",
+        "is_archived",
+        "msg_too_long",
+        "no_text",
+        "not_authed",
+        "not_in_channel",
+        "token_revoked",
+    }
+)
+
+
+def is_retryable_slack_error(error: Exception) -> bool:
+    """Tells transient Slack failures from configuration or payload errors."""
+    if isinstance(error, SlackApiError):
+        return error.response.get("error") not in FATAL_SLACK_ERRORS
+    return default_is_retryable(error)
+
 
 class SlackNotificationAdapter(NotificationChannel):
-    """Sends notifications to a specified Slack channel."""
+    """Sends notifications to a specified Slack channel.
+
+    The Web API client is created on the first send, so an adapter built
+    before a server forks its workers opens nothing the workers would share.
+    """
 
     def __init__(self, token: str, channel_id: str):
         """Initializes the adapter with Slack token and channel ID.
@@ -22,19 +53,63 @@ class SlackNotificationAdapter(NotificationChannel):
         if not channel_id:
             raise ValueError("Slack channel ID cannot be empty.")
 
-        self.client = WebClient(token=token)
+        self.token = token
         self.channel_id = channel_id
+        self._client: Optional[WebClient] = None
+        self._client_lock = threading.Lock()
         logger.info(f"SlackNotificationAdapter initialized for channel {channel_id}")
 
+    @property
+    def client(self) -> WebClient:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = WebClient(token=self.token)
+        return self._client
+
     def send(self, topic: str, message: str) -> None:
         """Sends a message to the configured Slack channel."""
+        text = f"*New Assistance Request - Topic: {topic}*\n> {message}"
+        self._post(text)
+        logger.info("Message sent to Slack channel %s", self.channel_id)
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Sends the messages as one numbered digest message."""
+        if len(messages) == 1:
+            self.send(topic=topic, message=messages[0])
+            return
+
+        lines = [f"*{len(messages)} New Assistance Requests - Topic: {topic}*"]
+        lines.extend(
+            f"> {index}. {message}" for index, message in enumerate(messages, 1)
+        )
+        response = self._post("\n".join(lines))
+        logger.info(
+            "Digest of %d messages sent to Slack channel %s (ts=%s)",
+            len(messages),
+            self.channel_id,
+            response.get("ts"),
+        )
+
+    def probe(self) -> None:
+        """Checks the token with ``auth.test``, which posts nothing."""
+        self.client.auth_test()
+
+    def _post(self, text: str):
         try:
-            text = f"*New Assistance Request - Topic: {topic}*\n> {message}"
-            response = self.client.chat_postMessage(
+            return self.client.chat_postMessage(
                 channel=self.channel_id, text=text, mrkdwn=True
             )
-            logger.info(f"Message sent to Slack channel {self.channel_id}")
         except SlackApiError as e:
+            if getattr(e.response, "status_code", None) == 429:
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                logger.warning(
+                    f"Slack rate limited channel {self.channel_id}, "
+                    f"retry after {retry_after}s"
+                )
+                raise RateLimitedError(
+                    f"Slack rate limited channel {self.channel_id}", retry_after
+                ) from e
             logger.error(
                 f"Error sending message to Slack channel {self.channel_id}: {e.response['error']}",
                 exc_info=True,
@@ -0,0 +1,291 @@
+import logging
+import queue
+import smtplib
+import ssl
+import threading
+import time
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.adapters.retry import default_is_retryable
+from app.ports.notification import NotificationChannel, PartialDeliveryError
+
+logger = logging.getLogger(__name__)
+
+# Raised for bad credentials or addresses; retrying will not help.
+_FATAL_SMTP_ERRORS = (
+    smtplib.SMTPAuthenticationError,
+    smtplib.SMTPNotSupportedError,
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+)
+
+
+def is_retryable_smtp_error(error: Exception) -> bool:
+    """Treats 4xx replies and connection errors as transient, 5xx as fatal."""
+    if isinstance(error, _FATAL_SMTP_ERRORS):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code < 500
+    return default_is_retryable(error)
+
+
+class _DataTracking:
+    """Records whether DATA was sent, after which the server may hold the message."""
+
+    data_sent = False
+
+    def data(self, msg):
+        self.data_sent = True
+        return super().data(msg)
+
+
+class _SMTP(_DataTracking, smtplib.SMTP):
+    pass
+
+
+class _SMTP_SSL(_DataTracking, smtplib.SMTP_SSL):
+    pass
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages = 0
+
+
+class SMTPNotificationAdapter(NotificationChannel):
+    """Sends notifications by email over a pool of persistent SMTP sessions.
+
+    Connections are opened (and upgraded with STARTTLS and authenticated)
+    once and reused for later sends, so a message costs one MAIL/RCPT/DATA
+    exchange instead of a full TCP, TLS and AUTH handshake. ``send_batch``
+    sends all its messages over a single session and, when one fails,
+    raises ``PartialDeliveryError`` with the messages from there on. A
+    connection that drops before the message's DATA command (a pooled
+    session closed by the server) is discarded and the message is sent
+    once more on a fresh one; after DATA the server may already have
+    accepted it, so the error is raised for the retry layer instead.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        sender: str,
+        recipient: str = "{topic}_channel@example.com",
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        use_ssl: bool = False,
+        pool_size: int = 4,
+        timeout: float = 10.0,
+        max_idle: float = 60.0,
+        max_messages_per_connection: int = 1000,
+    ):
+        """Initializes the adapter; connections are opened on first use.
+
+        Args:
+            host: The SMTP server.
+            sender: The From address.
+            recipient: The To address; ``{topic}`` is replaced by the topic.
+            port: The SMTP server port.
+            username: Login user; no AUTH is done when omitted.
+            password: Login password.
+            starttls: Upgrade plain connections with STARTTLS.
+            use_ssl: Connect with implicit TLS (port 465) instead.
+            pool_size: Connections kept open at most.
+            timeout: Seconds allowed for connecting and for each SMTP command.
+            max_idle: Idle connections older than this are checked with NOOP
+                before reuse.
+            max_messages_per_connection: Messages sent before a connection
+                is recycled.
+        """
+        if not host:
+            raise ValueError("SMTP host cannot be empty.")
+        if not sender:
+            raise ValueError("SMTP sender cannot be empty.")
+        if pool_size < 1:
+            raise ValueError("SMTP pool size must be positive.")
+
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipient = recipient
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_messages_per_connection = max_messages_per_connection
+
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._opened = 0
+        self._reconnects = 0
+        logger.info(f"SMTPNotificationAdapter initialized for {host}:{port}")
+
+    def send(self, topic: str, message: str) -> None:
+        """Sends one email for the message."""
+        self._send_all(topic, [message])
+        logger.info("Email for topic '%s' sent via %s", topic, self.host)
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Sends one email per message over a single SMTP session."""
+        self._send_all(topic, list(messages))
+        logger.info(
+            "%d emails for topic '%s' sent via %s", len(messages), topic, self.host
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Reports pool usage and how many connections were opened."""
+        return {
+            "idle_connections": self._idle.qsize(),
+            "connections_opened": self._opened,
+            "reconnects": self._reconnects,
+        }
+
+    def close(self) -> None:
+        """Closes every idle connection with QUIT."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(connection, quit=True)
+
+    def probe(self) -> None:
+        """Checks a pooled session with NOOP, opening one if none is idle.
+
+        When every connection is busy sending, the server is evidently
+        reachable and nothing is checked.
+        """
+        if not self._slots.acquire(blocking=False):
+            return
+        try:
+            connection = self._checkout()
+            try:
+                code, reply = connection.smtp.noop()
+            except Exception:
+                self._discard(connection)
+                raise
+            if code != 250:
+                self._discard(connection)
+                raise smtplib.SMTPResponseException(code, reply)
+            connection.last_used = time.monotonic()
+            self._checkin(connection)
+        finally:
+            self._slots.release()
+
+    def build_message(self, topic: str, message: str) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = self.recipient.format(topic=topic)
+        email["Subject"] = f"New Request - Topic: {topic}"
+        email.set_content(message)
+        return email
+
+    def _send_all(self, topic: str, messages: List[str]) -> None:
+        emails = [self.build_message(topic, message) for message in messages]
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No SMTP connection to {self.host} became available.")
+        try:
+            connection = self._checkout()
+            sent = 0
+            try:
+                for email in emails:
+                    connection = self._send_one(connection, email)
+                    sent += 1
+            except Exception as e:
+                self._discard(connection)
+                if sent:
+                    # Retrying the whole batch would mail the first ones twice.
+                    raise PartialDeliveryError(e, messages[sent:]) from e
+                raise
+            self._checkin(connection)
+        finally:
+            self._slots.release()
+
+    def _send_one(
+        self, connection: _PooledConnection, email: EmailMessage
+    ) -> _PooledConnection:
+        connection.smtp.data_sent = False
+        try:
+            connection.smtp.send_message(email)
+        except OSError as e:
+            # SMTP error replies are OSErrors too; only a dropped connection
+            # (a pooled session closed by the server) is worth a reconnect,
+            # and only before DATA, or the message could be mailed twice.
+            if connection.smtp.data_sent or (
+                isinstance(e, smtplib.SMTPException)
+                and not isinstance(e, smtplib.SMTPServerDisconnected)
+            ):
+                raise
+            logger.warning(f"SMTP connection to {self.host} lost ({e}), reconnecting")
+            self._discard(connection)
+            self._reconnects += 1
+            connection = self._connect()
+            try:
+                connection.smtp.send_message(email)
+            except Exception:
+                self._discard(connection)
+                raise
+        connection.messages += 1
+        connection.last_used = time.monotonic()
+        return connection
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - connection.last_used < self.max_idle:
+                return connection
+            # Long idle sessions are often dropped by the server; check first.
+            try:
+                if connection.smtp.noop()[0] == 250:
+                    return connection
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(connection)
+
+    def _checkin(self, connection: _PooledConnection) -> None:
+        if connection.messages >= self.max_messages_per_connection:
+            self._discard(connection, quit=True)
+        else:
+            self._idle.put(connection)
+
+    def _connect(self) -> _PooledConnection:
+        context = ssl.create_default_context()
+        if self.use_ssl:
+            smtp = _SMTP_SSL(
+                self.host, self.port, timeout=self.timeout, context=context
+            )
+        else:
+            smtp = _SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls and not self.use_ssl:
+                smtp.starttls(context=context)
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except Exception:
+            smtp.close()
+            raise
+        self._opened += 1
+        logger.info(f"Opened SMTP connection to {self.host}:{self.port}")
+        return _PooledConnection(smtp)
+
+    def _discard(self, connection: _PooledConnection, quit: bool = False) -> None:
+        try:
+            if quit:
+                connection.smtp.quit()
+            else:
+                connection.smtp.close()
+        except (smtplib.SMTPException, OSError):
+            connection.smtp.close()
@@ -0,0 +1,343 @@
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.metrics import STATUS_INDEX_DROPPED
+from app.ports.status import (
+    FAILED,
+    QUEUED,
+    RETRYING,
+    SENDING,
+    SENT,
+    DeliveryStatus,
+    DeliveryStatusStore,
+)
+
+logger = logging.getLogger(__name__)
+
+_STATES = (QUEUED, SENDING, RETRYING, SENT, FAILED)
+_CODES = {state: code for code, state in enumerate(_STATES)}
+_FAILED = _CODES[FAILED]
+_SENT = _CODES[SENT]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS delivery_status (
+    request_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    status TEXT NOT NULL,
+    channels TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    queued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+_INDEX = (
+    "CREATE INDEX IF NOT EXISTS delivery_status_queued ON delivery_status (queued_at)"
+)
+
+
+class SQLiteStatusIndex:
+    """On-disk copy of delivery statuses, shared by every process using the file.
+
+    Writes are queued and committed in batches by a background thread, so
+    recording a status never waits for the disk. Queued updates of the
+    same request are merged, and at most ``max_pending`` requests wait: if
+    the disk falls further behind, statuses of new requests are dropped
+    and counted rather than held in memory. Entries older than ``max_age``
+    are deleted as new ones are written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float,
+        batch_size: int = 500,
+        max_pending: int = 10000,
+    ):
+        """Opens (or creates) the index database.
+
+        Args:
+            path: Location of the SQLite database file.
+            max_age: Seconds after which entries are deleted.
+            batch_size: Statuses written per transaction at most.
+            max_pending: Requests whose statuses may wait to be written.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_INDEX)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        # Request ID to its latest unwritten status.
+        self._pending: Dict[str, DeliveryStatus] = {}
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._last_prune = 0.0
+        self._writer = threading.Thread(
+            target=self._run, name="status-index", daemon=True
+        )
+        self._writer.start()
+        logger.info(f"Delivery status index opened at {path}")
+
+    def put(self, status: DeliveryStatus) -> None:
+        with self._pending_lock:
+            pending = self._pending
+            if status.request_id not in pending and len(pending) >= self.max_pending:
+                self.dropped += 1
+                STATUS_INDEX_DROPPED.inc()
+                return
+            pending[status.request_id] = status
+        self._wake.set()
+
+    def get(self, request_id: str) -> Optional[DeliveryStatus]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT request_id, topic, status, channels, attempts, error, "
+                "queued_at, started_at, finished_at FROM delivery_status "
+                "WHERE request_id = ? AND queued_at >= ?",
+                (request_id, time.time() - self.max_age),
+            ).fetchone()
+        if row is None:
+            return None
+        channels = tuple(row[3].split(",")) if row[3] else ()
+        return DeliveryStatus(*row[:3], channels, *row[4:])
+
+    def close(self) -> None:
+        """Writes the queued statuses and closes the database."""
+        with self._pending_lock:
+            self._closed = True
+        self._wake.set()
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                closed = self._closed
+            statuses = list(pending.values())
+            for start in range(0, len(statuses), self.batch_size):
+                batch = statuses[start : start + self.batch_size]
+                try:
+                    self._write(batch)
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write {len(batch)} delivery statuses: {e}")
+            if closed:
+                return
+
+    def _write(self, batch: List[DeliveryStatus]) -> None:
+        rows = [
+            (
+                s.request_id,
+                s.topic,
+                s.status,
+                ",".join(s.channels),
+                s.attempts,
+                s.error,
+                s.queued_at,
+                s.started_at,
+                s.finished_at,
+            )
+            for s in batch
+        ]
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO delivery_status VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if now - self._last_prune >= 60:
+                self._conn.execute(
+                    "DELETE FROM delivery_status WHERE queued_at < ?",
+                    (now - self.max_age,),
+                )
+                self._last_prune = now
+            self._conn.commit()
+
+
+class RingBufferStatusStore(DeliveryStatusStore):
+    """Keeps the statuses of the last ``capacity`` requests in fixed slots.
+
+    Request IDs carry a per-process prefix and a sequence number whose
+    remainder by ``capacity`` is the record's slot, so a lookup is an
+    index, not a search. Fields live in preallocated typed arrays (about
+    60 bytes a request whatever the traffic); a new request overwrites
+    the oldest slot, and records older than ``max_age`` are reported as
+    unknown. With an index, statuses are also written to disk, so any
+    process can report them after they left the buffer.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100000,
+        max_age: float = 86400.0,
+        index: Optional[SQLiteStatusIndex] = None,
+    ):
+        """Initializes an empty store.
+
+        Args:
+            capacity: Requests tracked in memory at most.
+            max_age: Seconds a request is reported for.
+            index: Optional on-disk copy of every status.
+        """
+        if capacity < 1:
+            raise ValueError("Status store capacity must be positive.")
+
+        self.capacity = capacity
+        self.max_age = max_age
+        self.index = index
+        self._prefix = os.urandom(4).hex()
+        self._sequence = itertools.count()
+        self._seq = array("q", [-1]) * capacity
+        self._state = bytearray(capacity)
+        self._pending = array("H", [0]) * capacity
+        self._attempts = array("H", [0]) * capacity
+        self._queued_at = array("d", [0.0]) * capacity
+        self._started_at = array("d", [0.0]) * capacity
+        self._finished_at = array("d", [0.0]) * capacity
+        self._topics: List[Optional[str]] = [None] * capacity
+        self._channels: List[Tuple[str, ...]] = [()] * capacity
+        # Errors are rare, so they are kept by slot outside the arrays.
+        self._errors: Dict[int, str] = {}
+        # Topic and channel tuples are shared between records.
+        self._interned: Dict[object, object] = {}
+        self._lock = threading.Lock()
+
+    def new_id(self) -> str:
+        return f"{self._prefix}-{next(self._sequence):x}"
+
+    def queued(self, request_id: str, topic: str) -> None:
+        seq = self._parse(request_id)
+        if seq is None:
+            return
+        slot = seq % self.capacity
+        with self._lock:
+            self._seq[slot] = seq
+            self._state[slot] = _CODES[QUEUED]
+            self._pending[slot] = 0
+            self._attempts[slot] = 0
+            self._queued_at[slot] = time.time()
+            self._started_at[slot] = 0.0
+            self._finished_at[slot] = 0.0
+            self._topics[slot] = self._intern(topic)
+            self._channels[slot] = ()
+            self._errors.pop(slot, None)
+            self._publish(slot)
+
+    def sending(self, request_id: str, channels: Sequence[str]) -> None:
+        with self._lock:
+            slot = self._slot(request_id)
+            if slot is None:
+                return
+            self._state[slot] = _CODES[SENDING]
+            self._channels[slot] = self._intern(tuple(channels))
+            self._pending[slot] = len(channels)
+            self._started_at[slot] = time.time()
+            self._publish(slot)
+
+    def sent(self, request_id: str, channel: str) -> None:
+        with self._lock:
+            slot = self._slot(request_id)
+            if slot is None or not self._pending[slot]:
+                return
+            self._pending[slot] -= 1
+            if not self._pending[slot] and self._state[slot] != _FAILED:
+                self._state[slot] = _SENT
+                self._finished_at[slot] = time.time()
+            self._publish(slot)
+
+    def retrying(self, request_id: str, channel: str, error: str) -> None:
+        with self._lock:
+            slot = self._slot(request_id)
+            if slot is None or self._state[slot] == _FAILED:
+                return
+            self._state[slot] = _CODES[RETRYING]
+            self._attempts[slot] = min(self._attempts[slot] + 1, 0xFFFF)
+            self._errors[slot] = f"{channel}: {error}"
+            self._publish(slot)
+
+    def failed(self, request_id: str, channel: Optional[str], error: str) -> None:
+        with self._lock:
+            slot = self._slot(request_id)
+            if slot is None or self._state[slot] == _FAILED:
+                return
+            self._state[slot] = _FAILED
+            self._attempts[slot] = min(self._attempts[slot] + 1, 0xFFFF)
+            self._errors[slot] = f"{channel}: {error}" if channel else error
+            self._finished_at[slot] = time.time()
+            self._publish(slot)
+
+    def get(self, request_id: str) -> Optional[DeliveryStatus]:
+        with self._lock:
+            slot = self._slot(request_id)
+            status = self._snapshot(slot, request_id) if slot is not None else None
+        if status is None and self.index is not None:
+            return self.index.get(request_id)
+        return status
+
+    def close(self) -> None:
+        if self.index is not None:
+            self.index.close()
+
+    def _parse(self, request_id: str) -> Optional[int]:
+        prefix, _, seq = request_id.partition("-")
+        if prefix != self._prefix:
+            return None
+        try:
+            return int(seq, 16)
+        except ValueError:
+            return None
+
+    def _slot(self, request_id: str) -> Optional[int]:
+        # Caller must hold the lock.
+        seq = self._parse(request_id)
+        if seq is None:
+            return None
+        slot = seq % self.capacity
+        if self._seq[slot] != seq:
+            return None
+        if time.time() - self._queued_at[slot] > self.max_age:
+            return None
+        return slot
+
+    def _intern(self, value):
+        return self._interned.setdefault(value, value)
+
+    def _snapshot(self, slot: int, request_id: str) -> DeliveryStatus:
+        return DeliveryStatus(
+            request_id=request_id,
+            topic=self._topics[slot],
+            status=_STATES[self._state[slot]],
+            channels=self._channels[slot],
+            attempts=self._attempts[slot],
+            error=self._errors.get(slot),
+            queued_at=self._queued_at[slot],
+            started_at=self._started_at[slot] or None,
+            finished_at=self._finished_at[slot] or None,
+        )
+
+    def _publish(self, slot: int) -> None:
+        # Caller must hold the lock.
+        if self.index is not None:
+            request_id = f"{self._prefix}-{self._seq[slot]:x}"
+            self.index.put(self._snapshot(slot, request_id))
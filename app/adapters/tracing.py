@@ -0,0 +1,128 @@
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import requests
+
+from app.ports.tracing import FinishedSpan, SpanExporter
+
+logger = logging.getLogger(__name__)
+
+# OTLP status codes.
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+def _value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings.
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: Sequence[FinishedSpan], service_name: str) -> Dict[str, Any]:
+    """Returns the spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    otlp_spans: List[Dict[str, Any]] = []
+    for finished in spans:
+        otlp_span: Dict[str, Any] = {
+            "traceId": finished.trace_id,
+            "spanId": finished.span_id,
+            "name": finished.name,
+            # SPAN_KIND_INTERNAL
+            "kind": 1,
+            "startTimeUnixNano": str(finished.start_ns),
+            "endTimeUnixNano": str(finished.end_ns),
+            "attributes": [
+                {"key": key, "value": _value(value)}
+                for key, value in finished.attributes.items()
+            ],
+            "status": (
+                {"code": _STATUS_ERROR, "message": finished.error}
+                if finished.error
+                else {"code": _STATUS_OK}
+            ),
+        }
+        if finished.parent_id:
+            otlp_span["parentSpanId"] = finished.parent_id
+        otlp_spans.append(otlp_span)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": _value(service_name)}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "notifier"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends each batch of spans to a file as one line of OTLP/JSON.
+
+    The lines have the format written by the OpenTelemetry Collector's
+    file exporter, so the collector's ``otlpjsonfile`` receiver (or ``jq``)
+    can read them.
+    """
+
+    def __init__(self, path: str, service_name: str = "notifier-api"):
+        """Initializes the exporter.
+
+        Args:
+            path: The file appended to; created if missing.
+            service_name: Reported as the ``service.name`` of the spans.
+        """
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[FinishedSpan]) -> None:
+        line = json.dumps(to_otlp(spans, self.service_name), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class OTLPSpanExporter(SpanExporter):
+    """Posts batches of spans to an OTLP/HTTP collector as JSON."""
+
+    def __init__(
+        self,
+        url: str,
+        service_name: str = "notifier-api",
+        timeout: float = 5.0,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        """Initializes the exporter.
+
+        Args:
+            url: The collector's traces endpoint, e.g.
+                ``http://localhost:4318/v1/traces``.
+            service_name: Reported as the ``service.name`` of the spans.
+            timeout: Seconds allowed for each export.
+            headers: Extra headers, e.g. for authentication.
+        """
+        self.url = url
+        self.service_name = service_name
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.session = requests.Session()
+
+    def export(self, spans: Sequence[FinishedSpan]) -> None:
+        body = json.dumps(to_otlp(spans, self.service_name), separators=(",", ":"))
+        response = self.session.post(
+            self.url, data=body.encode(), headers=self.headers, timeout=self.timeout
+        )
+        if response.status_code >= 400:
+            raise ConnectionError(
+                f"Collector answered {response.status_code}: {response.text[:200]}"
+            )
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,248 @@
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.adapters.retry import default_is_retryable
+from app.ports.notification import (
+    NotificationChannel,
+    PartialDeliveryError,
+    RateLimitedError,
+)
+from app.tracing import TRACEPARENT_HEADER, current_traceparent
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Notifier-Signature"
+TIMESTAMP_HEADER = "X-Notifier-Timestamp"
+
+
+class WebhookError(Exception):
+    """Raised when an endpoint answers with an error status."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_retryable_webhook_error(error: Exception) -> bool:
+    """Treats 5xx, 408 and connection errors as transient, other 4xx as fatal."""
+    if isinstance(error, WebhookError):
+        return error.status_code >= 500 or error.status_code == 408
+    return default_is_retryable(error)
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Returns the seconds to wait from a ``Retry-After`` header.
+
+    The header holds either a number of seconds or an HTTP-date; a missing
+    or unreadable value gives ``default`` and a date in the past gives 0.
+    """
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        # HTTP dates are always in GMT, even when written as "-0000".
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """Returns the signature of a payload, as sent in ``X-Notifier-Signature``.
+
+    Receivers recompute the HMAC-SHA256 of ``"<timestamp>.<body>"`` with the
+    shared secret and compare it in constant time; checking the timestamp
+    too lets them reject replayed deliveries.
+    """
+    digest = hmac.new(
+        secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256
+    ).hexdigest()
+    return f"sha256={digest}"
+
+
+class WebhookPool:
+    """HTTP connections shared by every webhook channel of a process.
+
+    Connections are kept alive and reused per host, and each host gets at
+    most ``max_per_host`` requests in flight, so a slow endpoint cannot take
+    every connection or thread.
+    """
+
+    def __init__(self, max_per_host: int = 8, acquire_timeout: float = 10.0):
+        """Initializes the pool; connections are opened on first use.
+
+        Args:
+            max_per_host: Concurrent requests (and connections kept) per host.
+            acquire_timeout: Seconds a send waits for its host's turn.
+        """
+        if max_per_host < 1:
+            raise ValueError("Webhook pool needs at least one connection per host.")
+
+        self.max_per_host = max_per_host
+        self.acquire_timeout = acquire_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._users = 0
+
+    def attach(self) -> None:
+        """Registers a channel, which must ``release`` the pool when closed."""
+        with self._lock:
+            self._users += 1
+
+    def release(self) -> None:
+        """Closes the connections once the last channel released the pool."""
+        with self._lock:
+            self._users -= 1
+            last = self._users <= 0
+        if last:
+            self.session.close()
+
+    def post(
+        self, url: str, body: bytes, headers: Mapping[str, str], timeout: Any
+    ) -> requests.Response:
+        slots = self._host_slots(url)
+        if not slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"No connection to {urlsplit(url).netloc} available.")
+        try:
+            return self.session.post(url, data=body, headers=headers, timeout=timeout)
+        finally:
+            slots.release()
+
+    def _host_slots(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        slots = self._slots.get(host)
+        if slots is None:
+            with self._lock:
+                slots = self._slots.setdefault(
+                    host, threading.BoundedSemaphore(self.max_per_host)
+                )
+        return slots
+
+
+class WebhookNotificationAdapter(NotificationChannel):
+    """Posts notifications as JSON to an HTTP endpoint.
+
+    A message is posted as ``{"topic", "message"}``; ``send_batch`` posts
+    ``{"topic", "messages"}`` with up to ``batch_size`` messages per
+    request. With a secret, every request carries an HMAC-SHA256 signature
+    of its timestamp and body (see ``sign``). Requests sent while a trace is
+    recorded carry its ``traceparent``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool: WebhookPool,
+        secret: Optional[str] = None,
+        batch_size: int = 1,
+        timeout: float = 5.0,
+        connect_timeout: float = 2.0,
+        headers: Optional[Mapping[str, str]] = None,
+        name: Optional[str] = None,
+    ):
+        """Initializes the adapter.
+
+        Args:
+            url: The endpoint receiving the POSTs.
+            pool: Connections shared with the other webhook channels.
+            secret: Key signing the payloads; unsigned when omitted.
+            batch_size: Messages posted together by ``send_batch``.
+            timeout: Seconds allowed for the endpoint's response.
+            connect_timeout: Seconds allowed for opening a connection.
+            headers: Extra headers sent with every request.
+            name: Label used in logs.
+        """
+        if not url:
+            raise ValueError("Webhook URL cannot be empty.")
+        if urlsplit(url).scheme not in ("http", "https"):
+            raise ValueError(f"Webhook URL must be http or https: {url}")
+        if batch_size < 1:
+            raise ValueError("Webhook batch size must be positive.")
+
+        self.url = url
+        self.pool = pool
+        self.secret = secret
+        self.batch_size = batch_size
+        self.timeout: Tuple[float, float] = (connect_timeout, timeout)
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.name = name or urlsplit(url).netloc
+        self._posted = 0
+        self._messages = 0
+        pool.attach()
+        logger.info(f"WebhookNotificationAdapter initialized for {self.name}")
+
+    def send(self, topic: str, message: str) -> None:
+        """Posts one message."""
+        self._post({"topic": topic, "message": message}, 1)
+        logger.info("Message for topic '%s' posted to %s", topic, self.name)
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Posts the messages in requests of up to ``batch_size`` messages."""
+        if len(messages) == 1:
+            self.send(topic=topic, message=messages[0])
+            return
+        for start in range(0, len(messages), self.batch_size):
+            chunk: List[str] = list(messages[start : start + self.batch_size])
+            try:
+                self._post({"topic": topic, "messages": chunk}, len(chunk))
+            except Exception as e:
+                if start:
+                    # The first chunks were posted; only the rest is resent.
+                    raise PartialDeliveryError(e, messages[start:]) from e
+                raise
+        logger.info(
+            "%d messages for topic '%s' posted to %s", len(messages), topic, self.name
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self._posted, "messages": self._messages}
+
+    def close(self) -> None:
+        self.pool.release()
+
+    def _post(self, payload: Dict[str, Any], count: int) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        headers = self.headers
+        traceparent = current_traceparent()
+        if traceparent is not None:
+            headers = {**headers, TRACEPARENT_HEADER: traceparent}
+        if self.secret:
+            timestamp = str(int(time.time()))
+            headers = {
+                **headers,
+                TIMESTAMP_HEADER: timestamp,
+                SIGNATURE_HEADER: sign(self.secret, timestamp, body),
+            }
+        response = self.pool.post(self.url, body, headers, self.timeout)
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            logger.warning(f"{self.name} rate limited, retry after {retry_after}s")
+            raise RateLimitedError(f"{self.name} rate limited", retry_after)
+        if response.status_code >= 400:
+            raise WebhookError(
+                f"{self.name} answered {response.status_code}: "
+                f"{response.text[:200]}",
+                response.status_code,
+            )
+        self._posted += 1
+        self._messages += count
@@ -0,0 +1,181 @@
+"""Admission control for the notify endpoints.
+
+Requests are turned away with 429 and a ``Retry-After`` before any work is
+done for them when the process is already serving too many, when their
+client exceeds its own rate, or when their dispatch lane is backed up.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from .adapters.rate_limit import TokenBucket
+from .domain.models import AssistanceRequest
+from .metrics import SHED_REQUESTS
+from .use_cases.dispatch import QueuedAssistanceRequestDispatcher
+
+# Seconds between two measurements of a lane's drain rate.
+_RATE_SAMPLE_INTERVAL = 1.0
+
+
+class Rejection(NamedTuple):
+    reason: str
+    retry_after: int
+
+
+class AdmissionController:
+    """Decides whether a request is served now or told to come back later.
+
+    Every limit is optional: a limit of 0 disables it.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 0,
+        client_rate: float = 0.0,
+        client_burst: float = 20.0,
+        max_clients: int = 10000,
+        dispatcher: Optional[QueuedAssistanceRequestDispatcher] = None,
+        lane_limit: int = 0,
+        max_retry_after: int = 30,
+    ):
+        """Initializes the controller.
+
+        Args:
+            max_in_flight: Requests this process serves at the same time.
+            client_rate: Requests per second allowed to each client.
+            client_burst: Requests a client may send back to back.
+            max_clients: Clients whose buckets are remembered; the least
+                recently seen are forgotten first.
+            dispatcher: Dispatcher whose lanes are watched.
+            lane_limit: Requests waiting in a lane past which new requests
+                for that lane are turned away.
+            max_retry_after: Upper bound of the ``Retry-After`` given.
+        """
+        self.max_in_flight = max_in_flight
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        self.dispatcher = dispatcher
+        self.lane_limit = lane_limit
+        self.max_retry_after = max_retry_after
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        # Lane to (sampled at, served count then, requests drained per second).
+        self._drain: Dict[str, Tuple[float, int, float]] = {}
+        self._shed = {
+            reason: SHED_REQUESTS.labels(reason=reason)
+            for reason in ("in_flight", "client_rate", "backlog")
+        }
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def enter(self, client: Optional[str]) -> Optional[Rejection]:
+        """Admits a request, which must then be ended with ``leave``.
+
+        Returns:
+            None if the request is admitted, otherwise why it is not.
+        """
+        if self.client_rate > 0 and client:
+            wait = self._bucket(client).try_acquire()
+            if wait > 0:
+                return self._reject("client_rate", wait)
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                rejected = True
+            else:
+                rejected = False
+                self._in_flight += 1
+        # Requests in flight finish in well under a second.
+        return self._reject("in_flight", 1) if rejected else None
+
+    def charge(self, client: Optional[str], tokens: float) -> None:
+        """Charges an admitted request for the items it turned out to carry.
+
+        ``enter`` charges one token per request, before the body is read. A
+        batch then pays for its other items here, leaving the client's
+        bucket in debt if needed, so that its next requests wait as long as
+        if the items had been posted one by one.
+        """
+        if self.client_rate > 0 and client and tokens > 0:
+            self._bucket(client).take(tokens)
+
+    def leave(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def check_backlog(self, request: AssistanceRequest) -> Optional[Rejection]:
+        """Turns the request away if its dispatch lane is backed up.
+
+        ``Retry-After`` is the time the lane needs to drain below the limit
+        at the rate workers took requests from it in the last second.
+        """
+        if self.dispatcher is None or not self.lane_limit:
+            return None
+        return self._check_lane(self.dispatcher.lane_of(request))
+
+    def check_batch_backlog(
+        self, requests: Iterable[AssistanceRequest]
+    ) -> Optional[Rejection]:
+        """Turns a batch away if any lane it uses is backed up.
+
+        The batch is accepted or rejected as a whole, and ``Retry-After`` is
+        the time the slowest of those lanes needs to drain.
+        """
+        if self.dispatcher is None or not self.lane_limit:
+            return None
+        lanes = {self.dispatcher.lane_of(request) for request in requests}
+        excess = {lane: self._excess(lane) for lane in lanes}
+        backed_up = [lane for lane, count in excess.items() if count > 0]
+        if not backed_up:
+            return None
+        return self._reject(
+            "backlog",
+            max(self._drain_time(lane, excess[lane]) for lane in backed_up),
+        )
+
+    def _check_lane(self, lane: str) -> Optional[Rejection]:
+        excess = self._excess(lane)
+        if excess <= 0:
+            return None
+        return self._reject("backlog", self._drain_time(lane, excess))
+
+    def _excess(self, lane: str) -> int:
+        return self.dispatcher.lane_depth(lane) - self.lane_limit + 1
+
+    def _drain_time(self, lane: str, excess: int) -> float:
+        rate = self._drain_rate(lane)
+        return excess / rate if rate > 0 else self.max_retry_after
+
+    def _reject(self, reason: str, retry_after: float) -> Rejection:
+        self._shed[reason].inc()
+        seconds = min(self.max_retry_after, max(1, math.ceil(retry_after)))
+        return Rejection(reason, seconds)
+
+    def _bucket(self, client: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._clients.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.client_rate, self.client_burst)
+                self._clients[client] = bucket
+                if len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(client)
+            return bucket
+
+    def _drain_rate(self, lane: str) -> float:
+        now = time.monotonic()
+        served = self.dispatcher.lane_served(lane)
+        sampled_at, last_served, rate = self._drain.get(lane, (now, served, 0.0))
+        elapsed = now - sampled_at
+        if lane not in self._drain or elapsed >= _RATE_SAMPLE_INTERVAL:
+            if elapsed > 0:
+                rate = (served - last_served) / elapsed
+            self._drain[lane] = (now, served, rate)
+        return rate
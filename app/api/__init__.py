@@ -5,6 +5,10 @@ health_bp = Blueprint("Health", __name__)
 CORS(health_bp)
 notify_bp = Blueprint("Notify", __name__)
 CORS(notify_bp)
+admin_bp = Blueprint("Admin", __name__)
+metrics_bp = Blueprint("Metrics", __name__)
 
+from . import admin
 from . import health
+from . import metrics
 from . import notify
@@ -0,0 +1,75 @@
+import logging
+from flask import Response, abort, current_app, jsonify, make_response
+from apifairy import arguments, authenticate, other_responses, response
+
+from ..ports.dead_letter import DeadLetterStore
+from ..profiling import ProfilerBusyError, collapse, sample_stacks
+from .auth import admin_auth
+from .schemas.schemas import (
+    DeadLetterQuerySchema,
+    DeadLetterSchema,
+    NotificationResponseSchema,
+    ProfileQuerySchema,
+)
+from . import admin_bp
+
+logger = logging.getLogger(__name__)
+
+
+def _dead_letters() -> DeadLetterStore:
+    return current_app.dead_letters
+
+
+@admin_bp.route("/dead-letters", methods=["GET"])
+@authenticate(admin_auth)
+@arguments(DeadLetterQuerySchema)
+@response(DeadLetterSchema(many=True))
+def list_dead_letters(query):
+    """List messages that could not be delivered, newest first."""
+    return _dead_letters().list(limit=query["limit"])
+
+
+@admin_bp.route("/dead-letters/<letter_id>/redrive", methods=["POST"])
+@authenticate(admin_auth)
+@response(NotificationResponseSchema, status_code=202)
+@other_responses({404: "Dead letter or its channel not found."})
+def redrive_dead_letter(letter_id):
+    """Send a dead letter through the channel that failed to deliver it."""
+    letter = _dead_letters().get(letter_id)
+    if letter is None:
+        abort(404)
+    channel = current_app.notification_channels.get(letter.channel)
+    if channel is None or _dead_letters().pop(letter_id) is None:
+        abort(404)
+
+    if len(letter.messages) == 1:
+        channel.send(topic=letter.topic, message=letter.messages[0])
+    else:
+        channel.send_batch(topic=letter.topic, messages=list(letter.messages))
+    logger.info(f"Redrove dead letter {letter_id} for topic '{letter.topic}'")
+    return {"message": "Dead letter redriven."}
+
+
+@admin_bp.route("/profile", methods=["POST"])
+@authenticate(admin_auth)
+@arguments(ProfileQuerySchema)
+@other_responses(
+    {
+        200: "Sampled stacks in the folded format (`text/plain`).",
+        409: "A profile is already being taken.",
+    }
+)
+def profile(query):
+    """Sample the stacks of this worker's threads for a few seconds.
+
+    The answer comes when sampling ends, as one `thread;frame;...;frame
+    count` line per distinct stack: the input of `flamegraph.pl`, or of
+    speedscope and similar viewers. Only the worker serving this request is
+    profiled; keep `seconds` below the server's request timeout.
+    """
+    logger.info(f"Profiling for {query['seconds']}s")
+    try:
+        stacks = sample_stacks(query["seconds"], query["interval"] / 1000)
+    except ProfilerBusyError as e:
+        abort(make_response(jsonify({"error": str(e)}), 409))
+    return Response(collapse(stacks), mimetype="text/plain")
@@ -0,0 +1,13 @@
+import hmac
+from flask import current_app
+from flask_httpauth import HTTPTokenAuth
+
+admin_auth = HTTPTokenAuth(scheme="Bearer")
+
+
+@admin_auth.verify_token
+def verify_admin_token(token):
+    expected = current_app.config.get("ADMIN_TOKEN")
+    if expected and token and hmac.compare_digest(token, expected):
+        return "admin"
+    return None
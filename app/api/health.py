@@ -1,7 +1,33 @@
-from flask import jsonify
+from flask import current_app, jsonify
 from . import health_bp
+from ..readiness import NOT_STARTED
+
+_ALIVE = b'{"status": "ok"}'
 
 
 @health_bp.route("", methods=["GET"], strict_slashes=False)
 def health():
-    return jsonify({"status": "ok"}), 200
+    # Liveness only: a constant answer that takes none of the channels' locks.
+    return current_app.response_class(_ALIVE, status=200, mimetype="application/json")
+
+
+@health_bp.route("/stats", methods=["GET"])
+def stats():
+    channels = {
+        name: channel.stats()
+        for name, channel in current_app.notification_channels.items()
+    }
+    return jsonify({"channels": channels}), 200
+
+
+@health_bp.route("/ready", methods=["GET"])
+def ready():
+    # Pre-rendered by the readiness monitor: nothing is probed or computed here.
+    monitor = getattr(current_app, "readiness", None)
+    status, body = monitor.snapshot if monitor is not None else NOT_STARTED
+    return current_app.response_class(
+        body,
+        status=status,
+        mimetype="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,29 @@
+import time
+from flask import Response, g, request
+
+from .. import metrics
+from . import metrics_bp
+
+
+@metrics_bp.before_app_request
+def start_timer():
+    g.started_at = time.perf_counter()
+
+
+@metrics_bp.after_app_request
+def record_request(response):
+    started_at = g.get("started_at")
+    if started_at is not None:
+        # The URL rule rather than the path keeps the label set bounded.
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.REQUEST_SECONDS.labels(endpoint=endpoint).observe(
+            time.perf_counter() - started_at
+        )
+        metrics.REQUESTS.labels(endpoint=endpoint, status=response.status_code).inc()
+    return response
+
+
+@metrics_bp.route("", methods=["GET"], strict_slashes=False)
+def prometheus_metrics():
+    """Expose request, validation, use-case and adapter metrics for Prometheus."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE_LATEST)
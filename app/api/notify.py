@@ -1,44 +1,431 @@
+import hashlib
+import io
+import json
 import logging
-from flask import current_app, make_response, jsonify, request
-from apifairy import arguments, response
-from typing import cast
+import time
+from flask import abort, current_app, g, make_response, jsonify, request, url_for
+from apifairy import other_responses, response
+from typing import Any, Dict, Iterator, List, Optional, cast
 
+from .. import metrics
+from ..admission import AdmissionController, Rejection
 from ..domain.models import AssistanceRequest
-from ..use_cases.handle_request import HandleAssistanceRequest
-from .schemas.schemas import AssistanceRequestSchema, NotificationResponseSchema
+from ..ports.idempotency import IdempotencyStore
+from ..ports.status import DeliveryStatusStore
+from ..ports.use_cases import HandleAssistanceRequestBase
+from ..use_cases.dispatch import DispatchQueueFullError
+from . import validation
+from .schemas.schemas import (
+    AssistanceRequestSchema,
+    BatchResponseSchema,
+    DeliveryStatusSchema,
+    NotificationResponseSchema,
+)
 from . import notify_bp
 
 logger = logging.getLogger(__name__)
 
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+_item_schema = validation.CompiledSchema(AssistanceRequestSchema())
+_MALFORMED_LINE = object()
+_ACCEPTED_MESSAGE = "Request received and processing."
+# The 202 body is spliced from constant bytes rather than serialized.
+_ACCEPTED_JSON = validation.dumps({"message": _ACCEPTED_MESSAGE})
+_ACCEPTED_WITH_ID = _ACCEPTED_JSON[:-1] + b',"request_id":'
+_NOTIFY_VALIDATION = metrics.VALIDATION_SECONDS.labels(endpoint="notify")
+_BATCH_VALIDATION = metrics.VALIDATION_SECONDS.labels(endpoint="notify_batch")
+
+
+def _client_address() -> Optional[str]:
+    # nginx sets X-Real-IP and appends the peer it saw to X-Forwarded-For;
+    # earlier X-Forwarded-For entries come from the client and are not used.
+    forwarded = request.headers.get("X-Forwarded-For", "")
+    return (
+        request.headers.get("X-Real-IP")
+        or forwarded.rpartition(",")[2].strip()
+        or request.remote_addr
+    )
+
+
+def _too_many_requests(rejection: Rejection):
+    logger.warning(
+        "Shedding request (%s), retry after %ds",
+        rejection.reason,
+        rejection.retry_after,
+    )
+    response = make_response(
+        jsonify({"error": "Too many requests, please retry later"}), 429
+    )
+    response.headers["Retry-After"] = str(rejection.retry_after)
+    abort(response)
+
+
+@notify_bp.before_request
+def _admit():
+    """Turns requests away before their body is read when overloaded."""
+    if request.method != "POST":
+        # Status lookups are cheap and must work while notifications are shed.
+        return
+    admission = cast(AdmissionController, current_app.admission)
+    rejection = admission.enter(_client_address())
+    if rejection is not None:
+        _too_many_requests(rejection)
+    g.admitted = True
+
+
+@notify_bp.teardown_request
+def _leave(exc: Optional[BaseException] = None):
+    if g.pop("admitted", False):
+        current_app.admission.leave()
+
+
+def _fingerprint(assistance_request: AssistanceRequest) -> str:
+    content = f"{assistance_request.topic}\0{assistance_request.description}"
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _accepted(request_id: Optional[str]) -> Dict[str, Any]:
+    body: Dict[str, Any] = {"message": _ACCEPTED_MESSAGE}
+    if request_id is not None:
+        body["request_id"] = request_id
+    return body
+
+
+def _accepted_json(request_id: Optional[str]) -> bytes:
+    if request_id is None:
+        return _ACCEPTED_JSON
+    return _ACCEPTED_WITH_ID + validation.dumps(request_id) + b"}"
+
+
+def _status_location(request_id: Optional[str]) -> Dict[str, str]:
+    if request_id is None:
+        return {}
+    return {"Location": url_for(".get_delivery_status", request_id=request_id)}
+
+
+def _claim_duplicate(
+    store: IdempotencyStore,
+    fingerprint: str,
+    claimed: List[str],
+    body: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """Claims the content hash of a request for ``DEDUP_WINDOW`` seconds.
+
+    Returns:
+        The record of the earlier identical request, or None if there is none
+        (or deduplication is disabled).
+    """
+    window = current_app.config["DEDUP_WINDOW"]
+    if window <= 0:
+        return None
+    key = f"content:{fingerprint}"
+    existing = store.claim(key, {"fingerprint": fingerprint, "body": body}, window)
+    if existing is None:
+        claimed.append(key)
+    return existing
+
 
 @notify_bp.route("", methods=["POST"], strict_slashes=False)
-@arguments(AssistanceRequestSchema, location="json")
-@response(NotificationResponseSchema, status_code=202)
+@validation.arguments(AssistanceRequestSchema)
+@validation.response(NotificationResponseSchema, status_code=202)
+@other_responses(
+    {
+        400: "The Idempotency-Key header is empty or too long.",
+        422: "The Idempotency-Key was already used for a different request.",
+        429: "Overloaded or over the client's rate; retry after `Retry-After`.",
+    }
+)
 def handle_notification(validated_data):
-    """Handle incoming assistance requests."""
+    """Handle incoming assistance requests.
 
-    try:
-        assistance_request = AssistanceRequest(
-            topic=validated_data["topic"],
-            description=validated_data["description"],
+    Send an `Idempotency-Key` header to make retries safe: a repeated key
+    gets the original response back, marked with `Idempotent-Replayed`,
+    and the request is not dispatched again.
+
+    The response carries a `request_id`, and a `Location` header pointing
+    to the request's delivery status.
+    """
+    # The body was parsed and validated by @arguments since the request started.
+    _NOTIFY_VALIDATION.observe(time.perf_counter() - g.started_at)
+    statuses = cast(Optional[DeliveryStatusStore], current_app.statuses)
+    request_id = statuses.new_id() if statuses is not None else None
+    assistance_request = AssistanceRequest(
+        topic=validated_data["topic"],
+        description=validated_data["description"],
+        priority=validated_data.get("priority"),
+        request_id=request_id,
+    )
+    body = _accepted(request_id)
+    store = cast(IdempotencyStore, current_app.idempotency)
+    fingerprint = _fingerprint(assistance_request)
+    claimed: List[str] = []
+
+    idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+    if idempotency_key is not None and (
+        not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH
+    ):
+        _bad_request(
+            f"{IDEMPOTENCY_HEADER} must be 1 to "
+            f"{MAX_IDEMPOTENCY_KEY_LENGTH} characters long."
         )
 
+    duplicate = _claim_duplicate(store, fingerprint, claimed, body)
+    if duplicate is not None:
         logger.info(
-            f"Received assistance request: topic='{assistance_request.topic}', "
-            f"description='{assistance_request.description[:50]}...'"
+            "Suppressed duplicate assistance request for topic '%s'",
+            assistance_request.topic,
+        )
+        # The key must replay the request that was dispatched, not this one.
+        body = duplicate["body"]
+
+    if idempotency_key is not None:
+        key = f"key:{idempotency_key}"
+        existing = store.claim(
+            key,
+            {"fingerprint": fingerprint, "body": body},
+            current_app.config["IDEMPOTENCY_TTL"],
         )
+        if existing is not None:
+            _release(store, claimed)
+            if existing["fingerprint"] != fingerprint:
+                _bad_request(
+                    f"{IDEMPOTENCY_HEADER} was already used for a different request.",
+                    422,
+                )
+            logger.info(
+                "Replaying response for %s %s", IDEMPOTENCY_HEADER, idempotency_key
+            )
+            return _replay(existing["body"])
+        claimed.append(key)
+
+    if duplicate is not None:
+        return _replay(body)
 
-        handler = cast(HandleAssistanceRequest, current_app.assistance_request_handler)
+    rejection = current_app.admission.check_backlog(assistance_request)
+    if rejection is not None:
+        _release(store, claimed)
+        _too_many_requests(rejection)
+
+    if statuses is not None:
+        statuses.queued(request_id, assistance_request.topic)
+
+    try:
+        logger.info(
+            "Received assistance request: topic='%s', description='%.50s...'",
+            assistance_request.topic,
+            assistance_request.description,
+        )
+
+        handler = cast(
+            HandleAssistanceRequestBase, current_app.assistance_request_handler
+        )
+        started_at = time.perf_counter()
         handler.execute(assistance_request)
+        metrics.USE_CASE_SECONDS.labels(topic=assistance_request.topic).observe(
+            time.perf_counter() - started_at
+        )
 
         logger.info(
-            f"Assistance request for topic '{assistance_request.topic}' processed."
+            "Assistance request for topic '%s' processed.", assistance_request.topic
         )
 
-        return {"message": "Request received and processing."}
+        return _accepted_json(request_id), _status_location(request_id)
 
+    except DispatchQueueFullError as e:
+        _release(store, claimed)
+        _rejected(statuses, request_id, e)
+        logger.warning(f"Rejecting notification: {e}")
+        abort(
+            make_response(
+                jsonify({"error": "Service is busy, please retry later"}), 503
+            )
+        )
     except Exception as e:
+        _release(store, claimed)
+        _rejected(statuses, request_id, e)
         logger.error(f"Error handling notification: {e}", exc_info=True)
-        return make_response(
-            jsonify({"error": "An internal server error occurred"}), 500
+        abort(
+            make_response(jsonify({"error": "An internal server error occurred"}), 500)
+        )
+
+
+@notify_bp.route("/<request_id>", methods=["GET"])
+@response(DeliveryStatusSchema)
+@other_responses({404: "The request is unknown or its status has expired."})
+def get_delivery_status(request_id):
+    """Get the delivery status of a request.
+
+    The status is `queued`, `sending`, `retrying`, `sent` or `failed`, with
+    the channels the request was routed to and when it was accepted,
+    started and finished. Statuses are kept for a bounded number of recent
+    requests and for at most `STATUS_MAX_AGE` seconds.
+    """
+    statuses = cast(Optional[DeliveryStatusStore], current_app.statuses)
+    status = statuses.get(request_id) if statuses is not None else None
+    if status is None:
+        abort(make_response(jsonify({"error": "Request not found"}), 404))
+    return status
+
+
+def _replay(body: Dict[str, Any]):
+    headers = {REPLAYED_HEADER: "true", **_status_location(body.get("request_id"))}
+    return body, headers
+
+
+def _rejected(
+    statuses: Optional[DeliveryStatusStore], request_id: Optional[str], error: Exception
+) -> None:
+    if statuses is not None:
+        statuses.failed(request_id, None, f"Rejected: {error}")
+
+
+def _bad_request(message: str, status_code: int = 400):
+    abort(make_response(jsonify({"error": message}), status_code))
+
+
+def _release(store: IdempotencyStore, keys: List[str]) -> None:
+    # A rejected request was not handled, so a retry must not be suppressed.
+    for key in keys:
+        store.release(key)
+
+
+def _iter_batch_items() -> Iterator[Any]:
+    """Yields the raw batch items, reading NDJSON bodies one line at a time."""
+    if request.mimetype in NDJSON_MIMETYPES:
+        stream = request.stream
+        if isinstance(stream, io.RawIOBase):
+            # Raw streams read lines one byte at a time; buffer them.
+            stream = io.BufferedReader(stream, buffer_size=64 * 1024)
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield _MALFORMED_LINE
+    elif request.is_json:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            _bad_request("Batch body must be a JSON array.")
+        yield from items
+    else:
+        _bad_request("Batch body must be a JSON array or NDJSON.")
+
+
+@notify_bp.route("/batch", methods=["POST"])
+@response(BatchResponseSchema, status_code=202)
+@other_responses(
+    {
+        400: "The body is not a JSON array or NDJSON.",
+        413: "Too many items.",
+        429: "Overloaded or over the client's rate; retry after `Retry-After`.",
+    }
+)
+def handle_notification_batch():
+    """Handle a batch of assistance requests.
+
+    The body is either a JSON array (`application/json`) or one request
+    object per line (`application/x-ndjson`). Items are validated like
+    single requests and the valid ones are handed to the use case at once.
+    Items repeating an earlier request within the deduplication window are
+    reported as accepted without being dispatched again. Accepted items
+    carry the `request_id` of their delivery status.
+
+    Every item counts against the client's rate, and the whole batch is
+    turned away with 429 when a dispatch lane it uses is backed up.
+    """
+    max_items = current_app.config["BATCH_MAX_ITEMS"]
+    store = cast(IdempotencyStore, current_app.idempotency)
+    statuses = cast(Optional[DeliveryStatusStore], current_app.statuses)
+    results = []
+    assistance_requests = []
+    positions = []
+    claims: List[List[str]] = []
+
+    started_at = time.perf_counter()
+    for index, item in enumerate(_iter_batch_items()):
+        if index >= max_items:
+            for claimed in claims:
+                _release(store, claimed)
+            _bad_request(f"Batch exceeds the limit of {max_items} items.", 413)
+        if item is _MALFORMED_LINE:
+            errors = {"_schema": ["Invalid JSON."]}
+        else:
+            item, errors = _item_schema.load(item)
+        if errors:
+            results.append({"index": index, "status": "invalid", "errors": errors})
+            continue
+        request_id = statuses.new_id() if statuses is not None else None
+        assistance_request = AssistanceRequest(
+            topic=item["topic"],
+            description=item["description"],
+            priority=item.get("priority"),
+            request_id=request_id,
+        )
+        claimed: List[str] = []
+        existing = _claim_duplicate(
+            store, _fingerprint(assistance_request), claimed, _accepted(request_id)
         )
+        if existing is not None:
+            results.append(_batch_result(index, existing["body"].get("request_id")))
+            continue
+        positions.append(len(results))
+        claims.append(claimed)
+        results.append(_batch_result(index, request_id))
+        assistance_requests.append(assistance_request)
+
+    _BATCH_VALIDATION.observe(time.perf_counter() - started_at)
+    if not results:
+        _bad_request("Batch is empty.")
+
+    # Admission charged the request one token before its body was read.
+    admission = cast(AdmissionController, current_app.admission)
+    admission.charge(_client_address(), len(results) - 1)
+    rejection = admission.check_batch_backlog(assistance_requests)
+    if rejection is not None:
+        for claimed in claims:
+            _release(store, claimed)
+        _too_many_requests(rejection)
+    if statuses is not None:
+        for assistance_request in assistance_requests:
+            statuses.queued(assistance_request.request_id, assistance_request.topic)
+
+    handler = cast(HandleAssistanceRequestBase, current_app.assistance_request_handler)
+    outcomes = handler.execute_batch(assistance_requests) if positions else []
+    for position, claimed, error in zip(positions, claims, outcomes):
+        if error is None:
+            continue
+        _release(store, claimed)
+        _rejected(statuses, results[position].pop("request_id", None), error)
+        if isinstance(error, DispatchQueueFullError):
+            message = "Service is busy, please retry later"
+        else:
+            logger.error(f"Error handling batch item: {error}")
+            message = "An internal server error occurred"
+        results[position]["status"] = "rejected"
+        results[position]["errors"] = {"_schema": [message]}
+
+    accepted = sum(1 for result in results if result["status"] == "accepted")
+    logger.info(
+        "Received batch of %d assistance requests: %d accepted",
+        len(results),
+        accepted,
+    )
+    return {
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results,
+    }
+
+
+def _batch_result(index: int, request_id: Optional[str]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"index": index, "status": "accepted"}
+    if request_id is not None:
+        result["request_id"] = request_id
+    return result
@@ -1,19 +1,126 @@
-from marshmallow import fields, validate
+from typing import Optional, Sequence
+
+from flask import current_app
+from marshmallow import ValidationError, fields, validate
+from app.domain.models import PRIORITIES
 from app.extensions import ma  # Import the Marshmallow instance
 
 
+class TopicValidator(validate.Validator):
+    """Accepts the topics named by the routing rules.
+
+    Without explicit topics, those of ``current_app.router`` are used, so
+    the allowed topics follow the routing configuration.
+    """
+
+    def __init__(self, topics: Optional[Sequence[str]] = None):
+        self.topics = topics
+
+    def __call__(self, value: str) -> str:
+        topics = self.topics if self.topics is not None else current_app.router.topics
+        if value not in topics:
+            raise ValidationError(self.describe(topics))
+        return value
+
+    @staticmethod
+    def describe(topics: Sequence[str]) -> str:
+        if not topics:
+            return "No topics are configured."
+        names = [f"'{topic}'" for topic in topics]
+        if len(names) > 1:
+            names = [", ".join(names[:-1]), names[-1]]
+        return f"Topic must be {' or '.join(names)}"
+
+
 class AssistanceRequestSchema(ma.Schema):
     topic = fields.Str(
         required=True,
-        validate=validate.OneOf(
-            ["sales", "pricing"], error="Topic must be 'sales' or 'pricing'"
-        ),
+        validate=TopicValidator(),
         error_messages={"required": "Topic is required."},
     )
     description = fields.Str(
         required=True, error_messages={"required": "Description is required."}
     )
+    priority = fields.Str(
+        validate=validate.OneOf(PRIORITIES),
+        metadata={"description": "Overrides the priority of the topic."},
+    )
+
+    def __init__(self, *args, topics: Optional[Sequence[str]] = None, **kwargs):
+        """Initializes the schema.
+
+        Args:
+            topics: Topics accepted instead of those of ``current_app.router``,
+                for use outside a Flask app.
+        """
+        super().__init__(*args, **kwargs)
+        if topics is not None:
+            self.fields["topic"].validators = [TopicValidator(topics)]
 
 
 class NotificationResponseSchema(ma.Schema):
     message = fields.Str(required=True)
+    request_id = fields.Str(
+        metadata={"description": "Identifies the request's delivery status."}
+    )
+
+
+class BatchItemResultSchema(ma.Schema):
+    index = fields.Int(required=True)
+    status = fields.Str(required=True)
+    request_id = fields.Str()
+    errors = fields.Dict()
+
+
+class DeliveryStatusSchema(ma.Schema):
+    request_id = fields.Str(required=True)
+    topic = fields.Str(required=True)
+    status = fields.Str(
+        required=True,
+        metadata={"description": "queued, sending, retrying, sent or failed."},
+    )
+    channels = fields.List(
+        fields.Str(),
+        required=True,
+        metadata={"description": "Channels the request was routed to."},
+    )
+    attempts = fields.Int(
+        required=True, metadata={"description": "Failed delivery attempts."}
+    )
+    error = fields.Str(allow_none=True)
+    queued_at = fields.Float(required=True)
+    started_at = fields.Float(allow_none=True)
+    finished_at = fields.Float(allow_none=True)
+
+
+class BatchResponseSchema(ma.Schema):
+    accepted = fields.Int(required=True)
+    rejected = fields.Int(required=True)
+    results = fields.List(fields.Nested(BatchItemResultSchema), required=True)
+
+
+class DeadLetterSchema(ma.Schema):
+    letter_id = fields.Str(required=True)
+    channel = fields.Str(required=True)
+    topic = fields.Str(required=True)
+    messages = fields.List(fields.Str(), required=True)
+    error = fields.Str(required=True)
+    attempts = fields.Int(required=True)
+    failed_at = fields.Float(required=True)
+
+
+class DeadLetterQuerySchema(ma.Schema):
+    limit = fields.Int(load_default=100, validate=validate.Range(min=1, max=1000))
+
+
+class ProfileQuerySchema(ma.Schema):
+    seconds = fields.Float(
+        load_default=10,
+        validate=validate.Range(min=0.1, max=30),
+        metadata={"description": "How long to sample."},
+    )
+    interval = fields.Float(
+        load_default=10,
+        validate=validate.Range(min=1, max=1000),
+        metadata={"description": "Milliseconds between two samples."},
+    )
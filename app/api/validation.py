@@ -0,0 +1,224 @@
+"""Fast path for parsing and validating JSON request bodies.
+
+``CompiledSchema`` checks a payload against the fields of a marshmallow
+schema with a single pass of plain Python, producing the errors marshmallow
+would, so hot endpoints skip marshmallow's per-request machinery.
+``arguments`` and ``response`` replace APIFairy's decorators of the same
+name on those endpoints: they record the same schemas for the OpenAPI
+docs, but parse with ``CompiledSchema`` and serialize with ``dumps``.
+JSON goes through orjson when it is installed.
+"""
+
+import json
+from functools import wraps
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type, Union
+
+from apifairy.exceptions import ValidationError as RequestValidationError
+from flask import abort, current_app, request
+from marshmallow import Schema, ValidationError, fields, missing
+
+from ..tracing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+else:  # pragma: no cover - depends on the environment
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+class _CompiledField:
+    __slots__ = (
+        "name",
+        "key",
+        "required",
+        "allow_none",
+        "default",
+        "validators",
+        "messages",
+    )
+
+    def __init__(self, name: str, field: fields.Field):
+        self.name = name
+        self.key = field.data_key or name
+        self.required = field.required
+        self.allow_none = field.allow_none
+        self.default = field.load_default
+        self.validators = tuple(field.validators)
+        self.messages = field.error_messages
+
+
+class CompiledSchema:
+    """Validates payloads like ``schema.load`` for schemas of string fields.
+
+    Field validators (including ones set on the schema instance) are
+    called as marshmallow calls them, so their messages are unchanged.
+    Schemas using other field types or schema-level hooks are rejected
+    when compiled rather than validated differently.
+    """
+
+    def __init__(self, schema: Schema):
+        """Compiles the schema.
+
+        Args:
+            schema: The marshmallow schema instance to mirror.
+
+        Raises:
+            TypeError: If the schema uses something the fast path does not
+                implement.
+        """
+        if any(getattr(schema, "_hooks", {}).values()):
+            raise TypeError(f"{type(schema).__name__} has hooks; cannot compile it.")
+        compiled = []
+        for name, field in schema.load_fields.items():
+            if type(field) is not fields.String:
+                raise TypeError(
+                    f"Field '{name}' of {type(schema).__name__} is a "
+                    f"{type(field).__name__}; only strings are compiled."
+                )
+            compiled.append(_CompiledField(name, field))
+        self.schema = schema
+        self._fields = tuple(compiled)
+        self._keys = frozenset(field.key for field in compiled)
+        self._type_error = schema.error_messages["type"]
+        self._unknown_error = schema.error_messages["unknown"]
+
+    def load(self, payload: Any) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """Validates a decoded JSON payload.
+
+        Returns:
+            The loaded data, and the errors by field (empty when valid).
+        """
+        if not isinstance(payload, Mapping):
+            return {}, {"_schema": [self._type_error]}
+        data: Dict[str, Any] = {}
+        errors: Dict[str, List[str]] = {}
+        for field in self._fields:
+            value = payload.get(field.key, missing)
+            if value is missing:
+                if field.required:
+                    errors[field.key] = [field.messages["required"]]
+                elif field.default is not missing:
+                    default = field.default
+                    data[field.name] = default() if callable(default) else default
+                continue
+            if value is None:
+                if field.allow_none:
+                    data[field.name] = None
+                else:
+                    errors[field.key] = [field.messages["null"]]
+                continue
+            if not isinstance(value, str):
+                errors[field.key] = [field.messages["invalid"]]
+                continue
+            messages = self._validate(field, value)
+            if messages:
+                errors[field.key] = messages
+            else:
+                data[field.name] = value
+        if len(payload) > len(data) + len(errors) or not payload.keys() <= self._keys:
+            for key in payload:
+                if key not in self._keys:
+                    errors[key] = [self._unknown_error]
+        return data, errors
+
+    @staticmethod
+    def _validate(field: _CompiledField, value: str) -> Optional[List[str]]:
+        messages: List[str] = []
+        for validator in field.validators:
+            try:
+                if validator(value) is False:
+                    messages.append(field.messages["validator_failed"])
+            except ValidationError as e:
+                if isinstance(e.messages, list):
+                    messages.extend(e.messages)
+                else:
+                    messages.append(e.messages)
+        return messages
+
+
+def _annotate(f: Callable, **spec: Any) -> None:
+    # The attribute APIFairy builds the OpenAPI document from.
+    if not hasattr(f, "_spec"):
+        f._spec = {}
+    f._spec.update(spec)
+
+
+def arguments(schema: Union[Schema, Type[Schema]]) -> Callable:
+    """Passes the validated JSON body to the view, like APIFairy's ``arguments``.
+
+    A body that is not JSON counts as an empty object and malformed JSON is
+    answered with 400, as webargs does.
+    """
+    if isinstance(schema, type):
+        schema = schema()
+    compiled = CompiledSchema(schema)
+
+    def decorator(f):
+        if getattr(f, "_spec", {}).get("args") is None:
+            _annotate(f, args=[])
+        f._spec["args"].append((schema, "json"))
+
+        @wraps(f)
+        def view(*args, **kwargs):
+            with span("validate"):
+                payload: Any = {}
+                if request.is_json:
+                    body = request.get_data(cache=True)
+                    if body:
+                        try:
+                            payload = loads(body)
+                        except ValueError:
+                            abort(400)
+                data, errors = compiled.load(payload)
+            if errors:
+                raise RequestValidationError(400, {"json": errors})
+            return f(*args, data, **kwargs)
+
+        return view
+
+    return decorator
+
+
+def response(schema: Union[Schema, Type[Schema]], status_code: int = 200) -> Callable:
+    """Serializes the view's result, like APIFairy's ``response``.
+
+    The view returns a dict already shaped like ``schema``, or the JSON
+    bytes of one, optionally with a dict of headers. The body is not
+    passed through the schema.
+    """
+    if isinstance(schema, type):
+        schema = schema()
+
+    def decorator(f):
+        _annotate(
+            f,
+            response=schema,
+            status_code=status_code,
+            description=None,
+            response_headers=None,
+        )
+
+        @wraps(f)
+        def view(*args, **kwargs):
+            rv = f(*args, **kwargs)
+            body, headers = rv if isinstance(rv, tuple) else (rv, None)
+            if not isinstance(body, bytes):
+                body = dumps(body)
+            return current_app.response_class(
+                body, status=status_code, headers=headers, mimetype="application/json"
+            )
+
+        return view
+
+    return decorator
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Dict, Optional, Sequence, Set
+
+from flask import Config as Settings
+
+from .api.schemas.schemas import AssistanceRequestSchema
+from .api.validation import CompiledSchema, dumps, loads
+from .domain.models import AssistanceRequest
+from .factories import build_async_notification_channels, build_router
+from .logs import configure_logging, correlation_id
+from .ports.notification import AsyncNotificationChannel
+from .ports.use_cases import AsyncHandleAssistanceRequestBase
+from .use_cases.handle_request import AsyncHandleAssistanceRequest
+
+logger = logging.getLogger(__name__)
+
+ACCEPTED_BODY = dumps({"message": "Request received and processing."})
+
+
+class NotifierASGIApp:
+    """ASGI application serving the /v1/notify and /v1/health contracts.
+
+    Accepted requests are delivered by asyncio tasks, so one process can
+    hold thousands of in-flight sends. Past ``max_in_flight`` pending
+    deliveries new requests are answered with 503. On startup the app
+    opens one aiohttp session in the server's event loop and hands it to
+    every channel, so they share its connection pool.
+    """
+
+    def __init__(
+        self,
+        handler: AsyncHandleAssistanceRequestBase,
+        channels: Dict[str, AsyncNotificationChannel],
+        topics: Sequence[str] = (),
+        max_in_flight: int = 10000,
+        max_body_size: int = 10 * 1024 * 1024,
+        shutdown_timeout: float = 10.0,
+        http_max_connections: int = 100,
+    ):
+        """Initializes the application.
+
+        Args:
+            handler: The asyncio use case delivering accepted requests.
+            channels: Channels closed when the server shuts down.
+            topics: Topics accepted by /v1/notify.
+            max_in_flight: Deliveries that may be pending at the same time.
+            max_body_size: Largest request body accepted, in bytes.
+            shutdown_timeout: Seconds allowed to finish pending deliveries.
+            http_max_connections: Connection pool size of the shared session.
+        """
+        self.handler = handler
+        self.channels = channels
+        self.max_in_flight = max_in_flight
+        self.max_body_size = max_body_size
+        self.shutdown_timeout = shutdown_timeout
+        self.http_max_connections = http_max_connections
+        self.session = None
+        self._schema = CompiledSchema(AssistanceRequestSchema(topics=topics))
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of deliveries still running."""
+        return len(self._tasks)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        # Delivery tasks copy the context, so they log with the same ID.
+        token = correlation_id.set(self._request_id(scope))
+        try:
+            await self._route(scope, receive, send)
+        finally:
+            correlation_id.reset(token)
+
+    async def _route(self, scope, receive, send) -> None:
+        path = scope["path"].rstrip("/")
+        method = scope["method"]
+        if path == "/v1/health":
+            if method != "GET":
+                await self._respond(send, 405, {"error": "Method not allowed"})
+                return
+            await self._respond(send, 200, {"status": "ok"})
+        elif path == "/v1/notify":
+            if method != "POST":
+                await self._respond(send, 405, {"error": "Method not allowed"})
+                return
+            await self._notify(scope, receive, send)
+        else:
+            await self._respond(send, 404, {"error": "Not found"})
+
+    async def _notify(self, scope, receive, send) -> None:
+        body = await self._read_body(receive)
+        if body is None:
+            await self._respond(send, 413, {"error": "Request body too large"})
+            return
+
+        payload = {}
+        if self._is_json(scope):
+            try:
+                payload = loads(body or b"null")
+            except ValueError:
+                messages = {"_schema": ["Invalid JSON body."]}
+                await self._respond(send, 400, {"messages": {"json": messages}})
+                return
+        data, errors = self._schema.load(payload)
+        if errors:
+            await self._respond(send, 400, {"messages": {"json": errors}})
+            return
+
+        if self.in_flight >= self.max_in_flight:
+            logger.warning("Rejecting notification: too many deliveries in flight")
+            await self._respond(
+                send, 503, {"error": "Service is busy, please retry later"}
+            )
+            return
+
+        request = AssistanceRequest(
+            topic=data["topic"],
+            description=data["description"],
+            priority=data.get("priority"),
+        )
+        task = asyncio.create_task(self.handler.execute(request))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        await self._respond(send, 202, ACCEPTED_BODY)
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _request_id(scope) -> str:
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id" and value:
+                return value[:128].decode("latin-1")
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def _is_json(scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == b"content-type":
+                mimetype = value.split(b";", 1)[0].strip().lower()
+                return mimetype == b"application/json" or mimetype.endswith(b"+json")
+        return False
+
+    @staticmethod
+    async def _respond(send, status: int, body) -> None:
+        payload = body if isinstance(body, bytes) else dumps(body)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode()),
+                    (b"x-request-id", correlation_id.get().encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def startup(self) -> None:
+        """Opens the HTTP session shared by the channels."""
+        import aiohttp
+
+        # Sessions belong to the loop they are created in: the server's.
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.http_max_connections)
+        )
+        for channel in self.channels.values():
+            channel.use_session(self.session)
+
+    async def shutdown(self) -> None:
+        """Waits for pending deliveries, closes the channels and the session."""
+        if self._tasks:
+            logger.info(f"Waiting for {len(self._tasks)} in-flight deliveries")
+            _, pending = await asyncio.wait(
+                set(self._tasks), timeout=self.shutdown_timeout
+            )
+            if pending:
+                logger.warning(
+                    f"Shutdown timed out with {len(pending)} deliveries pending"
+                )
+        for name, channel in self.channels.items():
+            try:
+                await channel.close()
+            except Exception as e:
+                logger.error(f"Error closing channel '{name}': {e}")
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def create_asgi_app(config_name) -> NotifierASGIApp:
+    settings = Settings(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    settings.from_object(config_name)
+    configure_logging(settings)
+
+    channels = build_async_notification_channels(settings)
+    router = build_router(settings)
+    handler = AsyncHandleAssistanceRequest(channels, router=router)
+    logger.info(f"ASGI app created with config: {config_name}")
+    return NotifierASGIApp(
+        handler,
+        channels,
+        topics=router.topics,
+        max_in_flight=settings["ASGI_MAX_IN_FLIGHT"],
+        shutdown_timeout=settings["DISPATCH_SHUTDOWN_TIMEOUT"],
+        http_max_connections=settings["ASGI_HTTP_MAX_CONNECTIONS"],
+    )
@@ -1,9 +1,25 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
 
+# Priority classes, most urgent first.
+PRIORITIES = ("high", "normal", "low")
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class AssistanceRequest:
     """Represents a customer assistance request."""
 
     topic: str
     description: str
+    # One of PRIORITIES; None leaves it to the topic's priority.
+    priority: Optional[str] = None
+    # Set when the request's delivery is tracked.
+    request_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the fields to serialize, leaving out unset optional ones.
+
+        Messages without the newer fields stay readable by consumers that
+        predate the field.
+        """
+        return {key: value for key, value in asdict(self).items() if value is not None}
@@ -0,0 +1,184 @@
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from app.domain.models import AssistanceRequest
+
+
+@dataclass(frozen=True)
+class RoutingRule:
+    """Sends matching requests to one or more named channels.
+
+    A rule matches when every condition it sets holds: the topic is one of
+    ``topics``, the description contains one of ``keywords`` (case
+    insensitive) and it matches ``pattern``. Rules are applied by
+    descending ``priority``; a matching ``final`` rule stops lower ones.
+    """
+
+    name: str
+    channels: Tuple[str, ...]
+    topics: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+    pattern: Optional[str] = None
+    priority: int = 0
+    final: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "RoutingRule":
+        """Builds a rule from its configuration mapping."""
+        if not data.get("channels"):
+            raise ValueError(f"Routing rule {data.get('name')!r} has no channels.")
+        return cls(
+            name=data.get("name") or ",".join(data["channels"]),
+            channels=tuple(data["channels"]),
+            topics=tuple(data.get("topics", ())),
+            keywords=tuple(data.get("keywords", ())),
+            pattern=data.get("pattern"),
+            priority=int(data.get("priority", 0)),
+            final=bool(data.get("final", False)),
+        )
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton finding every keyword in one pass over a text."""
+
+    def __init__(self, keywords: Mapping[str, Iterable[int]]):
+        """Builds the automaton.
+
+        Args:
+            keywords: Lower-case keyword to the ids reported when it occurs.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+
+        for keyword, ids in keywords.items():
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                node = next_node
+            self._output[node].update(ids)
+
+        # Breadth-first, so every fail link points to a finished node.
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                pending.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] |= self._output[self._fail[child]]
+
+    def find(self, text: str) -> Set[int]:
+        """Returns the ids of every keyword occurring in the lower-case text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Set[int] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found |= output[node]
+        return found
+
+
+@dataclass
+class _CompiledRule:
+    rule: RoutingRule
+    needs_keyword: bool
+    pattern: Optional[Pattern[str]] = None
+
+
+class RoutingTable:
+    """Rules compiled into a topic index and a keyword automaton.
+
+    Looking up a request costs one dict lookup, one pass over the
+    description and a regex match per candidate rule that has a pattern,
+    however many rules are configured.
+    """
+
+    def __init__(self, rules: Sequence[RoutingRule]):
+        """Compiles the rules.
+
+        Args:
+            rules: The routing rules; order breaks priority ties.
+        """
+        ordered = sorted(
+            enumerate(rules), key=lambda item: (-item[1].priority, item[0])
+        )
+        self.rules: Tuple[RoutingRule, ...] = tuple(rule for _, rule in ordered)
+        self._compiled: List[_CompiledRule] = []
+        self._by_topic: Dict[str, List[int]] = {}
+        self._any_topic: List[int] = []
+        keywords: Dict[str, Set[int]] = {}
+
+        for index, rule in enumerate(self.rules):
+            self._compiled.append(
+                _CompiledRule(
+                    rule=rule,
+                    needs_keyword=bool(rule.keywords),
+                    pattern=re.compile(rule.pattern) if rule.pattern else None,
+                )
+            )
+            if rule.topics:
+                for topic in rule.topics:
+                    self._by_topic.setdefault(topic, []).append(index)
+            else:
+                self._any_topic.append(index)
+            for keyword in rule.keywords:
+                keywords.setdefault(keyword.lower(), set()).add(index)
+
+        self._keywords = KeywordMatcher(keywords)
+        self.topics: Tuple[str, ...] = tuple(
+            dict.fromkeys(topic for rule in rules for topic in rule.topics)
+        )
+        # Rules for any topic are merged into every topic's list up front.
+        for topic, indexes in self._by_topic.items():
+            self._by_topic[topic] = sorted(indexes + self._any_topic)
+        self.channels: Tuple[str, ...] = tuple(
+            dict.fromkeys(name for rule in self.rules for name in rule.channels)
+        )
+
+    @classmethod
+    def from_config(cls, rules: Iterable[Mapping]) -> "RoutingTable":
+        return cls([RoutingRule.from_dict(rule) for rule in rules])
+
+    def route(self, request: AssistanceRequest) -> List[str]:
+        """Returns the names of the channels the request goes to, in order."""
+        candidates = self._by_topic.get(request.topic, self._any_topic)
+        keyword_hits: Optional[Set[int]] = None
+        channels: Dict[str, None] = {}
+        for index in candidates:
+            compiled = self._compiled[index]
+            if compiled.needs_keyword:
+                if keyword_hits is None:
+                    keyword_hits = self._keywords.find(request.description.lower())
+                if index not in keyword_hits:
+                    continue
+            if compiled.pattern and not compiled.pattern.search(request.description):
+                continue
+            channels.update(dict.fromkeys(compiled.rule.channels))
+            if compiled.rule.final:
+                break
+        return list(channels)
@@ -1,14 +1,8 @@
 from apifairy import APIFairy
 from flask_caching import Cache
 from flask_marshmallow import Marshmallow
-import os
-import tempfile
 
 apifairy = APIFairy()
 ma = Marshmallow()
-cache = Cache(
-    config={
-        "CACHE_TYPE": "FileSystemCache",
-        "CACHE_DIR": os.path.join(tempfile.gettempdir(), "cache"),
-    }
-)
+# Configured from the app config (CACHE_TYPE, CACHE_REDIS_URL, ...).
+cache = Cache()
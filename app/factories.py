@@ -0,0 +1,386 @@
+import importlib
+import json
+import logging
+from typing import Dict, Mapping, Optional, Tuple
+
+from .adapters.circuit_breaker import CircuitBreakerNotificationChannel
+from .adapters.coalescing import CoalescingNotificationChannel
+from .adapters.email import EmailNotificationAdapter
+from .adapters.instrumented import InstrumentedNotificationChannel
+from .adapters.rate_limit import RateLimitedNotificationChannel
+from .adapters.retry import (
+    RetryingNotificationChannel,
+    RetryPolicy,
+    RetryScheduler,
+    default_is_retryable,
+)
+from .domain.routing import RoutingTable
+from .ports.broker import MessageBroker
+from .ports.dead_letter import DeadLetterStore
+from .ports.idempotency import IdempotencyStore
+from .ports.notification import AsyncNotificationChannel, NotificationChannel
+from .ports.status import DeliveryStatusStore
+
+logger = logging.getLogger(__name__)
+
+_BROKER_MODULES = {
+    "memory": ".adapters.memory_broker",
+    "rabbitmq": ".adapters.rabbitmq",
+}
+
+
+def build_notification_channels(
+    config: Mapping, dead_letters: Optional[DeadLetterStore] = None
+) -> Dict[str, NotificationChannel]:
+    """Builds the named channels (``slack``, ``email``, webhooks) from the settings.
+
+    Channels that cannot be initialized are left out, so requests routed
+    to them are logged and skipped by the use case. When a dead-letter store is
+    given, every channel retries failed sends and dead-letters the rest.
+    Every adapter sits behind its own circuit breaker and has its send
+    latency and failures recorded in the Prometheus metrics.
+    """
+    retry_scheduler = RetryScheduler() if dead_letters is not None else None
+
+    def protect(channel, name, is_retryable=default_is_retryable):
+        channel = CircuitBreakerNotificationChannel(
+            InstrumentedNotificationChannel(channel),
+            name=name,
+            failure_rate_threshold=config.get("CIRCUIT_FAILURE_RATE", 0.5),
+            minimum_calls=config.get("CIRCUIT_MINIMUM_CALLS", 10),
+            window_seconds=config.get("CIRCUIT_WINDOW_SECONDS", 30.0),
+            open_seconds=config.get("CIRCUIT_OPEN_SECONDS", 15.0),
+            half_open_max_calls=config.get("CIRCUIT_HALF_OPEN_CALLS", 1),
+        )
+        if retry_scheduler is None:
+            return channel
+        policy = RetryPolicy(
+            max_attempts=config.get("RETRY_MAX_ATTEMPTS", 5),
+            base_delay=config.get("RETRY_BASE_DELAY", 0.5),
+            max_delay=config.get("RETRY_MAX_DELAY", 30.0),
+            is_retryable=is_retryable,
+            max_wait=config.get("RETRY_MAX_WAIT", 300.0),
+        )
+        return RetryingNotificationChannel(
+            channel, policy, retry_scheduler, dead_letters, name=name
+        )
+
+    email_adapter = build_email_channel(config, protect)
+    slack_token = config.get("SLACK_BOT_TOKEN")
+    slack_channel_id = config.get("SLACK_CHANNEL_ID")
+
+    slack_adapter = None
+    if not slack_token:
+        logger.warning(
+            "SLACK_BOT_TOKEN not configured. Slack notifications will not be sent."
+        )
+    elif not slack_channel_id:
+        logger.warning(
+            "SLACK_CHANNEL_ID not configured. Slack notifications will not be sent."
+        )
+    else:
+        from .adapters.slack import SlackNotificationAdapter, is_retryable_slack_error
+
+        try:
+            slack_adapter = SlackNotificationAdapter(
+                token=slack_token, channel_id=slack_channel_id
+            )
+            slack_adapter = protect(slack_adapter, "slack", is_retryable_slack_error)
+            # Without a lane, the retry layer waits out Slack's 429s itself.
+            rate_limit = config.get("SLACK_RATE_LIMIT", 0)
+            if rate_limit > 0:
+                lane = RateLimitedNotificationChannel(
+                    slack_adapter,
+                    rate=rate_limit,
+                    burst=config.get("SLACK_RATE_BURST", 1),
+                    name=f"slack-{slack_channel_id}",
+                )
+                if isinstance(slack_adapter, RetryingNotificationChannel):
+                    # Retries take tokens and honour 429 pauses like first
+                    # attempts instead of all firing after an outage.
+                    slack_adapter.resubmit = lane.submit
+                slack_adapter = lane
+            coalesce_window = config.get("SLACK_COALESCE_WINDOW", 0)
+            if coalesce_window > 0:
+                slack_adapter = CoalescingNotificationChannel(
+                    slack_adapter,
+                    window_seconds=coalesce_window,
+                    max_items=config.get("SLACK_COALESCE_MAX_ITEMS", 20),
+                )
+        except ValueError as e:
+            logger.error(f"Error initializing Slack adapter: {e}")
+        except Exception as e:
+            logger.error(
+                f"Unexpected error initializing Slack adapter: {e}", exc_info=True
+            )
+
+    notification_channels = {
+        "slack": slack_adapter,
+        "email": email_adapter,
+        **build_webhook_channels(config, protect),
+    }
+
+    return {
+        name: adapter
+        for name, adapter in notification_channels.items()
+        if adapter is not None
+    }
+
+
+def configured_channel_names(config: Mapping) -> Tuple[str, ...]:
+    """Names of the channels the settings ask ``build_notification_channels`` for.
+
+    A name missing from what it returned is a channel that failed to
+    initialize.
+    """
+    names = ["email"]
+    if config.get("SLACK_BOT_TOKEN") and config.get("SLACK_CHANNEL_ID"):
+        names.append("slack")
+    endpoints = config.get("WEBHOOKS") or {}
+    if isinstance(endpoints, str):
+        endpoints = json.loads(endpoints)
+    names.extend(name for name in endpoints if name not in ("slack", "email"))
+    return tuple(names)
+
+
+def build_email_channel(config: Mapping, protect) -> NotificationChannel:
+    """Builds the SMTP channel when ``SMTP_HOST`` is set, else the mock one."""
+    smtp_host = config.get("SMTP_HOST")
+    if not smtp_host:
+        return protect(EmailNotificationAdapter(), "email")
+
+    from .adapters.smtp import SMTPNotificationAdapter, is_retryable_smtp_error
+
+    channel = protect(
+        SMTPNotificationAdapter(
+            host=smtp_host,
+            port=config.get("SMTP_PORT", 587),
+            sender=config.get("SMTP_SENDER"),
+            recipient=config.get("SMTP_RECIPIENT", "{topic}_channel@example.com"),
+            username=config.get("SMTP_USERNAME"),
+            password=config.get("SMTP_PASSWORD"),
+            starttls=config.get("SMTP_STARTTLS", True),
+            use_ssl=config.get("SMTP_SSL", False),
+            pool_size=config.get("SMTP_POOL_SIZE", 4),
+            timeout=config.get("SMTP_TIMEOUT", 10.0),
+        ),
+        "email",
+        is_retryable_smtp_error,
+    )
+    batch_window = config.get("SMTP_BATCH_WINDOW", 0)
+    if batch_window > 0:
+        # Bursts go out over one SMTP session per window.
+        channel = CoalescingNotificationChannel(
+            channel,
+            window_seconds=batch_window,
+            max_items=config.get("SMTP_BATCH_MAX_ITEMS", 50),
+        )
+    return channel
+
+
+def build_webhook_channels(config: Mapping, protect) -> Dict[str, NotificationChannel]:
+    """Builds a channel for every endpoint of ``WEBHOOKS``.
+
+    The endpoints share one ``WebhookPool``. An endpoint with a
+    ``batch_window`` merges the messages of each window into requests of
+    ``batch_size`` messages.
+    """
+    endpoints = config.get("WEBHOOKS") or {}
+    if isinstance(endpoints, str):
+        endpoints = json.loads(endpoints)
+    if not endpoints:
+        return {}
+
+    from .adapters.webhook import (
+        WebhookNotificationAdapter,
+        WebhookPool,
+        is_retryable_webhook_error,
+    )
+
+    pool = WebhookPool(max_per_host=config.get("WEBHOOK_MAX_PER_HOST", 8))
+    channels: Dict[str, NotificationChannel] = {}
+    for name, endpoint in endpoints.items():
+        if name in ("slack", "email"):
+            logger.error(f"Webhook '{name}' would replace a built-in channel")
+            continue
+        try:
+            channel = protect(
+                WebhookNotificationAdapter(
+                    url=endpoint.get("url"),
+                    pool=pool,
+                    secret=endpoint.get("secret"),
+                    batch_size=endpoint.get("batch_size", 1),
+                    timeout=endpoint.get("timeout", 5.0),
+                    connect_timeout=endpoint.get("connect_timeout", 2.0),
+                    headers=endpoint.get("headers"),
+                    name=name,
+                ),
+                name,
+                is_retryable_webhook_error,
+            )
+        except ValueError as e:
+            logger.error(f"Error initializing webhook '{name}': {e}")
+            continue
+        batch_window = endpoint.get("batch_window", 0)
+        if batch_window > 0:
+            channel = CoalescingNotificationChannel(
+                channel,
+                window_seconds=batch_window,
+                max_items=endpoint.get("batch_size", 1),
+            )
+        channels[name] = channel
+    return channels
+
+
+def import_adapters(config: Mapping) -> None:
+    """Imports the adapter modules the settings use, without building adapters.
+
+    The factories import adapters when they build them; a server forking
+    workers calls this first so that they share the imported modules.
+    """
+    modules = [".adapters.idempotency", ".adapters.status"]
+    if config.get("SLACK_BOT_TOKEN") and config.get("SLACK_CHANNEL_ID"):
+        modules.append(".adapters.slack")
+    if config.get("SMTP_HOST"):
+        modules.append(".adapters.smtp")
+    if config.get("WEBHOOKS"):
+        modules.append(".adapters.webhook")
+    if config.get("DISPATCH_MODE") == "queue" and config.get("OUTBOX_PATH"):
+        modules.append(".adapters.outbox")
+    if config.get("DISPATCH_MODE") == "broker":
+        backend = config.get("BROKER_BACKEND", "rabbitmq")
+        if backend in _BROKER_MODULES:
+            modules.append(_BROKER_MODULES[backend])
+    for module in modules:
+        importlib.import_module(module, __package__)
+
+
+def build_async_notification_channels(
+    config: Mapping,
+) -> Dict[str, AsyncNotificationChannel]:
+    """Builds the named asyncio channels used by the ASGI app."""
+    from .adapters.async_email import AsyncEmailNotificationAdapter
+
+    channels: Dict[str, AsyncNotificationChannel] = {
+        "email": AsyncEmailNotificationAdapter()
+    }
+    slack_token = config.get("SLACK_BOT_TOKEN")
+    slack_channel_id = config.get("SLACK_CHANNEL_ID")
+    if slack_token and slack_channel_id:
+        from .adapters.async_slack import AsyncSlackNotificationAdapter
+
+        channels["slack"] = AsyncSlackNotificationAdapter(
+            token=slack_token, channel_id=slack_channel_id
+        )
+    else:
+        logger.warning("Slack is not configured. Slack notifications will not be sent.")
+    return channels
+
+
+def build_router(config: Mapping) -> RoutingTable:
+    """Compiles ``ROUTING_RULES``, a JSON list of rules or a JSON file path."""
+    rules = config["ROUTING_RULES"]
+    if isinstance(rules, str):
+        if rules.lstrip().startswith("["):
+            rules = json.loads(rules)
+        else:
+            with open(rules, encoding="utf-8") as f:
+                rules = json.load(f)
+    router = RoutingTable.from_config(rules)
+    logger.info(
+        f"Loaded {len(router.rules)} routing rules for topics {list(router.topics)}"
+    )
+    return router
+
+
+def build_message_broker(config: Mapping) -> MessageBroker:
+    """Builds the broker selected by ``BROKER_BACKEND``."""
+    backend = config.get("BROKER_BACKEND", "rabbitmq")
+    if backend == "memory":
+        from .adapters.memory_broker import InMemoryMessageBroker
+
+        return InMemoryMessageBroker()
+    if backend == "rabbitmq":
+        from .adapters.rabbitmq import RabbitMQBroker
+
+        return RabbitMQBroker(
+            url=config.get("RABBITMQ_URL"), queue_name=config.get("RABBITMQ_QUEUE")
+        )
+    raise ValueError(f"Unknown broker backend: {backend}")
+
+
+def build_idempotency_store(config: Mapping) -> IdempotencyStore:
+    """Builds the store selected by ``IDEMPOTENCY_BACKEND``."""
+    backend = config.get("IDEMPOTENCY_BACKEND", "memory")
+    if backend == "memory":
+        from .adapters.idempotency import InMemoryIdempotencyStore
+
+        return InMemoryIdempotencyStore(config.get("IDEMPOTENCY_MAX_ENTRIES", 100000))
+    if backend == "cache":
+        from .adapters.idempotency import CacheIdempotencyStore
+        from .extensions import cache
+
+        return CacheIdempotencyStore(cache)
+    raise ValueError(f"Unknown idempotency backend: {backend}")
+
+
+def build_status_store(config: Mapping) -> DeliveryStatusStore:
+    """Builds the delivery status store, with an on-disk index if configured."""
+    from .adapters.status import RingBufferStatusStore, SQLiteStatusIndex
+
+    max_age = config.get("STATUS_MAX_AGE", 86400)
+    index_path = config.get("STATUS_INDEX_PATH")
+    index = (
+        SQLiteStatusIndex(
+            index_path,
+            max_age,
+            max_pending=config.get("STATUS_INDEX_MAX_PENDING", 10000),
+        )
+        if index_path
+        else None
+    )
+    return RingBufferStatusStore(config.get("STATUS_CAPACITY", 100000), max_age, index)
+
+
+def _layer(channel: Optional[NotificationChannel], kind: type):
+    """Returns the wrapper of type ``kind`` in a channel's chain, if any."""
+    while channel is not None and not isinstance(channel, kind):
+        channel = getattr(channel, "channel", None)
+    return channel
+
+
+def hand_over_channels(
+    retired: Mapping[str, NotificationChannel],
+    successors: Mapping[str, NotificationChannel],
+) -> None:
+    """Links channels replaced by a reload to the ones replacing them.
+
+    Retries still pending when a retired channel closes are sent through
+    its successor instead of being dead-lettered, and the old and new
+    rate-limited lanes take tokens from one bucket while both are open.
+    """
+    for name, channel in retired.items():
+        successor = successors.get(name)
+        if successor is None or successor is channel:
+            continue
+        retrying = _layer(channel, RetryingNotificationChannel)
+        if retrying is not None:
+            retrying.successor = successor
+        old_lane = _layer(channel, RateLimitedNotificationChannel)
+        new_lane = _layer(successor, RateLimitedNotificationChannel)
+        if old_lane is not None and new_lane is not None:
+            old, new = old_lane.bucket, new_lane.bucket
+            if (old.rate, old.capacity) == (new.rate, new.capacity):
+                # Same pace: the new lane carries on with the tokens left.
+                new_lane.bucket = old
+            else:
+                old_lane.bucket = new
+
+
+def close_notification_channels(channels: Mapping[str, NotificationChannel]) -> None:
+    """Closes every channel, flushing anything they still buffer."""
+    for name, channel in channels.items():
+        try:
+            channel.close()
+        except Exception as e:
+            logger.error(f"Error closing channel '{name}': {e}")
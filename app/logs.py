@@ -0,0 +1,177 @@
+"""Logging pipeline: text or JSON output, optional queue-based I/O, sampling.
+
+Every record carries the ``correlation_id`` of the request it was emitted
+for (``-`` outside requests). The ID is kept in a context variable, which
+the dispatcher and the background lanes copy to their threads.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Mapping, Optional
+
+from flask import Response, g, request
+
+REQUEST_ID_HEADER = "X-Request-ID"
+NO_CORRELATION_ID = "-"
+
+correlation_id: ContextVar[str] = ContextVar(
+    "correlation_id", default=NO_CORRELATION_ID
+)
+
+TEXT_FORMAT = (
+    "[%(asctime)s.%(msecs)03d] [%(levelname)s] [%(name)s] "
+    "[%(correlation_id)s] %(message)s"
+)
+TEXT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_handler: Optional[logging.Handler] = None
+_listener: Optional[QueueListener] = None
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Stamps records with the correlation ID of the current context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the INFO and DEBUG records emitted for requests.
+
+    The decision is derived from the correlation ID, so a request is either
+    logged completely or not at all. Warnings, errors and records emitted
+    outside a request (startup, shutdown) are always kept.
+    """
+
+    def __init__(self, rate: float):
+        """Initializes the filter.
+
+        Args:
+            rate: Fraction (0-1) of requests whose INFO records are kept.
+        """
+        super().__init__()
+        self.threshold = int(rate * 10000)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        request_id = getattr(record, "correlation_id", NO_CORRELATION_ID)
+        if request_id == NO_CORRELATION_ID:
+            return True
+        return zlib.crc32(request_id.encode()) % 10000 < self.threshold
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "correlation_id": getattr(record, "correlation_id", NO_CORRELATION_ID),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _LazyQueueHandler(QueueHandler):
+    # QueueHandler.prepare() formats the message in the calling thread;
+    # leave that to the listener so the request path only enqueues.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(config: Optional[Mapping] = None) -> None:
+    """Installs the root handler described by the logging settings.
+
+    Args:
+        config: Settings with ``LOG_LEVEL``, ``LOG_FORMAT`` (``text`` or
+            ``json``), ``LOG_ASYNC`` and ``LOG_SAMPLE_RATE``. Calling it again
+            replaces the handler installed by the previous call.
+    """
+    global _handler, _listener
+    config = config or {}
+
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    output = logging.StreamHandler()
+    if config.get("LOG_FORMAT", "text") == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT, TEXT_DATE_FORMAT))
+
+    filters = [CorrelationIdFilter()]
+    sample_rate = config.get("LOG_SAMPLE_RATE", 1.0)
+    if sample_rate < 1:
+        filters.append(SamplingFilter(sample_rate))
+
+    if config.get("LOG_ASYNC", False):
+        # Filters run on the emitting thread so dropped records are never
+        # queued; formatting and I/O happen on the listener thread.
+        _handler = _LazyQueueHandler(queue.SimpleQueue())
+        _listener = QueueListener(_handler.queue, output)
+        _listener.start()
+    else:
+        _handler = output
+    for log_filter in filters:
+        _handler.addFilter(log_filter)
+
+    root.addHandler(_handler)
+    root.setLevel(config.get("LOG_LEVEL", "INFO"))
+
+
+def flush_logging() -> None:
+    """Writes out queued records and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener() -> None:
+    # The listener thread does not survive a fork: the child gets its own,
+    # on a new queue so records the parent had not written yet are not
+    # written twice.
+    global _listener
+    if _listener is not None:
+        _handler.queue = queue.SimpleQueue()
+        _listener = QueueListener(_handler.queue, *_listener.handlers)
+        _listener.start()
+
+
+atexit.register(flush_logging)
+os.register_at_fork(after_in_child=_restart_listener)
+
+
+def bind_request_id() -> None:
+    """Takes the request ID from the incoming header, or generates one."""
+    request_id = request.headers.get(REQUEST_ID_HEADER, "")[:128]
+    g.correlation_token = correlation_id.set(request_id or uuid.uuid4().hex)
+
+
+def add_request_id_header(response: Response) -> Response:
+    response.headers.setdefault(REQUEST_ID_HEADER, correlation_id.get())
+    return response
+
+
+def unbind_request_id(exc: Optional[BaseException] = None) -> None:
+    token = g.pop("correlation_token", None)
+    if token is not None:
+        correlation_id.reset(token)
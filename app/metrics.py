@@ -0,0 +1,158 @@
+"""Prometheus metrics shared by the API, the use cases and the adapters.
+
+Under Gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty directory
+before the app is imported: every worker then writes its samples to
+memory-mapped files there and ``/v1/metrics`` aggregates all of them.
+"""
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+REQUESTS = Counter(
+    "notifier_http_requests_total",
+    "HTTP requests handled, by endpoint and status code.",
+    ["endpoint", "status"],
+)
+REQUEST_SECONDS = Histogram(
+    "notifier_http_request_seconds",
+    "Time to answer an HTTP request.",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+VALIDATION_SECONDS = Histogram(
+    "notifier_validation_seconds",
+    "Time spent parsing and validating request bodies.",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+USE_CASE_SECONDS = Histogram(
+    "notifier_use_case_seconds",
+    "Time the use case took to accept a request, by topic.",
+    ["topic"],
+    buckets=LATENCY_BUCKETS,
+)
+SEND_SECONDS = Histogram(
+    "notifier_adapter_send_seconds",
+    "Latency of adapter sends, by topic and adapter.",
+    ["topic", "adapter"],
+    buckets=LATENCY_BUCKETS,
+)
+SEND_FAILURES = Counter(
+    "notifier_adapter_send_failures_total",
+    "Adapter sends that raised, by topic, adapter and error type.",
+    ["topic", "adapter", "error"],
+)
+SHED_REQUESTS = Counter(
+    "notifier_requests_shed_total",
+    "Requests turned away with 429 by admission control, by reason.",
+    ["reason"],
+)
+STATUS_INDEX_DROPPED = Counter(
+    "notifier_status_index_dropped_total",
+    "Delivery statuses not written to the on-disk index because its queue was full.",
+)
+DISPATCH_WAIT_SECONDS = Histogram(
+    "notifier_dispatch_wait_seconds",
+    "Time requests waited in a dispatch lane for a worker, by lane.",
+    ["lane"],
+    buckets=LATENCY_BUCKETS,
+)
+QUEUE_DEPTH = Gauge(
+    "notifier_queue_depth",
+    "Items waiting in an in-process queue.",
+    ["queue"],
+    multiprocess_mode="livesum",
+)
+
+
+def is_multiprocess() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def render() -> bytes:
+    """Returns every metric in the Prometheus text format."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drops the live gauges of a worker that exited (Gunicorn ``child_exit``)."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+class QueueDepthSampler:
+    """Copies queue depths into ``QUEUE_DEPTH`` from a background thread.
+
+    Sampling keeps gauge writes off the request path; the depth is at most
+    ``interval`` seconds old.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[], int]], interval: float = 1.0):
+        """Initializes the sampler.
+
+        Args:
+            sources: Queue label to a callable returning the current depth.
+            interval: Seconds between two samples.
+        """
+        self.sources = sources
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def sample(self) -> None:
+        for name, depth in self.sources.items():
+            try:
+                QUEUE_DEPTH.labels(queue=name).set(depth())
+            except Exception as e:
+                logger.error(f"Failed to sample depth of queue '{name}': {e}")
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from app.domain.models import AssistanceRequest
+
+
+class MessageBroker(ABC):
+    """Interface for handing assistance requests to delivery workers."""
+
+    @abstractmethod
+    def publish(self, request: AssistanceRequest) -> None:
+        """Publishes a request for a consumer to deliver."""
+        pass
+
+    @abstractmethod
+    def consume(
+        self,
+        on_message: Callable[[AssistanceRequest], None],
+        prefetch_count: int = 50,
+        ack_batch_size: int = 25,
+    ) -> None:
+        """Delivers published requests to ``on_message`` until ``stop`` is called.
+
+        Args:
+            on_message: Callback invoked for every received request.
+            prefetch_count: Maximum unacknowledged messages held by the consumer.
+            ack_batch_size: Number of processed messages acknowledged together.
+        """
+        pass
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Asks a running ``consume`` loop to return."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Releases connections held by the broker."""
+        pass
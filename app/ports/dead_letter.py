@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    """Messages a channel could not deliver after exhausting its retries."""
+
+    letter_id: str
+    channel: str
+    topic: str
+    messages: Tuple[str, ...]
+    error: str
+    attempts: int
+    failed_at: float
+
+
+class DeadLetterStore(ABC):
+    """Interface for keeping undeliverable messages for inspection and redrive."""
+
+    @abstractmethod
+    def add(
+        self,
+        channel: str,
+        topic: str,
+        messages: Tuple[str, ...],
+        error: str,
+        attempts: int,
+    ) -> DeadLetter:
+        """Stores the failed messages and returns the new dead letter."""
+        pass
+
+    @abstractmethod
+    def list(self, limit: int = 100) -> List[DeadLetter]:
+        """Returns the most recent dead letters, newest first."""
+        pass
+
+    @abstractmethod
+    def get(self, letter_id: str) -> Optional[DeadLetter]:
+        """Returns a dead letter, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    def pop(self, letter_id: str) -> Optional[DeadLetter]:
+        """Removes and returns a dead letter, or None if it does not exist."""
+        pass
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class IdempotencyStore(ABC):
+    """Interface for remembering the result of requests that were already handled."""
+
+    @abstractmethod
+    def claim(self, key: str, result: Any, ttl: float) -> Optional[Any]:
+        """Stores ``result`` under ``key`` unless the key is already taken.
+
+        Args:
+            key: Identifies the request.
+            result: What a repeated request should get back.
+            ttl: Seconds the key is remembered.
+
+        Returns:
+            None if the key was claimed, otherwise the result stored first.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Forgets a key, e.g. because the request it guarded failed."""
+        pass
@@ -1,4 +1,26 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Sequence
+
+
+class RateLimitedError(Exception):
+    """Raised by a channel when the remote service asks it to slow down."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PartialDeliveryError(Exception):
+    """Raised by ``send_batch`` when it failed after delivering the first messages.
+
+    Only ``remaining`` is to be sent again; ``error`` is what stopped the
+    batch and decides whether that is worth retrying.
+    """
+
+    def __init__(self, error: Exception, remaining: Sequence[str]):
+        super().__init__(f"{len(remaining)} messages not sent: {error}")
+        self.error = error
+        self.remaining = tuple(remaining)
 
 
 class NotificationChannel(ABC):
@@ -8,3 +30,50 @@ class NotificationChannel(ABC):
     def send(self, topic: str, message: str) -> None:
         """Sends a message related to a specific topic."""
         pass
+
+    def send_batch(self, topic: str, messages: Sequence[str]) -> None:
+        """Sends several messages for the same topic.
+
+        Channels that can deliver many messages in one call override this;
+        by default each message is sent on its own. An override that fails
+        after delivering some messages raises ``PartialDeliveryError``.
+        """
+        for message in messages:
+            self.send(topic=topic, message=message)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns operational counters for health and metrics reporting."""
+        return {}
+
+    def probe(self) -> None:
+        """Checks that the remote service can be reached, raising if not.
+
+        Called from a background thread by the readiness monitor, never on
+        the request path. Channels with nothing to check keep this default.
+        """
+        pass
+
+    def close(self) -> None:
+        """Flushes buffered messages and releases resources."""
+        pass
+
+
+class AsyncNotificationChannel(ABC):
+    """Interface for channels that send notifications without blocking a thread."""
+
+    @abstractmethod
+    async def send(self, topic: str, message: str) -> None:
+        """Sends a message related to a specific topic."""
+        pass
+
+    def use_session(self, session: Any) -> None:
+        """Sends HTTP requests through a session shared with other channels.
+
+        The session is closed by its owner, not by the channel. Channels
+        that do not use HTTP ignore it.
+        """
+        pass
+
+    async def close(self) -> None:
+        """Releases connections held by the channel."""
+        pass
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from app.domain.models import AssistanceRequest
+
+
+@dataclass(frozen=True)
+class OutboxEntry:
+    """An accepted request that has not been acknowledged as delivered."""
+
+    entry_id: int
+    request: AssistanceRequest
+
+
+class Outbox(ABC):
+    """Interface for durably recording accepted requests until delivery."""
+
+    @abstractmethod
+    def append(self, request: AssistanceRequest) -> int:
+        """Durably records the request and returns its entry ID."""
+        pass
+
+    @abstractmethod
+    def append_many(self, requests: Sequence[AssistanceRequest]) -> List[int]:
+        """Durably records several requests in one write and returns their IDs."""
+        pass
+
+    @abstractmethod
+    def ack(self, entry_id: int) -> None:
+        """Marks an entry as delivered so it is not replayed."""
+        pass
+
+    @abstractmethod
+    def claim_undelivered(self) -> List[OutboxEntry]:
+        """Returns undelivered entries left behind by processes that are gone."""
+        pass
+
+    @abstractmethod
+    def compact(self) -> int:
+        """Drops acknowledged entries and returns how many were removed."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flushes pending acknowledgements and releases resources."""
+        pass
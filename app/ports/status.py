@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+QUEUED = "queued"
+SENDING = "sending"
+RETRYING = "retrying"
+SENT = "sent"
+FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class DeliveryStatus:
+    """Where an accepted request is on its way to the channels."""
+
+    request_id: str
+    topic: str
+    status: str
+    channels: Tuple[str, ...]
+    attempts: int
+    error: Optional[str]
+    queued_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+
+
+class DeliveryStatusStore(ABC):
+    """Interface for tracking the delivery of accepted requests.
+
+    A request is ``queued`` when accepted, ``sending`` once routed to its
+    channels, ``retrying`` while a channel retries it, and ends ``sent``
+    when every channel delivered it or ``failed`` when one gave up.
+    Updates for unknown or evicted requests are ignored.
+    """
+
+    @abstractmethod
+    def new_id(self) -> str:
+        """Returns a request ID nobody else uses; it is not tracked yet."""
+        pass
+
+    @abstractmethod
+    def queued(self, request_id: str, topic: str) -> None:
+        """Starts tracking an accepted request."""
+        pass
+
+    @abstractmethod
+    def sending(self, request_id: str, channels: Sequence[str]) -> None:
+        """Records the channels the request was routed to."""
+        pass
+
+    @abstractmethod
+    def sent(self, request_id: str, channel: str) -> None:
+        """Records that one of the request's channels delivered it."""
+        pass
+
+    @abstractmethod
+    def retrying(self, request_id: str, channel: str, error: str) -> None:
+        """Records a failed attempt that will be retried."""
+        pass
+
+    @abstractmethod
+    def failed(self, request_id: str, channel: Optional[str], error: str) -> None:
+        """Records that the request will not be delivered."""
+        pass
+
+    @abstractmethod
+    def get(self, request_id: str) -> Optional[DeliveryStatus]:
+        """Returns the request's status, or None if it is unknown or expired."""
+        pass
+
+    def close(self) -> None:
+        """Releases any resources held by the store."""
+        pass
@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class FinishedSpan:
+    """A timed operation of a trace, as handed to exporters."""
+
+    trace_id: str
+    span_id: str
+    # None for the first span of the trace in this process.
+    parent_id: Optional[str]
+    name: str
+    start_ns: int
+    end_ns: int
+    attributes: Mapping[str, Any]
+    error: Optional[str]
+
+
+class SpanExporter(ABC):
+    """Interface for sending finished spans out of the process."""
+
+    @abstractmethod
+    def export(self, spans: Sequence[FinishedSpan]) -> None:
+        """Writes a batch of spans; called from a single background thread."""
+        pass
+
+    def close(self) -> None:
+        """Releases the exporter's resources."""
+        pass
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
 from app.domain.models import AssistanceRequest
 
 
@@ -9,3 +11,30 @@ class HandleAssistanceRequestBase(ABC):
     def execute(self, request: AssistanceRequest) -> None:
         """Processes the assistance request and routes it."""
         pass
+
+    def execute_batch(
+        self, requests: Sequence[AssistanceRequest]
+    ) -> List[Optional[Exception]]:
+        """Processes several requests in one call.
+
+        Returns:
+            One entry per request: None if it was accepted, otherwise the
+            exception that rejected it.
+        """
+        results: List[Optional[Exception]] = []
+        for request in requests:
+            try:
+                self.execute(request)
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class AsyncHandleAssistanceRequestBase(ABC):
+    """Interface for the asyncio version of the assistance request use case."""
+
+    @abstractmethod
+    async def execute(self, request: AssistanceRequest) -> None:
+        """Processes the assistance request and routes it."""
+        pass
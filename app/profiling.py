@@ -0,0 +1,78 @@
+"""On-demand sampling profiler for the threads of this process.
+
+``sample_stacks`` reads the stack of every thread at a fixed interval and
+counts identical stacks; ``collapse`` renders the counts in the folded
+format read by flamegraph.pl, speedscope and similar tools, one
+``thread;outermost;...;innermost count`` line per stack. Sampling walks
+the frames from a separate thread, so the profiled code runs unchanged;
+its cost is paid by that thread while a profile is taken.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Counter as CounterType
+from typing import Dict, List
+
+# One profile at a time: samples of concurrent profiles would include
+# each other's sampling threads.
+_profiling = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{frame.f_globals.get('__name__', '?')}.{name}"
+
+
+def sample_stacks(seconds: float, interval: float = 0.01) -> CounterType[str]:
+    """Samples the stacks of every other thread for ``seconds``.
+
+    Args:
+        seconds: How long to sample.
+        interval: Seconds between two samples.
+
+    Returns:
+        How many samples saw each stack, keyed by folded stack.
+
+    Raises:
+        ProfilerBusyError: If another profile is being taken.
+    """
+    if not _profiling.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already being taken.")
+    try:
+        stacks: CounterType[str] = Counter()
+        me = threading.get_ident()
+        labels: Dict[object, str] = {}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    # Labels are cached per code object; frames of one
+                    # function share it.
+                    label = labels.get(frame.f_code)
+                    if label is None:
+                        label = labels[frame.f_code] = _frame_label(frame)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                stacks[";".join(stack)] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _profiling.release()
+
+
+def collapse(stacks: CounterType[str]) -> str:
+    """Renders sampled stacks in the folded format, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
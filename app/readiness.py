@@ -0,0 +1,225 @@
+"""Whether this process should be sent traffic, for load balancers.
+
+``ReadinessMonitor`` probes the remote service of every channel from
+background threads and, every ``interval``, combines the cached results
+with how full the dispatch lanes, channel lanes and admission slots are
+into a pre-rendered answer. ``GET /v1/health/ready`` returns that answer
+as is, so polling it never costs an outbound call.
+
+A process is not ready when a configured channel failed to initialize or
+when a queue is fuller than ``max_utilization``, which is set below the
+admission thresholds so that it leaves rotation before it sheds requests.
+An unreachable service only makes it ``degraded``: every replica shares
+that service, and taking them all out of rotation would turn an outage of
+one channel into an outage of the API.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .ports.notification import NotificationChannel
+
+logger = logging.getLogger(__name__)
+
+NOT_STARTED = (503, b'{"status": "not_ready", "reasons": ["starting"]}')
+
+
+class ProbeResult(NamedTuple):
+    channel: NotificationChannel
+    # time.monotonic() when the probe ended.
+    checked_at: float
+    latency: float
+    error: Optional[str]
+
+
+class ReadinessMonitor:
+    """Keeps a ready-to-serve readiness answer up to date from a thread."""
+
+    def __init__(
+        self,
+        channels: Callable[[], Mapping[str, NotificationChannel]],
+        expected: Callable[[], Iterable[str]],
+        gauges: Optional[Mapping[str, Callable[[], Tuple[int, int]]]] = None,
+        interval: float = 1.0,
+        probe_interval: float = 30.0,
+        probe_ttl: float = 90.0,
+        max_utilization: float = 0.7,
+        probe_workers: int = 4,
+    ):
+        """Initializes the monitor.
+
+        Args:
+            channels: Returns the channels currently in use; called on every
+                refresh since a reload may replace them.
+            expected: Returns the names of the channels the settings
+                configure.
+            gauges: Queue label to a callable returning its depth and
+                capacity. Channel lanes reporting ``queue_depth`` and
+                ``queue_capacity`` in their stats are added to them.
+            interval: Seconds between two refreshes of the answer.
+            probe_interval: Seconds between two probes of a channel.
+            probe_ttl: Seconds after which a probe result is reported as
+                ``unknown`` rather than trusted.
+            max_utilization: Fill ratio of any queue past which the process
+                is not ready.
+            probe_workers: Channels probed at the same time.
+        """
+        self.channels = channels
+        self.expected = expected
+        self.gauges = dict(gauges or {})
+        self.interval = interval
+        self.probe_interval = probe_interval
+        self.probe_ttl = probe_ttl
+        self.max_utilization = max_utilization
+        self.snapshot: Tuple[int, bytes] = NOT_STARTED
+        self._probes: Dict[str, ProbeResult] = {}
+        # Channel name to (channel, time.monotonic()) of its last probe start.
+        self._probe_started: Dict[str, Tuple[NotificationChannel, float]] = {}
+        self._probing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=probe_workers, thread_name_prefix="readiness-probe"
+        )
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Computes a first answer, then refreshes it from a thread."""
+        self.refresh()
+        self._thread = threading.Thread(
+            target=self._run, name="readiness-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def refresh(self) -> None:
+        """Starts the probes that are due and renders a new answer."""
+        now = time.monotonic()
+        channels = dict(self.channels())
+        reasons: List[str] = []
+        degraded = False
+        report: Dict[str, Dict[str, Any]] = {}
+        gauges: Dict[str, Tuple[int, int]] = {}
+
+        for name in self.expected():
+            if name not in channels:
+                report[name] = {"status": "failed"}
+                reasons.append(f"channel '{name}' failed to initialize")
+
+        for name, channel in channels.items():
+            self._schedule_probe(name, channel, now)
+            result = self._probes.get(name)
+            if (
+                result is None
+                or result.channel is not channel
+                or now - result.checked_at > self.probe_ttl
+            ):
+                entry: Dict[str, Any] = {"status": "unknown"}
+            else:
+                entry = {
+                    "status": "unreachable" if result.error else "ok",
+                    "checked_seconds_ago": round(now - result.checked_at, 1),
+                    "latency_ms": round(result.latency * 1000, 1),
+                }
+                if result.error:
+                    entry["error"] = result.error
+                    degraded = True
+            try:
+                stats = channel.stats()
+            except Exception as e:
+                logger.error(f"Failed to read stats of channel '{name}': {e}")
+                stats = {}
+            if "circuit" in stats:
+                entry["circuit"] = stats["circuit"]
+                degraded = degraded or stats["circuit"] == "open"
+            if stats.get("queue_capacity"):
+                gauges[f"lane:{name}"] = (stats["queue_depth"], stats["queue_capacity"])
+            report[name] = entry
+
+        for name, gauge in self.gauges.items():
+            try:
+                gauges[name] = gauge()
+            except Exception as e:
+                logger.error(f"Failed to read saturation of '{name}': {e}")
+
+        saturation: Dict[str, Dict[str, Any]] = {}
+        for name, (depth, capacity) in gauges.items():
+            utilization = depth / capacity if capacity else 0.0
+            saturation[name] = {
+                "depth": depth,
+                "capacity": capacity,
+                "utilization": round(utilization, 3),
+            }
+            if utilization >= self.max_utilization:
+                reasons.append(f"'{name}' is {utilization:.0%} full")
+
+        status = "not_ready" if reasons else "degraded" if degraded else "ready"
+        body = {
+            "status": status,
+            "reasons": reasons,
+            "channels": report,
+            "saturation": saturation,
+        }
+        self.snapshot = (503 if reasons else 200, json.dumps(body).encode())
+
+    def _schedule_probe(
+        self, name: str, channel: NotificationChannel, now: float
+    ) -> None:
+        with self._lock:
+            if name in self._probing:
+                return
+            started = self._probe_started.get(name)
+            if (
+                started is not None
+                and started[0] is channel
+                and now - started[1] < self.probe_interval
+            ):
+                return
+            self._probing.add(name)
+            self._probe_started[name] = (channel, now)
+        try:
+            self._executor.submit(self._probe, name, channel)
+        except RuntimeError:
+            # Stopped while refreshing.
+            with self._lock:
+                self._probing.discard(name)
+
+    def _probe(self, name: str, channel: NotificationChannel) -> None:
+        start = time.monotonic()
+        error = None
+        try:
+            channel.probe()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.warning(f"Probe of channel '{name}' failed: {error}")
+        end = time.monotonic()
+        with self._lock:
+            self._probes[name] = ProbeResult(channel, end, end - start, error)
+            self._probing.discard(name)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh readiness: {e}", exc_info=True)
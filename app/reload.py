@@ -0,0 +1,208 @@
+"""Reloading routing rules and channel settings without a restart.
+
+``CONFIG_RELOAD_PATH`` names a JSON object of settings (for instance
+``ROUTING_RULES`` or ``SLACK_CHANNEL_ID``) applied over the environment
+configuration. The file is polled for changes and re-read at once on SIGHUP.
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from .factories import (
+    build_notification_channels,
+    build_router,
+    close_notification_channels,
+    hand_over_channels,
+)
+from .domain.routing import RoutingTable
+from .ports.dead_letter import DeadLetterStore
+from .ports.notification import NotificationChannel
+from .use_cases.handle_request import HandleAssistanceRequest
+
+logger = logging.getLogger(__name__)
+
+# Settings read by build_notification_channels; changing any of them
+# rebuilds the channels, anything else only recompiles the routing rules.
+CHANNEL_SETTING_PREFIXES = ("SLACK_", "SMTP_", "WEBHOOK", "RETRY_", "CIRCUIT_")
+
+
+def load_overrides(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path} must hold a JSON object of settings.")
+    return overrides
+
+
+def _channel_settings(settings: Mapping) -> Dict[str, Any]:
+    return {
+        key: value
+        for key, value in settings.items()
+        if key.startswith(CHANNEL_SETTING_PREFIXES)
+    }
+
+
+class RoutingReloader:
+    """Rebuilds the routing table, and the channels if needed, of a handler.
+
+    Channels are only rebuilt when a setting they read changed, so a rules
+    change keeps the open Slack and SMTP connections. Replaced channels
+    are closed after ``drain_seconds``, once requests still using them have
+    finished; their pending retries then move to the channels replacing
+    them, and their rate-limited lanes share a token bucket with the new
+    ones in the meantime.
+    """
+
+    def __init__(
+        self,
+        handler: HandleAssistanceRequest,
+        config: Mapping,
+        dead_letters: Optional[DeadLetterStore] = None,
+        drain_seconds: float = 30.0,
+        on_reload: Optional[
+            Callable[[Dict[str, NotificationChannel], RoutingTable], None]
+        ] = None,
+    ):
+        """Initializes the reloader.
+
+        Args:
+            handler: The use case whose channels and rules are replaced.
+            config: The settings the handler was built from; overrides are
+                applied on top of them.
+            dead_letters: Store given to rebuilt channels.
+            drain_seconds: Delay before replaced channels are closed.
+            on_reload: Called with the new channels and routing table.
+        """
+        self.handler = handler
+        self.config = dict(config)
+        self.settings = self.config
+        self.dead_letters = dead_letters
+        self.drain_seconds = drain_seconds
+        self.on_reload = on_reload
+        self.reloads = 0
+
+    def apply(self, overrides: Mapping) -> None:
+        """Routes later requests with the settings overridden by ``overrides``.
+
+        Invalid rules or channel settings raise before anything is replaced.
+        """
+        settings = {**self.config, **overrides}
+        router = build_router(settings)
+        retired: Optional[Dict[str, NotificationChannel]] = None
+        channels = self.handler.channels
+        if _channel_settings(settings) != _channel_settings(self.settings):
+            retired = channels
+            channels = build_notification_channels(settings, self.dead_letters)
+            hand_over_channels(retired, channels)
+
+        self.handler.reconfigure(channels, router)
+        self.settings = settings
+        self.reloads += 1
+        if self.on_reload is not None:
+            self.on_reload(channels, router)
+        logger.info(
+            f"Configuration reloaded: {len(router.rules)} rules, "
+            f"channels {'rebuilt' if retired is not None else 'kept'}"
+        )
+
+        if retired is not None:
+            timer = threading.Timer(
+                self.drain_seconds, close_notification_channels, args=(retired,)
+            )
+            timer.daemon = True
+            timer.start()
+
+
+class ConfigWatcher:
+    """Calls ``on_change`` with the settings of a JSON file when it changes.
+
+    The file is checked every ``interval`` seconds from a background thread,
+    or at once after ``trigger`` (used by the SIGHUP handler). A file that
+    cannot be read or applied leaves the current configuration in place.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[Dict[str, Any]], None],
+        interval: float = 2.0,
+    ):
+        """Initializes the watcher.
+
+        Args:
+            path: The JSON file of settings.
+            on_change: Applies the settings read from the file.
+            interval: Seconds between two checks of the file.
+        """
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Applies the file once, then watches it in the background."""
+        self.check()
+        self._thread = threading.Thread(
+            target=self._run, name="config-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def trigger(self) -> None:
+        """Re-reads the file on the watcher thread, even if it did not change."""
+        self._stamp = None
+        self._wake.set()
+
+    def install_signal_handler(self) -> None:
+        """Reloads on SIGHUP; only possible from the main thread."""
+        if not hasattr(signal, "SIGHUP"):
+            return
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.trigger())
+        except ValueError:
+            logger.warning("Not on the main thread, SIGHUP will not reload settings")
+
+    def check(self) -> bool:
+        """Applies the file if it changed since the last check.
+
+        Returns:
+            Whether new settings were applied.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            logger.error(f"Cannot read settings file {self.path}: {e}")
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+
+        try:
+            self.on_change(load_overrides(self.path))
+        except Exception as e:
+            logger.error(
+                f"Keeping the current configuration, reloading {self.path} failed: {e}",
+                exc_info=True,
+            )
+            return False
+        return True
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stopped:
+                self.check()
@@ -0,0 +1,261 @@
+"""Offline replay of JSONL files of assistance requests.
+
+Each line holds a request body as accepted by ``/v1/notify``. Lines are
+read one at a time, validated with ``AssistanceRequestSchema`` and handed
+to the use case by a bounded number of threads, so memory stays the same
+whatever the size of the file. A checkpoint records the byte offset up to
+which every line was handled, so an interrupted replay resumes there.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import IO, Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .adapters.status import RingBufferStatusStore
+from .api.schemas.schemas import AssistanceRequestSchema
+from .domain.models import AssistanceRequest
+from .ports.status import FAILED
+from .use_cases.handle_request import HandleAssistanceRequest
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayItem(NamedTuple):
+    line: int
+    # Offset just past the line, where a replay resumes once it is handled.
+    end_offset: int
+    raw: bytes
+    request: Optional[AssistanceRequest]
+    errors: Dict[str, Any]
+
+
+class ReplayReport(NamedTuple):
+    sent: int
+    failed: int
+    invalid: int
+    # Offset and line number the next replay of the file starts from.
+    offset: int
+    lines: int
+
+
+class Checkpoint:
+    """Progress of a replay, saved atomically to a small JSON file."""
+
+    def __init__(self, path: str, source: str):
+        """Initializes the checkpoint.
+
+        Args:
+            path: Location of the checkpoint file.
+            source: The replayed file; a checkpoint of another file is
+                rejected.
+        """
+        self.path = path
+        self.source = os.path.abspath(source)
+
+    def load(self) -> Tuple[int, int]:
+        """Returns the offset and line number to resume from."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return 0, 0
+        if state.get("source") != self.source:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to {state.get('source')}, "
+                f"not {self.source}."
+            )
+        return state["offset"], state["lines"]
+
+    def save(self, offset: int, lines: int) -> None:
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "offset": offset, "lines": lines}, f)
+        os.replace(temporary, self.path)
+
+
+def read_requests(
+    path: str,
+    schema: AssistanceRequestSchema,
+    offset: int = 0,
+    line: int = 0,
+) -> Iterator[ReplayItem]:
+    """Yields the lines of a JSONL file from ``offset``, validated.
+
+    Args:
+        path: The JSONL file.
+        schema: Validates each request body.
+        offset: Byte offset to start reading at.
+        line: Number of the line before ``offset``.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            offset += len(raw)
+            line += 1
+            if not raw.strip():
+                continue
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                yield ReplayItem(
+                    line, offset, raw, None, {"_schema": ["Invalid JSON."]}
+                )
+                continue
+            errors = schema.validate(body)
+            if errors:
+                yield ReplayItem(line, offset, raw, None, errors)
+                continue
+            request = AssistanceRequest(
+                topic=body["topic"],
+                description=body["description"],
+                priority=body.get("priority"),
+            )
+            yield ReplayItem(line, offset, raw, request, {})
+
+
+class ReplayRunner:
+    """Hands replayed requests to the use case with bounded parallelism.
+
+    At most ``parallelism`` requests are handled at once, and reading
+    stops while ``window`` lines are between the checkpoint and the
+    newest line read, so one slow request cannot make the runner hold
+    an unbounded number of finished ones.
+    """
+
+    def __init__(
+        self,
+        handler: HandleAssistanceRequest,
+        parallelism: int = 8,
+        checkpoint: Optional[Checkpoint] = None,
+        failures: Optional[IO[bytes]] = None,
+        checkpoint_interval: float = 1.0,
+    ):
+        """Initializes the runner.
+
+        Args:
+            handler: The use case delivering the requests; its status store
+                is replaced to learn how each delivery ended.
+            parallelism: Requests handled at the same time.
+            checkpoint: Where progress is saved.
+            failures: Receives the lines whose delivery failed, unchanged,
+                so they can be replayed again.
+            checkpoint_interval: Seconds between two checkpoint saves.
+        """
+        if parallelism < 1:
+            raise ValueError("Replay parallelism must be positive.")
+
+        self.handler = handler
+        self.parallelism = parallelism
+        self.window = parallelism * 16
+        self.checkpoint = checkpoint
+        self.failures = failures
+        self.checkpoint_interval = checkpoint_interval
+        handler.statuses = RingBufferStatusStore(capacity=self.window * 2)
+        self._counts = {"sent": 0, "failed": 0, "invalid": 0}
+        # Lines read and not yet covered by the checkpoint, oldest first:
+        # [line, end offset, handled].
+        self._pending: Deque[List[Any]] = deque()
+        self._in_flight = 0
+        self._done_offset = 0
+        self._done_lines = 0
+        self._saved_at = 0.0
+        self._stopped = False
+        self._condition = threading.Condition()
+
+    def stop(self) -> None:
+        """Stops reading; requests already started are finished."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def run(
+        self, items: Iterator[ReplayItem], offset: int = 0, lines: int = 0
+    ) -> ReplayReport:
+        """Replays the items until they run out or ``stop`` is called.
+
+        Args:
+            items: The validated lines, e.g. from ``read_requests``.
+            offset: Offset the items start after.
+            lines: Number of the line before the first item.
+        """
+        self._done_offset, self._done_lines = offset, lines
+        with ThreadPoolExecutor(
+            max_workers=self.parallelism, thread_name_prefix="replay"
+        ) as pool:
+            for item in items:
+                with self._condition:
+                    while not self._stopped and (
+                        self._in_flight >= self.parallelism
+                        or len(self._pending) >= self.window
+                    ):
+                        self._condition.wait()
+                    if self._stopped:
+                        break
+                    entry = [item.line, item.end_offset, False]
+                    self._pending.append(entry)
+                    if item.request is not None:
+                        self._in_flight += 1
+                if item.request is None:
+                    logger.warning(
+                        f"Skipping invalid line {item.line}: {json.dumps(item.errors)}"
+                    )
+                    self._finish(entry, "invalid")
+                else:
+                    pool.submit(self._handle, item, entry)
+
+        self._save(force=True)
+        return ReplayReport(
+            sent=self._counts["sent"],
+            failed=self._counts["failed"],
+            invalid=self._counts["invalid"],
+            offset=self._done_offset,
+            lines=self._done_lines,
+        )
+
+    def _handle(self, item: ReplayItem, entry: List[Any]) -> None:
+        statuses = self.handler.statuses
+        request_id = statuses.new_id()
+        statuses.queued(request_id, item.request.topic)
+        try:
+            self.handler.execute(replace(item.request, request_id=request_id))
+        except Exception as e:
+            logger.error(f"Failed to replay line {item.line}: {e}", exc_info=True)
+            statuses.failed(request_id, None, str(e))
+        status = statuses.get(request_id)
+        failed = status is not None and status.status == FAILED
+        if failed:
+            logger.warning(f"Delivery of line {item.line} failed: {status.error}")
+            if self.failures is not None:
+                with self._condition:
+                    self.failures.write(item.raw.rstrip(b"\r\n") + b"\n")
+        with self._condition:
+            self._in_flight -= 1
+        self._finish(entry, "failed" if failed else "sent")
+
+    def _finish(self, entry: List[Any], outcome: str) -> None:
+        with self._condition:
+            entry[2] = True
+            self._counts[outcome] += 1
+            while self._pending and self._pending[0][2]:
+                self._done_lines, self._done_offset, _ = self._pending.popleft()
+            self._condition.notify_all()
+        self._save()
+
+    def _save(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if self.checkpoint is None:
+            return
+        with self._condition:
+            if not force and now - self._saved_at < self.checkpoint_interval:
+                return
+            self._saved_at = now
+            if self.failures is not None:
+                # Failures must be on disk before the lines are skipped.
+                self.failures.flush()
+            self.checkpoint.save(self._done_offset, self._done_lines)
@@ -0,0 +1,343 @@
+"""Spans following a request through the API, the use case and the channels.
+
+A request starts a trace, or continues the one named by its W3C
+``traceparent`` header, and the code it runs opens child spans with
+``span()``. The current span lives in a context variable, which is copied
+to the dispatcher, fan-out threads, rate-limited lanes and scheduled
+retries, so their spans join the request's trace.
+
+Whether a trace is recorded is decided once, at its start: by the
+caller's sampled flag when it sent a ``traceparent``, otherwise with
+probability ``TRACE_SAMPLE_RATE``. Spans of traces that are not recorded
+cost a context variable lookup. Finished spans are queued and exported in
+batches by a background thread.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Mapping, Optional
+
+from flask import Response, g, request
+
+from .ports.tracing import FinishedSpan, SpanExporter
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class Span:
+    """An operation being timed; only recorded when its trace is sampled."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "sampled",
+        "name",
+        "start_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        parent_id: Optional[str],
+        sampled: bool,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        """The ``traceparent`` header making a callee's spans children of this one."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        if self.sampled:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.sampled and _processor is not None:
+            _processor.submit(
+                FinishedSpan(
+                    trace_id=self.trace_id,
+                    span_id=self.span_id,
+                    parent_id=self.parent_id,
+                    name=self.name,
+                    start_ns=self.start_ns,
+                    end_ns=time.time_ns(),
+                    attributes=self.attributes,
+                    error=self.error,
+                )
+            )
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _Scope:
+    __slots__ = ("span", "token")
+
+    def __init__(self, span: Span):
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        current_span.reset(self.token)
+        if exc is not None:
+            self.span.record_error(exc)
+        self.span.end()
+
+
+class _NoScope:
+    # Returned for spans of traces that are not recorded.
+    __slots__ = ()
+
+    def __enter__(self) -> Span:
+        return _NOT_RECORDED
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOT_RECORDED = Span("0" * 32, None, False, "")
+_NO_SCOPE = _NoScope()
+
+
+def span(name: str, **attributes: Any):
+    """Times the enclosed block as a child of the current span.
+
+    Used as ``with span("route", topic=topic) as s:``; the span is only
+    recorded when the current trace is sampled.
+    """
+    parent = current_span.get()
+    if parent is None or not parent.sampled:
+        return _NO_SCOPE
+    return _Scope(Span(parent.trace_id, parent.span_id, True, name, attributes))
+
+
+def current_traceparent() -> Optional[str]:
+    """The ``traceparent`` header to send to downstream services, if any."""
+    parent = current_span.get()
+    return parent.traceparent if parent is not None else None
+
+
+class BatchSpanProcessor:
+    """Queues finished spans and exports them in batches from a thread.
+
+    The queue is bounded: spans finished while it is full are dropped and
+    counted rather than slowing requests down. The thread is started on
+    the first span, again in a forked child.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 10000,
+        batch_size: int = 512,
+        interval: float = 2.0,
+    ):
+        """Initializes the processor.
+
+        Args:
+            exporter: Writes the batches out.
+            max_queue_size: Spans waiting for export before new ones are
+                dropped.
+            batch_size: Spans exported at once.
+            interval: Seconds a span may wait for its batch to fill.
+        """
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[FinishedSpan]]" = queue.Queue(max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def submit(self, finished: FinishedSpan) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Exports the queued spans and stops the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            running = thread is not None and self._pid == os.getpid()
+        if running:
+            self._queue.put(None)
+            thread.join(timeout=10)
+        self.exporter.close()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the parent's thread and queued spans stay there.
+                self._queue = queue.Queue(self.max_queue_size)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="span-exporter", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        spans_queue = self._queue
+        while True:
+            batch: List[FinishedSpan] = []
+            deadline = time.monotonic() + self.interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = spans_queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning(f"Failed to export {len(batch)} spans: {e}")
+            if stop:
+                return
+
+
+_processor: Optional[BatchSpanProcessor] = None
+_sample_rate = 0.0
+
+
+def configure_tracing(
+    config: Optional[Mapping] = None, exporter: Optional[SpanExporter] = None
+) -> None:
+    """Installs the exporter described by the tracing settings.
+
+    Args:
+        config: Settings with ``TRACE_EXPORTER`` (``none``, ``file`` or
+            ``otlp``), ``TRACE_SAMPLE_RATE`` and the exporter's settings.
+            Calling it again replaces the exporter of the previous call.
+        exporter: Used instead of the one ``TRACE_EXPORTER`` names.
+    """
+    global _processor, _sample_rate
+    config = config or {}
+    flush_tracing()
+    if exporter is None:
+        exporter = _build_exporter(config)
+    _sample_rate = config.get("TRACE_SAMPLE_RATE", 0.01)
+    if exporter is not None:
+        _processor = BatchSpanProcessor(
+            exporter,
+            max_queue_size=config.get("TRACE_MAX_QUEUE_SIZE", 10000),
+        )
+
+
+def _build_exporter(config: Mapping) -> Optional[SpanExporter]:
+    backend = config.get("TRACE_EXPORTER", "none")
+    service = config.get("TRACE_SERVICE_NAME", "notifier-api")
+    if backend == "none":
+        return None
+    if backend == "file":
+        from .adapters.tracing import FileSpanExporter
+
+        return FileSpanExporter(
+            config.get("TRACE_EXPORT_PATH", "traces.jsonl"), service
+        )
+    if backend == "otlp":
+        from .adapters.tracing import OTLPSpanExporter
+
+        return OTLPSpanExporter(
+            config.get("TRACE_OTLP_URL", "http://localhost:4318/v1/traces"), service
+        )
+    raise ValueError(f"Unknown trace exporter: {backend}")
+
+
+def flush_tracing() -> None:
+    """Exports the queued spans and stops the exporter thread."""
+    global _processor
+    if _processor is not None:
+        _processor.close()
+        _processor = None
+
+
+atexit.register(flush_tracing)
+
+
+def start_request_trace() -> None:
+    """Opens the span of the request, continuing the caller's trace if any."""
+    if _processor is None:
+        return
+    match = _TRACEPARENT.match(request.headers.get(TRACEPARENT_HEADER, ""))
+    if match is not None and match.group(1) != "0" * 32 and match.group(2) != "0" * 16:
+        trace_id, parent_id = match.group(1), match.group(2)
+        sampled = bool(int(match.group(3), 16) & 1)
+    else:
+        trace_id, parent_id = _new_id(16), None
+        sampled = random.random() < _sample_rate
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    root = Span(
+        trace_id,
+        parent_id,
+        sampled,
+        f"{request.method} {endpoint}",
+        {"http.method": request.method, "http.route": endpoint} if sampled else None,
+    )
+    g.trace_span = root
+    g.trace_token = current_span.set(root)
+
+
+def tag_response(response: Response) -> Response:
+    root = g.get("trace_span")
+    if root is not None:
+        root.set_attribute("http.status_code", response.status_code)
+    return response
+
+
+def end_request_trace(exc: Optional[BaseException] = None) -> None:
+    token = g.pop("trace_token", None)
+    if token is None:
+        return
+    current_span.reset(token)
+    root = g.pop("trace_span")
+    if exc is not None:
+        root.record_error(exc)
+    root.end()
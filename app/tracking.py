@@ -0,0 +1,51 @@
+"""Reports delivery outcomes from deep in the channel chain.
+
+The handler sets ``current_delivery`` before sending a request to one of
+its channels. The wrappers that learn how the send ended report it
+through the helpers below; they read the delivery from the context, so
+the channel interface is unchanged and untracked sends cost one lookup.
+The context is copied to fan-out threads, rate-limited lanes and
+scheduled retries, so reports made there reach the right request.
+"""
+
+from contextvars import ContextVar
+from typing import NamedTuple, Optional, Tuple
+
+from .ports.status import DeliveryStatusStore
+
+
+class Delivery(NamedTuple):
+    store: DeliveryStatusStore
+    # Several when coalesced requests are sent as one batch.
+    request_ids: Tuple[str, ...]
+    channel: str
+
+
+current_delivery: ContextVar[Optional[Delivery]] = ContextVar(
+    "current_delivery", default=None
+)
+
+
+def report_sent() -> None:
+    delivery = current_delivery.get()
+    if delivery is not None:
+        for request_id in delivery.request_ids:
+            delivery.store.sent(request_id, delivery.channel)
+
+
+def report_retrying(error: Exception) -> None:
+    delivery = current_delivery.get()
+    if delivery is not None:
+        for request_id in delivery.request_ids:
+            delivery.store.retrying(
+                request_id, delivery.channel, f"{type(error).__name__}: {error}"
+            )
+
+
+def report_failed(error: Exception) -> None:
+    delivery = current_delivery.get()
+    if delivery is not None:
+        for request_id in delivery.request_ids:
+            delivery.store.failed(
+                request_id, delivery.channel, f"{type(error).__name__}: {error}"
+            )
@@ -0,0 +1,265 @@
+import contextvars
+import logging
+import queue
+import threading
+import time
+from typing import List, Mapping, Optional, Sequence
+
+from app.domain.models import AssistanceRequest
+from app.metrics import DISPATCH_WAIT_SECONDS
+from app.ports.outbox import Outbox
+from app.ports.use_cases import HandleAssistanceRequestBase
+from app.use_cases.lanes import PriorityLanes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANE_WEIGHTS = {"high": 8, "normal": 3, "low": 1}
+
+
+class DispatchQueueFullError(Exception):
+    """Raised when the dispatch queue cannot accept more requests."""
+
+
+class QueuedAssistanceRequestDispatcher(HandleAssistanceRequestBase):
+    """Hands requests to bounded priority lanes drained by worker threads.
+
+    ``execute`` only enqueues the request, so callers return as soon as the
+    request is accepted. Each request is queued in the lane of its priority
+    (its own, else its topic's) and workers take turns between lanes by
+    weight, so a backlog of low-priority requests does not hold up urgent
+    ones. The wrapped handler runs on the worker threads, in a copy of the
+    caller's context so the request's correlation ID follows it. When an
+    outbox is given, each request is durably recorded before it is queued
+    and acknowledged once the handler has processed it.
+
+    The outbox only covers the dispatcher's own lanes. The handler returns
+    once every channel has taken the message, which may only have queued
+    it: in a rate-limited lane, a coalescing buffer or a scheduled retry.
+    Messages held there when the process dies are lost; retries that run
+    out end in the dead-letter store.
+    """
+
+    def __init__(
+        self,
+        handler: HandleAssistanceRequestBase,
+        workers: int = 4,
+        queue_size: int = 1000,
+        outbox: Optional[Outbox] = None,
+        lane_weights: Optional[Mapping[str, int]] = None,
+        topic_priorities: Optional[Mapping[str, str]] = None,
+        default_priority: str = "normal",
+        strict_priority: bool = False,
+        replay_interval: float = 0.0,
+    ):
+        """Initializes the dispatcher.
+
+        Args:
+            handler: The use case that performs the actual delivery.
+            workers: Number of worker threads draining the lanes.
+            queue_size: Maximum number of requests waiting in each lane.
+            outbox: Optional durable log of accepted, undelivered requests.
+            lane_weights: Priority to its share of the workers' turns,
+                highest priority first.
+            topic_priorities: Priority of requests that do not set one.
+            default_priority: Lane of everything else.
+            strict_priority: Always serve higher lanes first instead of
+                sharing turns by weight.
+            replay_interval: Seconds between two ``replay`` calls while
+                running, which pick up the entries of processes that died
+                after this one started; 0 leaves replaying to the caller.
+        """
+        if workers < 1:
+            raise ValueError("Dispatcher needs at least one worker.")
+        if queue_size < 1:
+            raise ValueError("Dispatch queue size must be positive.")
+        lane_weights = lane_weights or DEFAULT_LANE_WEIGHTS
+        if default_priority not in lane_weights:
+            raise ValueError(f"Default priority {default_priority!r} has no lane.")
+
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.outbox = outbox
+        self.topic_priorities = dict(topic_priorities or {})
+        self.default_priority = default_priority
+        self._lanes = PriorityLanes(lane_weights, queue_size, strict=strict_priority)
+        self._waits = {
+            lane: DISPATCH_WAIT_SECONDS.labels(lane=lane) for lane in lane_weights
+        }
+        self.replay_interval = replay_interval
+        self._threads: List[threading.Thread] = []
+        self._replayer: Optional[threading.Thread] = None
+        self._stop_replaying = threading.Event()
+        self._accepting = False
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a worker."""
+        return len(self._lanes)
+
+    def lane_depth(self, lane: str) -> int:
+        """Number of requests waiting in one lane."""
+        return self._lanes.depth(lane)
+
+    def lane_served(self, lane: str) -> int:
+        """Number of requests workers have taken from one lane so far."""
+        return self._lanes.served(lane)
+
+    def lane_of(self, request: AssistanceRequest) -> str:
+        priority = request.priority or self.topic_priorities.get(request.topic)
+        return priority if priority in self._lanes.weights else self.default_priority
+
+    def start(self) -> None:
+        """Starts the worker threads. Calling it twice is a no-op."""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"dispatch-worker-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            if self.outbox is not None and self.replay_interval > 0:
+                self._replayer = threading.Thread(
+                    target=self._run_replay, name="outbox-replay", daemon=True
+                )
+                self._replayer.start()
+            self._accepting = True
+        logger.info(
+            f"Dispatcher started with {self.workers} workers "
+            f"(queue size {self.queue_size})"
+        )
+
+    def execute(self, request: AssistanceRequest) -> None:
+        """Queues the request for delivery without waiting for it."""
+        if not self._accepting:
+            raise DispatchQueueFullError("Dispatcher is not accepting requests.")
+        lane = self.lane_of(request)
+        entry_id = self.outbox.append(request) if self.outbox else None
+        try:
+            self._lanes.put(lane, (request, entry_id, contextvars.copy_context()))
+        except queue.Full:
+            if entry_id is not None:
+                # The caller is told to retry, so the entry must not be replayed.
+                self.outbox.ack(entry_id)
+            raise DispatchQueueFullError(
+                f"Dispatch lane '{lane}' is full ({self.queue_size} pending requests)."
+            ) from None
+
+    def execute_batch(
+        self, requests: Sequence[AssistanceRequest]
+    ) -> List[Optional[Exception]]:
+        """Queues the requests, recording them in the outbox with one write."""
+        if not self._accepting:
+            error = DispatchQueueFullError("Dispatcher is not accepting requests.")
+            return [error] * len(requests)
+
+        entry_ids: List[Optional[int]] = (
+            self.outbox.append_many(requests) if self.outbox else [None] * len(requests)
+        )
+        results: List[Optional[Exception]] = []
+        for request, entry_id in zip(requests, entry_ids):
+            # A context can only be entered by one thread at a time.
+            context = contextvars.copy_context()
+            lane = self.lane_of(request)
+            try:
+                self._lanes.put(lane, (request, entry_id, context))
+                results.append(None)
+            except queue.Full:
+                if entry_id is not None:
+                    self.outbox.ack(entry_id)
+                results.append(
+                    DispatchQueueFullError(
+                        f"Dispatch lane '{lane}' is full "
+                        f"({self.queue_size} pending requests)."
+                    )
+                )
+        return results
+
+    def replay(self) -> int:
+        """Re-queues undelivered outbox entries left by a previous process.
+
+        Returns:
+            The number of requests queued for redelivery.
+        """
+        if self.outbox is None:
+            return 0
+
+        entries = self.outbox.claim_undelivered()
+        for entry in entries:
+            self._lanes.put(
+                self.lane_of(entry.request),
+                (entry.request, entry.entry_id, None),
+                block=True,
+            )
+        if entries:
+            logger.info(f"Replaying {len(entries)} undelivered requests from outbox")
+        self.outbox.compact()
+        return len(entries)
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> bool:
+        """Stops accepting requests and drains the queue.
+
+        Args:
+            timeout: Seconds to wait for the queue to drain. None waits forever.
+
+        Returns:
+            True if every worker finished before the timeout.
+        """
+        with self._lock:
+            if not self._accepting:
+                return not any(t.is_alive() for t in self._threads)
+            self._accepting = False
+            threads = list(self._threads)
+
+        self._stop_replaying.set()
+        if self._replayer is not None:
+            self._replayer.join(timeout)
+        logger.info(f"Draining dispatcher ({self.queue_depth} pending requests)")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._lanes.close()
+        for thread in threads:
+            thread.join(self._remaining(deadline))
+
+        drained = not any(t.is_alive() for t in threads)
+        if self.outbox is not None:
+            self.outbox.close()
+        if not drained:
+            logger.warning(
+                f"Dispatcher shutdown timed out with {self.queue_depth} requests pending"
+            )
+        return drained
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def _run_replay(self) -> None:
+        while not self._stop_replaying.wait(self.replay_interval):
+            try:
+                self.replay()
+            except Exception as e:
+                logger.error(f"Failed to replay outbox entries: {e}", exc_info=True)
+
+    def _run(self) -> None:
+        while True:
+            item = self._lanes.get()
+            if item is None:
+                return
+            lane, (request, entry_id, context), waited = item
+            self._waits[lane].observe(waited)
+            try:
+                if context is None:
+                    self.handler.execute(request)
+                else:
+                    context.run(self.handler.execute, request)
+                if entry_id is not None:
+                    self.outbox.ack(entry_id)
+            except Exception as e:
+                logger.error(
+                    f"Dispatch worker failed to handle request: {e}", exc_info=True
+                )
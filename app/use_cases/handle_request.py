@@ -1,40 +1,204 @@
+import asyncio
+import contextvars
 import logging
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Mapping, Optional, Tuple, TypeVar
 
 from app.domain.models import AssistanceRequest
-from app.ports.notification import NotificationChannel
-from app.ports.use_cases import HandleAssistanceRequestBase
+from app.domain.routing import RoutingTable
+from app.ports.notification import AsyncNotificationChannel, NotificationChannel
+from app.ports.status import DeliveryStatusStore
+from app.tracing import span
+from app.tracking import Delivery, current_delivery
+from app.ports.use_cases import (
+    AsyncHandleAssistanceRequestBase,
+    HandleAssistanceRequestBase,
+)
 
 logger = logging.getLogger(__name__)
 
+C = TypeVar("C")
+
+
+def _resolve(
+    request: AssistanceRequest,
+    channels: Mapping[str, C],
+    router: Optional[RoutingTable],
+) -> List[Tuple[str, C]]:
+    # Without a router, channels are keyed by the topic they serve.
+    names = router.route(request) if router is not None else [request.topic]
+    targets = []
+    for name in names:
+        channel = channels.get(name)
+        if channel is not None:
+            targets.append((name, channel))
+        elif router is not None:
+            logger.warning(
+                "Notification channel '%s' for topic '%s' is not configured",
+                name,
+                request.topic,
+            )
+    if not targets:
+        logger.warning(
+            "No notification channel configured for topic: %s", request.topic
+        )
+    return targets
+
 
 class HandleAssistanceRequest(HandleAssistanceRequestBase):
     """Concrete implementation for handling assistance requests."""
 
-    def __init__(self, channels: Dict[str, NotificationChannel]):
+    def __init__(
+        self,
+        channels: Dict[str, NotificationChannel],
+        router: Optional[RoutingTable] = None,
+        fan_out_workers: int = 8,
+        statuses: Optional[DeliveryStatusStore] = None,
+    ):
         """Initializes the use case with notification channels.
 
         Args:
-            channels: A dictionary mapping topic strings to NotificationChannel instances.
+            channels: A dictionary mapping channel names to NotificationChannel
+                instances. Without a router the names are the topics.
+            router: Picks the channels each request is sent to.
+            fan_out_workers: Threads sending to several channels at once
+                when a request is routed to more than one.
+            statuses: Tracks the delivery of requests that have an ID.
         """
-        self.channels = channels
+        self._routing = (channels, router)
+        self.statuses = statuses
+        self._fan_out = ThreadPoolExecutor(
+            max_workers=fan_out_workers, thread_name_prefix="fan-out"
+        )
+
+    @property
+    def channels(self) -> Dict[str, NotificationChannel]:
+        return self._routing[0]
+
+    @property
+    def router(self) -> Optional[RoutingTable]:
+        return self._routing[1]
+
+    def reconfigure(
+        self,
+        channels: Dict[str, NotificationChannel],
+        router: Optional[RoutingTable] = None,
+    ) -> None:
+        """Routes later requests with new channels and rules.
+
+        Both are replaced by one reference assignment, so no lock is taken
+        on the request path and requests already being handled finish with
+        the channels and rules they started with.
+        """
+        self._routing = (channels, router)
 
     def execute(self, request: AssistanceRequest) -> None:
-        """Routes the request to the appropriate channel based on topic."""
-        channel = self.channels.get(request.topic)
+        """Sends the request to every channel its topic is routed to."""
+        with span("HandleAssistanceRequest.execute", topic=request.topic) as traced:
+            channels, router = self._routing
+            targets = _resolve(request, channels, router)
+            if traced.sampled:
+                traced.set_attribute("channels", ",".join(name for name, _ in targets))
+            tracked = self.statuses is not None and request.request_id is not None
+            if tracked:
+                if targets:
+                    self.statuses.sending(
+                        request.request_id, [name for name, _ in targets]
+                    )
+                else:
+                    self.statuses.failed(
+                        request.request_id, None, "No notification channel configured"
+                    )
+            if len(targets) == 1:
+                self._send(request, *targets[0], tracked)
+            elif targets:
+                # Sends run in parallel, so the slowest channel bounds the call.
+                wait(
+                    [
+                        self._fan_out.submit(
+                            contextvars.copy_context().run,
+                            self._send,
+                            request,
+                            name,
+                            channel,
+                            tracked,
+                        )
+                        for name, channel in targets
+                    ]
+                )
 
-        if channel:
-            try:
+    def _send(
+        self,
+        request: AssistanceRequest,
+        name: str,
+        channel: NotificationChannel,
+        tracked: bool,
+    ) -> None:
+        token = current_delivery.set(
+            Delivery(self.statuses, (request.request_id,), name) if tracked else None
+        )
+        try:
+            with span(f"send {name}", channel=name):
                 channel.send(topic=request.topic, message=request.description)
-                logger.info(
-                    f"Sent notification for topic '{request.topic}' via {type(channel).__name__}"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Failed to send notification for topic '{request.topic}' via {type(channel).__name__}: {e}",
-                    exc_info=True,
+            logger.info(
+                "Sent notification for topic '%s' via %s",
+                request.topic,
+                type(channel).__name__,
+            )
+        except Exception as e:
+            if tracked:
+                self.statuses.failed(
+                    request.request_id, name, f"{type(e).__name__}: {e}"
                 )
-        else:
-            logger.warning(
-                f"No notification channel configured for topic: {request.topic}"
+            logger.error(
+                f"Failed to send notification for topic '{request.topic}' via {type(channel).__name__}: {e}",
+                exc_info=True,
+            )
+        finally:
+            current_delivery.reset(token)
+
+
+class AsyncHandleAssistanceRequest(AsyncHandleAssistanceRequestBase):
+    """Routes requests to asyncio notification channels."""
+
+    def __init__(
+        self,
+        channels: Dict[str, AsyncNotificationChannel],
+        router: Optional[RoutingTable] = None,
+    ):
+        """Initializes the use case with notification channels.
+
+        Args:
+            channels: A dictionary mapping channel names to
+                AsyncNotificationChannel instances. Without a router the
+                names are the topics.
+            router: Picks the channels each request is sent to.
+        """
+        self.channels = channels
+        self.router = router
+
+    async def execute(self, request: AssistanceRequest) -> None:
+        """Sends the request to every channel its topic is routed to."""
+        targets = _resolve(request, self.channels, self.router)
+        if len(targets) == 1:
+            await self._send(request, targets[0][1])
+        elif targets:
+            await asyncio.gather(
+                *(self._send(request, channel) for _, channel in targets)
+            )
+
+    async def _send(
+        self, request: AssistanceRequest, channel: AsyncNotificationChannel
+    ) -> None:
+        try:
+            await channel.send(topic=request.topic, message=request.description)
+            logger.info(
+                "Sent notification for topic '%s' via %s",
+                request.topic,
+                type(channel).__name__,
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to send notification for topic '{request.topic}' via {type(channel).__name__}: {e}",
+                exc_info=True,
             )
@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional, Tuple
+
+
+class PriorityLanes:
+    """Bounded FIFO lanes, one per priority, sharing a set of consumers.
+
+    ``get`` picks the next lane by smooth weighted round-robin, so with
+    weights 8/3/1 a backlog in the last lane gets one turn in twelve while
+    the others have work. With ``strict`` the first non-empty lane, in the
+    order of ``weights``, is always served first. Each lane has its own
+    capacity, so a flood in one lane cannot fill the others.
+    """
+
+    def __init__(self, weights: Mapping[str, int], capacity: int, strict: bool = False):
+        """Initializes the lanes.
+
+        Args:
+            weights: Lane name to its share of the turns, highest priority
+                first.
+            capacity: Items each lane holds at most.
+            strict: Serve lanes in strict priority order instead.
+        """
+        if not weights:
+            raise ValueError("At least one lane is needed.")
+        if any(weight < 1 for weight in weights.values()):
+            raise ValueError("Lane weights must be positive.")
+        if capacity < 1:
+            raise ValueError("Lane capacity must be positive.")
+
+        self.weights = dict(weights)
+        self.capacity = capacity
+        self.strict = strict
+        self._lanes: Dict[str, Deque[Tuple[Any, float]]] = {
+            lane: deque() for lane in self.weights
+        }
+        self._credit = dict.fromkeys(self.weights, 0)
+        self._served = dict.fromkeys(self.weights, 0)
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def depth(self, lane: str) -> int:
+        return len(self._lanes[lane])
+
+    def served(self, lane: str) -> int:
+        """Number of items taken from the lane so far."""
+        return self._served[lane]
+
+    def put(self, lane: str, item: Any, block: bool = False) -> None:
+        """Appends an item to a lane.
+
+        Raises:
+            queue.Full: If the lane is full and ``block`` is false, or if
+                the lanes were closed.
+        """
+        items = self._lanes[lane]
+        with self._not_full:
+            while len(items) >= self.capacity and block and not self._closed:
+                self._not_full.wait()
+            if self._closed or len(items) >= self.capacity:
+                raise queue.Full
+            items.append((item, time.monotonic()))
+            self._size += 1
+            self._not_empty.notify()
+
+    def get(self) -> Optional[Tuple[str, Any, float]]:
+        """Waits for the next item.
+
+        Returns:
+            The lane, the item and the seconds it waited, or None once the
+            lanes are closed and empty.
+        """
+        with self._not_empty:
+            while not self._size:
+                if self._closed:
+                    return None
+                self._not_empty.wait()
+            lane = self._next_lane()
+            items = self._lanes[lane]
+            item, enqueued_at = items.popleft()
+            self._served[lane] += 1
+            if not items:
+                # An idle lane starts over instead of banking turns.
+                self._credit[lane] = 0
+            self._size -= 1
+            self._not_full.notify_all()
+        return lane, item, time.monotonic() - enqueued_at
+
+    def close(self) -> None:
+        """Lets consumers drain what is queued, then ``get`` returns None."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def _next_lane(self) -> str:
+        ready = [lane for lane, items in self._lanes.items() if items]
+        if self.strict or len(ready) == 1:
+            return ready[0]
+        # Smooth weighted round-robin over the lanes that have work.
+        credit, total = self._credit, 0
+        for lane in ready:
+            credit[lane] += self.weights[lane]
+            total += self.weights[lane]
+        chosen = max(ready, key=credit.__getitem__)
+        credit[chosen] -= total
+        return chosen
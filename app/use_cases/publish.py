@@ -0,0 +1,24 @@
+import logging
+
+from app.domain.models import AssistanceRequest
+from app.ports.broker import MessageBroker
+from app.ports.use_cases import HandleAssistanceRequestBase
+
+logger = logging.getLogger(__name__)
+
+
+class PublishAssistanceRequest(HandleAssistanceRequestBase):
+    """Publishes requests to a broker so separate workers deliver them."""
+
+    def __init__(self, broker: MessageBroker):
+        """Initializes the use case with the broker to publish to.
+
+        Args:
+            broker: The message broker consumed by the delivery workers.
+        """
+        self.broker = broker
+
+    def execute(self, request: AssistanceRequest) -> None:
+        """Publishes the request; delivery happens in a consumer process."""
+        self.broker.publish(request)
+        logger.info("Published assistance request for topic '%s'", request.topic)
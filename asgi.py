@@ -0,0 +1,5 @@
+import os
+from app.asgi import create_asgi_app
+from config import config
+
+app = create_asgi_app(config[os.getenv("FLASK_CONFIG") or "default"])
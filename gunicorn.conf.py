@@ -0,0 +1,37 @@
+"""Gunicorn settings, e.g. ``gunicorn -c gunicorn.conf.py run:app``.
+
+Export ``PROMETHEUS_MULTIPROC_DIR`` (an empty, writable directory) so that
+``/v1/metrics`` aggregates the samples of every worker.
+
+With ``PREFORK=true`` the app is loaded once in the master and forked: the
+workers share its imported modules and immutable state, and each starts
+its own channels, stores and dispatcher after the fork.
+"""
+
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+preload_app = os.environ.get("PREFORK", "false").lower() in ("1", "true", "yes")
+
+
+def when_ready(server):
+    if preload_app:
+        # Moves the preloaded objects out of the collector's reach, so
+        # collections in the workers do not write to (and copy) their pages.
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        app = server.app.wsgi()
+        start = getattr(app, "start", None)
+        if start is not None:
+            start()
+
+
+def child_exit(server, worker):
+    from app.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
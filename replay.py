@@ -0,0 +1,122 @@
+"""Replays a JSONL file of assistance requests through routing and delivery.
+
+Each line is a ``/v1/notify`` request body. Progress is saved to
+``--checkpoint``, so running the same command again after an interruption
+resumes where it stopped:
+
+    python replay.py backfill.jsonl --checkpoint backfill.ckpt \
+        --parallelism 8 --rate slack=0.95 --failures failed.jsonl
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+
+from flask import Config as Settings
+
+from app.adapters.rate_limit import PacedNotificationChannel
+from app.api.schemas.schemas import AssistanceRequestSchema
+from app.factories import (
+    build_notification_channels,
+    build_router,
+    close_notification_channels,
+)
+from app.logs import configure_logging
+from app.replay import Checkpoint, ReplayRunner, read_requests
+from app.use_cases.handle_request import HandleAssistanceRequest
+from config import config
+
+logger = logging.getLogger("replay")
+
+
+def parse_rate(value: str):
+    name, _, rate = value.partition("=")
+    try:
+        return name, float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected CHANNEL=RATE, got '{value}'")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="JSONL file of request bodies.")
+    parser.add_argument("--checkpoint", help="File recording the progress.")
+    parser.add_argument(
+        "--failures", help="File the lines whose delivery failed are appended to."
+    )
+    parser.add_argument("--parallelism", type=int, default=8)
+    parser.add_argument(
+        "--rate",
+        type=parse_rate,
+        action="append",
+        default=[],
+        metavar="CHANNEL=RATE",
+        help="Sends per second for a channel; Slack defaults to SLACK_RATE_LIMIT.",
+    )
+    args = parser.parse_args(argv)
+
+    settings = Settings(os.path.dirname(os.path.abspath(__file__)))
+    settings.from_object(config[os.getenv("FLASK_CONFIG") or "default"])
+    configure_logging(settings)
+
+    # Sends must have ended when the use case returns, so the lanes,
+    # batching windows and background retries of the API are left out:
+    # failed lines go to --failures instead.
+    rates = {"slack": settings["SLACK_RATE_LIMIT"], **dict(args.rate)}
+    settings.update(SLACK_RATE_LIMIT=0, SLACK_COALESCE_WINDOW=0, SMTP_BATCH_WINDOW=0)
+    settings["WEBHOOKS"] = {
+        name: {**endpoint, "batch_window": 0}
+        for name, endpoint in settings["WEBHOOKS"].items()
+    }
+    channels = {
+        name: PacedNotificationChannel(
+            channel,
+            rate=rates.get(name, 0),
+            burst=settings["SLACK_RATE_BURST"] if name == "slack" else 1,
+            name=name,
+        )
+        for name, channel in build_notification_channels(settings).items()
+    }
+    router = build_router(settings)
+    handler = HandleAssistanceRequest(
+        channels, router=router, fan_out_workers=settings["ROUTING_FAN_OUT_WORKERS"]
+    )
+
+    checkpoint = Checkpoint(args.checkpoint, args.path) if args.checkpoint else None
+    offset, lines = checkpoint.load() if checkpoint else (0, 0)
+    if offset:
+        logger.info(f"Resuming {args.path} after line {lines}")
+    failures = open(args.failures, "ab") if args.failures else None
+    runner = ReplayRunner(handler, args.parallelism, checkpoint, failures)
+
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum}, finishing started requests")
+        runner.stop()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    try:
+        report = runner.run(
+            read_requests(
+                args.path, AssistanceRequestSchema(topics=router.topics), offset, lines
+            ),
+            offset,
+            lines,
+        )
+    finally:
+        if failures is not None:
+            failures.close()
+        close_notification_channels(handler.channels)
+
+    logger.info(
+        f"Replayed {args.path} up to line {report.lines}: {report.sent} sent, "
+        f"{report.failed} failed, {report.invalid} invalid"
+    )
+    return 1 if report.failed or report.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,30 @@
+import asyncio
+import json
+import logging
+import os
 import pytest
-from unittest.mock import patch
+import threading
+import time
+from unittest.mock import AsyncMock, Mock, patch
 
 from app import create_app
+from app.adapters.instrumented import InstrumentedNotificationChannel
+from app.admission import AdmissionController
+from app.api.schemas.schemas import AssistanceRequestSchema
+from app.api.validation import CompiledSchema
+from app.asgi import NotifierASGIApp
 from app.domain.models import AssistanceRequest
+from app.logs import NO_CORRELATION_ID, JsonFormatter, SamplingFilter
+from app.ports.notification import NotificationChannel
+from app.ports.use_cases import AsyncHandleAssistanceRequestBase
+from app.readiness import ReadinessMonitor
+from app.use_cases.dispatch import (
+    DispatchQueueFullError,
+    QueuedAssistanceRequestDispatcher,
+)
+from app.replay import Checkpoint, ReplayRunner, read_requests
+from app.tracing import configure_tracing, flush_tracing
+from app.use_cases.handle_request import HandleAssistanceRequest
 
 
 @pytest.fixture(scope="module")
@@ -21,9 +43,78 @@ def client(app):
 
 
 def test_health_check(client):
-    response = client.get("/v1/health/")
+    with patch.object(
+        client.application.notification_channels["email"], "stats"
+    ) as stats:
+        response = client.get("/v1/health/")
     assert response.status_code == 200
     assert response.json == {"status": "ok"}
+    stats.assert_not_called()
+
+
+def test_health_stats_report_channel_counters(client):
+    response = client.get("/v1/health/stats")
+    assert response.status_code == 200
+    assert response.json["channels"]["email"]["circuit"] == "closed"
+
+
+def test_readiness_serves_the_monitor_snapshot(app, client):
+    app.readiness.refresh()
+    deadline = time.monotonic() + 2
+    while b'"ok"' not in app.readiness.snapshot[1] and time.monotonic() < deadline:
+        time.sleep(0.01)
+        app.readiness.refresh()
+
+    with patch.object(app.readiness, "refresh") as refresh:
+        response = client.get("/v1/health/ready")
+
+    refresh.assert_not_called()
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert response.json["status"] == "ready"
+    assert response.json["channels"]["email"]["status"] == "ok"
+
+
+def test_readiness_monitor_probes_in_background_and_reports_saturation():
+    slack = Mock(spec=NotificationChannel)
+    slack.stats.return_value = {"circuit": "closed"}
+    slack.probe.side_effect = ConnectionError("auth.test timed out")
+    channels = {"slack": slack}
+    depth = {"dispatch:high": (0, 10)}
+    monitor = ReadinessMonitor(
+        lambda: channels,
+        lambda: ("slack", "email"),
+        {"dispatch:high": lambda: depth["dispatch:high"]},
+        probe_interval=60,
+        max_utilization=0.7,
+    )
+
+    monitor.refresh()
+    status, body = monitor.snapshot
+    assert status == 503
+    assert json.loads(body)["reasons"] == ["channel 'email' failed to initialize"]
+
+    channels["email"] = Mock(spec=NotificationChannel, **{"stats.return_value": {}})
+    deadline = time.monotonic() + 2
+    while b"unknown" in monitor.snapshot[1] and time.monotonic() < deadline:
+        time.sleep(0.01)
+        monitor.refresh()
+    status, body = monitor.snapshot
+    report = json.loads(body)
+    # A shared downstream failing degrades every replica but keeps them serving.
+    assert status == 200
+    assert report["status"] == "degraded"
+    assert report["channels"]["slack"]["error"].startswith("ConnectionError")
+    assert report["channels"]["email"]["status"] == "ok"
+
+    depth["dispatch:high"] = (7, 10)
+    monitor.refresh()
+    status, body = monitor.snapshot
+    assert status == 503
+    assert json.loads(body)["saturation"]["dispatch:high"]["utilization"] == 0.7
+    # Refreshing more often than probe_interval does not probe again.
+    assert slack.probe.call_count == 1
+    monitor.stop()
 
 
 @patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
@@ -32,7 +123,8 @@ def test_notify_sales_success(mock_execute, client):
     response = client.post("/v1/notify/", json=data)
 
     assert response.status_code == 202
-    assert response.json == {"message": "Request received and processing."}
+    assert response.json["message"] == "Request received and processing."
+    assert response.json["request_id"]
 
     mock_execute.assert_called_once()
     call_args, _ = mock_execute.call_args
@@ -47,7 +139,8 @@ def test_notify_pricing_success(mock_execute, client):
     response = client.post("/v1/notify/", json=data)
 
     assert response.status_code == 202
-    assert response.json == {"message": "Request received and processing."}
+    assert response.json["message"] == "Request received and processing."
+    assert response.json["request_id"]
     mock_execute.assert_called_once()
     call_args, _ = mock_execute.call_args
     assert isinstance(call_args[0], AssistanceRequest)
@@ -61,7 +154,8 @@ def test_notify_unknown_topic_success(mock_execute, client):
     response = client.post("/v1/notify/", json=data)
 
     assert response.status_code == 202
-    assert response.json == {"message": "Request received and processing."}
+    assert response.json["message"] == "Request received and processing."
+    assert response.json["request_id"]
     mock_execute.assert_called_once()
     call_args, _ = mock_execute.call_args
     assert call_args[0].topic == "sales"
@@ -105,3 +199,628 @@ def test_notify_wrong_content_type_fails(mock_execute, client):
 
     assert response.status_code == 400
     mock_execute.assert_not_called()
+
+
+def test_compiled_schema_reports_the_errors_of_marshmallow():
+    schema = AssistanceRequestSchema(topics=["sales", "pricing"])
+    compiled = CompiledSchema(schema)
+    payloads = [
+        {"topic": "sales", "description": "Ok"},
+        {"topic": "pricing", "description": "Ok", "priority": "high"},
+        {},
+        {"topic": "other", "description": 3, "priority": "urgent"},
+        {"topic": None, "description": "Ok", "extra": 1, "priority": None},
+        {"topic": ["sales"], "description": ""},
+        [],
+        None,
+        "sales",
+    ]
+    for payload in payloads:
+        data, errors = compiled.load(payload)
+        assert errors == schema.validate(payload)
+        if not errors:
+            assert data == schema.load(payload)
+
+
+def test_openapi_spec_documents_fast_path_schemas(client):
+    spec = client.get("/apispec.json").get_json()
+    operation = spec["paths"]["/v1/notify"]["post"]
+
+    assert operation["parameters"][0]["schema"] == {
+        "$ref": "#/components/schemas/AssistanceRequest"
+    }
+    assert "NotificationResponse" in json.dumps(operation["responses"]["202"])
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_returns_503_when_dispatch_queue_is_full(mock_execute, client):
+    mock_execute.side_effect = DispatchQueueFullError("Dispatch queue is full")
+    data = {"topic": "sales", "description": "Burst"}
+    response = client.post("/v1/notify/", json=data)
+
+    assert response.status_code == 503
+    assert "error" in response.json
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_batch_json_array_reports_per_item_results(mock_execute, client):
+    data = [
+        {"topic": "sales", "description": "First"},
+        {"topic": "support", "description": "Unknown topic"},
+        {"topic": "pricing", "description": "Second"},
+    ]
+    response = client.post("/v1/notify/batch", json=data)
+
+    assert response.status_code == 202
+    assert response.json["accepted"] == 2
+    assert response.json["rejected"] == 1
+    statuses = [result["status"] for result in response.json["results"]]
+    assert statuses == ["accepted", "invalid", "accepted"]
+    assert "topic" in response.json["results"][1]["errors"]
+    assert mock_execute.call_count == 2
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_batch_accepts_ndjson(mock_execute, client):
+    body = (
+        '{"topic": "sales", "description": "One"}\n'
+        "\n"
+        "not json\n"
+        '{"topic": "pricing", "description": "Two"}\n'
+    )
+    response = client.post(
+        "/v1/notify/batch", data=body, content_type="application/x-ndjson"
+    )
+
+    assert response.status_code == 202
+    assert response.json["accepted"] == 2
+    assert response.json["results"][1] == {
+        "index": 1,
+        "status": "invalid",
+        "errors": {"_schema": ["Invalid JSON."]},
+    }
+    assert mock_execute.call_count == 2
+
+
+def test_notify_batch_rejects_non_array_body(client):
+    response = client.post("/v1/notify/batch", json={"topic": "sales"})
+    assert response.status_code == 400
+
+
+def test_admin_dead_letters_require_token(client):
+    response = client.get("/v1/admin/dead-letters")
+    assert response.status_code == 401
+
+
+@patch("app.adapters.email.EmailNotificationAdapter.send")
+def test_admin_redrives_dead_letter(mock_send, app, client):
+    letter = app.dead_letters.add(
+        channel="email",
+        topic="pricing",
+        messages=("Lost message",),
+        error="ConnectionError: down",
+        attempts=5,
+    )
+    headers = {"Authorization": "Bearer test-admin-token"}
+
+    listed = client.get("/v1/admin/dead-letters", headers=headers)
+    assert listed.status_code == 200
+    assert listed.json[0]["letter_id"] == letter.letter_id
+
+    response = client.post(
+        f"/v1/admin/dead-letters/{letter.letter_id}/redrive", headers=headers
+    )
+    assert response.status_code == 202
+    mock_send.assert_called_once_with(topic="pricing", message="Lost message")
+    assert app.dead_letters.get(letter.letter_id) is None
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_replays_idempotent_retries(mock_execute, client):
+    data = {"topic": "sales", "description": "Retried after a timeout"}
+    headers = {"Idempotency-Key": "retry-key-1"}
+
+    first = client.post("/v1/notify/", json=data, headers=headers)
+    second = client.post("/v1/notify/", json=data, headers=headers)
+
+    assert first.status_code == second.status_code == 202
+    assert second.json == first.json
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    mock_execute.assert_called_once()
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_rejects_idempotency_key_reused_for_other_request(mock_execute, client):
+    headers = {"Idempotency-Key": "retry-key-2"}
+    client.post(
+        "/v1/notify/", json={"topic": "sales", "description": "A"}, headers=headers
+    )
+    response = client.post(
+        "/v1/notify/", json={"topic": "sales", "description": "B"}, headers=headers
+    )
+
+    assert response.status_code == 422
+    mock_execute.assert_called_once()
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_releases_idempotency_key_when_rejected(mock_execute, client):
+    mock_execute.side_effect = [DispatchQueueFullError("full"), None]
+    data = {"topic": "sales", "description": "Busy at first"}
+    headers = {"Idempotency-Key": "retry-key-3"}
+
+    assert client.post("/v1/notify/", json=data, headers=headers).status_code == 503
+    assert client.post("/v1/notify/", json=data, headers=headers).status_code == 202
+    assert mock_execute.call_count == 2
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_suppresses_duplicates_within_window(mock_execute, app, client):
+    app.config["DEDUP_WINDOW"] = 60
+    try:
+        data = {"topic": "pricing", "description": "Same question twice"}
+        first = client.post("/v1/notify/", json=data)
+        second = client.post("/v1/notify/", json=data)
+        batch = client.post("/v1/notify/batch", json=[data])
+    finally:
+        app.config["DEDUP_WINDOW"] = 0
+
+    assert first.status_code == second.status_code == 202
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert batch.json["accepted"] == 1
+    mock_execute.assert_called_once()
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_idempotency_key_of_a_duplicate_replays_the_dispatched_request(
+    mock_execute, app, client
+):
+    app.config["DEDUP_WINDOW"] = 60
+    try:
+        data = {"topic": "pricing", "description": "Duplicate with a key"}
+        headers = {"Idempotency-Key": "retry-key-4"}
+        first = client.post("/v1/notify/", json=data)
+        keyed = client.post("/v1/notify/", json=data, headers=headers)
+        retried = client.post("/v1/notify/", json=data, headers=headers)
+    finally:
+        app.config["DEDUP_WINDOW"] = 0
+
+    request_id = first.json["request_id"]
+    assert keyed.json["request_id"] == retried.json["request_id"] == request_id
+    assert retried.headers["Location"].endswith(f"/v1/notify/{request_id}")
+    assert client.get(retried.headers["Location"]).status_code == 200
+    mock_execute.assert_called_once()
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_metrics_expose_request_and_stage_timings(mock_execute, client):
+    client.post("/v1/notify/", json={"topic": "pricing", "description": "Metrics"})
+    response = client.get("/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert 'notifier_http_requests_total{endpoint="/v1/notify",status="202"}' in text
+    assert 'notifier_validation_seconds_count{endpoint="notify"}' in text
+    assert 'notifier_use_case_seconds_count{topic="pricing"}' in text
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_echoes_or_generates_request_id(mock_execute, client):
+    data = {"topic": "sales", "description": "Correlated"}
+    given = client.post("/v1/notify/", json=data, headers={"X-Request-ID": "abc-123"})
+    generated = client.post("/v1/notify/", json=data)
+
+    assert given.headers["X-Request-ID"] == "abc-123"
+    assert len(generated.headers["X-Request-ID"]) == 32
+
+
+@patch("app.adapters.email.EmailNotificationAdapter.send")
+def test_notify_reports_delivery_status(mock_send, client):
+    response = client.post(
+        "/v1/notify/", json={"topic": "pricing", "description": "Track me"}
+    )
+    request_id = response.json["request_id"]
+    assert response.headers["Location"].endswith(f"/v1/notify/{request_id}")
+
+    status = client.get(f"/v1/notify/{request_id}")
+    assert status.status_code == 200
+    assert status.json["status"] == "sent"
+    assert status.json["channels"] == ["email"]
+    assert status.json["finished_at"] >= status.json["queued_at"]
+
+    mock_send.side_effect = ValueError("bad address")
+    failed = client.post("/v1/notify/", json={"topic": "pricing", "description": "X"})
+    status = client.get(failed.headers["Location"])
+    assert status.json["status"] == "failed"
+    assert "ValueError: bad address" in status.json["error"]
+
+    assert client.get("/v1/notify/unknown-0").status_code == 404
+
+
+def test_log_sampling_keeps_whole_requests_and_all_warnings():
+    sampler = SamplingFilter(rate=0.5)
+
+    def record(level, request_id):
+        entry = logging.LogRecord("app", level, __file__, 1, "msg", None, None)
+        entry.correlation_id = request_id
+        return entry
+
+    ids = [f"request-{i}" for i in range(1000)]
+    kept = [i for i in ids if sampler.filter(record(logging.INFO, i))]
+
+    assert 400 < len(kept) < 600
+    assert kept == [i for i in ids if sampler.filter(record(logging.INFO, i))]
+    assert all(sampler.filter(record(logging.WARNING, i)) for i in ids)
+    assert sampler.filter(record(logging.INFO, NO_CORRELATION_ID))
+
+
+def test_json_log_formatter_emits_structured_lines():
+    entry = logging.LogRecord(
+        "app.x", logging.INFO, __file__, 1, "hi %s", ("you",), None
+    )
+    entry.correlation_id = "abc"
+
+    line = json.loads(JsonFormatter().format(entry))
+
+    assert line["message"] == "hi you"
+    assert line["correlation_id"] == "abc"
+    assert line["level"] == "INFO"
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute")
+def test_notify_sheds_clients_over_their_rate_with_retry_after(
+    mock_execute, app, client
+):
+    admission = app.admission
+    app.admission = AdmissionController(client_rate=0.5, client_burst=1)
+    try:
+        data = {"topic": "sales", "description": "Rate limited"}
+        first = client.post("/v1/notify/", json=data, headers={"X-Real-IP": "1.1.1.1"})
+        second = client.post("/v1/notify/", json=data, headers={"X-Real-IP": "1.1.1.1"})
+        other = client.post(
+            "/v1/notify/", json=data, headers={"X-Forwarded-For": "9.9.9.9, 2.2.2.2"}
+        )
+    finally:
+        app.admission = admission
+
+    assert first.status_code == other.status_code == 202
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "2"
+    assert mock_execute.call_count == 2
+
+
+@patch("app.use_cases.handle_request.HandleAssistanceRequest.execute_batch")
+def test_notify_batch_is_charged_per_item_and_shed_on_any_backed_up_lane(
+    mock_execute_batch, app, client
+):
+    mock_execute_batch.side_effect = lambda requests: [None] * len(requests)
+    dispatcher = Mock(spec=QueuedAssistanceRequestDispatcher)
+    dispatcher.lane_of.side_effect = lambda request: request.topic
+    dispatcher.lane_depth.side_effect = lambda lane: 9 if lane == "pricing" else 0
+    dispatcher.lane_served.return_value = 0
+    admission = app.admission
+    app.admission = AdmissionController(
+        client_rate=0.5, client_burst=4, dispatcher=dispatcher, lane_limit=8
+    )
+    headers = {"X-Real-IP": "3.3.3.3"}
+    try:
+        backed_up = client.post(
+            "/v1/notify/batch",
+            json=[
+                {"topic": "sales", "description": "Fine lane"},
+                {"topic": "pricing", "description": "Backed up lane"},
+            ],
+            headers=headers,
+        )
+        batch = [{"topic": "sales", "description": f"Item {i}"} for i in range(3)]
+        accepted = client.post("/v1/notify/batch", json=batch, headers=headers)
+        # The four tokens went to the two batches: the next request waits.
+        after = client.post("/v1/notify/", json=batch[0], headers=headers)
+    finally:
+        app.admission = admission
+
+    assert backed_up.status_code == 429
+    assert backed_up.headers["Retry-After"] == "30"
+    assert accepted.status_code == 202
+    assert accepted.json["accepted"] == 3
+    assert mock_execute_batch.call_count == 1
+    assert after.status_code == 429
+    assert after.headers["Retry-After"] == "4"
+
+
+def test_admission_limits_in_flight_requests_and_lane_backlog():
+    dispatcher = Mock(spec=QueuedAssistanceRequestDispatcher)
+    dispatcher.lane_of.return_value = "low"
+    dispatcher.lane_depth.return_value = 10
+    dispatcher.lane_served.side_effect = [0, 4, 4]
+    admission = AdmissionController(
+        max_in_flight=1, dispatcher=dispatcher, lane_limit=8
+    )
+    request = AssistanceRequest(topic="pricing", description="Backlog")
+
+    assert admission.enter("a") is None
+    assert admission.enter("b") == ("in_flight", 1)
+    admission.leave()
+    assert admission.enter("b") is None
+
+    assert admission.check_backlog(request) == ("backlog", 30)  # rate unknown yet
+    with patch("app.admission.time.monotonic", return_value=time.monotonic() + 2):
+        # 4 requests drained in 2s: 3 over the limit take 2s to drain.
+        assert admission.check_backlog(request) == ("backlog", 2)
+    dispatcher.lane_depth.return_value = 7
+    assert admission.check_backlog(request) is None
+
+
+def test_config_reload_swaps_routing_without_restart(tmp_path):
+    from config import config
+
+    settings = tmp_path / "settings.json"
+    settings.write_text("{}")
+    reloading = type(
+        "ReloadingConfig",
+        (config["testing"],),
+        {"CONFIG_RELOAD_PATH": str(settings), "CONFIG_RELOAD_DRAIN_SECONDS": 0},
+    )
+    reload_app = create_app(reloading)
+    client = reload_app.test_client()
+    email = reload_app.notification_channels["email"]
+    try:
+        data = {"topic": "support", "description": "New topic"}
+        assert client.post("/v1/notify/", json=data).status_code == 400
+
+        rules = [{"topics": ["support", "pricing"], "channels": ["email"]}]
+        settings.write_text(json.dumps({"ROUTING_RULES": rules}))
+        assert reload_app.config_watcher.check()
+
+        with patch.object(email, "send") as mock_send:
+            assert client.post("/v1/notify/", json=data).status_code == 202
+        mock_send.assert_called_once_with(topic="support", message="New topic")
+        assert reload_app.notification_channels["email"] is email
+
+        settings.write_text(json.dumps({"ROUTING_RULES": rules, "SMTP_TIMEOUT": 1}))
+        assert reload_app.config_watcher.check()
+        assert reload_app.notification_channels["email"] is not email
+
+        settings.write_text("[not json")
+        assert not reload_app.config_watcher.check()
+        assert reload_app.router.topics == ("support", "pricing")
+    finally:
+        reload_app.config_watcher.stop()
+
+
+def test_prefork_app_starts_channels_in_each_process():
+    from config import config
+
+    prefork = type("PreforkConfig", (config["testing"],), {"PREFORK": True})
+    prefork_app = create_app(prefork)
+    assert not hasattr(prefork_app, "assistance_request_handler")
+    assert prefork_app.router.topics == ("sales", "pricing")
+
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            prefork_app.start()
+            response = prefork_app.test_client().get("/v1/health/stats")
+            code = 0 if response.json["channels"]["email"] else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert not hasattr(prefork_app, "assistance_request_handler")
+
+    # Without a fork hook, the first request starts them.
+    with patch.object(HandleAssistanceRequest, "execute") as mock_execute:
+        data = {"topic": "sales", "description": "Lazy start"}
+        response = prefork_app.test_client().post("/v1/notify/", json=data)
+    assert response.status_code == 202
+    mock_execute.assert_called_once()
+    assert "email" in prefork_app.notification_channels
+
+
+def test_request_trace_continues_traceparent_down_to_the_adapter(tmp_path):
+    from config import config
+
+    path = tmp_path / "traces.jsonl"
+    tracing = type(
+        "TracingConfig",
+        (config["testing"],),
+        {
+            "TRACE_EXPORTER": "file",
+            "TRACE_EXPORT_PATH": str(path),
+            "TRACE_SAMPLE_RATE": 0,
+        },
+    )
+    try:
+        client = create_app(tracing).test_client()
+        trace_id, caller = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+        data = {"topic": "pricing", "description": "Traced request"}
+        response = client.post(
+            "/v1/notify/",
+            json=data,
+            headers={"traceparent": f"00-{trace_id}-{caller}-01"},
+        )
+        assert response.status_code == 202
+        # Not sampled: no traceparent and a sample rate of 0.
+        client.post("/v1/notify/", json=data)
+    finally:
+        flush_tracing()
+        configure_tracing()
+
+    spans = {
+        exported["name"]: exported
+        for line in path.read_text().splitlines()
+        for exported in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    }
+    assert set(spans) == {
+        "POST /v1/notify",
+        "validate",
+        "HandleAssistanceRequest.execute",
+        "send email",
+        "EmailNotificationAdapter.send",
+    }
+    assert {exported["traceId"] for exported in spans.values()} == {trace_id}
+    parents = {name: exported.get("parentSpanId") for name, exported in spans.items()}
+    ids = {name: exported["spanId"] for name, exported in spans.items()}
+    assert parents["POST /v1/notify"] == caller
+    assert parents["HandleAssistanceRequest.execute"] == ids["POST /v1/notify"]
+    assert parents["send email"] == ids["HandleAssistanceRequest.execute"]
+    assert parents["EmailNotificationAdapter.send"] == ids["send email"]
+
+
+def test_admin_profile_returns_folded_stacks(client):
+    stop = threading.Event()
+
+    def waiting_for_profile():
+        stop.wait()
+
+    thread = threading.Thread(target=waiting_for_profile, name="profiled")
+    thread.start()
+    try:
+        assert client.post("/v1/admin/profile").status_code == 401
+        response = client.post(
+            "/v1/admin/profile?seconds=0.2&interval=5",
+            headers={"Authorization": "Bearer test-admin-token"},
+        )
+    finally:
+        stop.set()
+        thread.join()
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    stack, _, count = next(
+        line
+        for line in response.text.splitlines()
+        if line.startswith("profiled;") and "waiting_for_profile" in line
+    ).rpartition(" ")
+    assert int(count) > 1
+    assert stack.split(";")[1] == "threading.Thread._bootstrap"
+
+
+def test_replay_resumes_from_checkpoint_and_records_failures(tmp_path):
+    def send(topic, message):
+        if message == "Fails":
+            raise ConnectionError("down")
+
+    channel = Mock(spec=NotificationChannel)
+    channel.send.side_effect = send
+    handler = HandleAssistanceRequest(
+        {"sales": InstrumentedNotificationChannel(channel)}
+    )
+    schema = AssistanceRequestSchema(topics=["sales"])
+    source = tmp_path / "backfill.jsonl"
+    lines = [
+        {"topic": "sales", "description": "One"},
+        "not json",
+        {"topic": "sales", "description": "Fails"},
+        {"topic": "sales", "description": "Two"},
+    ]
+    source.write_text(
+        "".join((json.dumps(l) if isinstance(l, dict) else l) + "\n" for l in lines)
+    )
+    checkpoint = Checkpoint(str(tmp_path / "backfill.ckpt"), str(source))
+    failures = tmp_path / "failed.jsonl"
+
+    with open(failures, "ab") as out:
+        report = ReplayRunner(handler, 2, checkpoint, out).run(
+            read_requests(str(source), schema)
+        )
+    assert report[:3] == (2, 1, 1)
+    assert checkpoint.load() == (source.stat().st_size, 4)
+    assert json.loads(failures.read_text())["description"] == "Fails"
+
+    with open(source, "a") as f:
+        f.write(json.dumps({"topic": "sales", "description": "Three"}) + "\n")
+    offset, done = checkpoint.load()
+    channel.send.reset_mock()
+    report = ReplayRunner(handler, 2, checkpoint).run(
+        read_requests(str(source), schema, offset, done), offset, done
+    )
+    assert report[:3] == (1, 0, 0)
+    channel.send.assert_called_once_with(topic="sales", message="Three")
+    assert checkpoint.load() == (source.stat().st_size, 5)
+
+
+def _call_asgi(asgi_app, method, path, body=b"", content_type=b"application/json"):
+    """Run one HTTP request through an ASGI app and return (status, json)."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(b"content-type", content_type)],
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        await asgi_app(scope, receive, send)
+        await asgi_app.shutdown()
+
+    asyncio.run(run())
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_asgi_notify_accepts_and_delivers():
+    handler = AsyncMock(spec=AsyncHandleAssistanceRequestBase)
+    asgi_app = NotifierASGIApp(handler, channels={}, topics=("sales", "pricing"))
+    body = json.dumps({"topic": "sales", "description": "Async"}).encode()
+
+    status, payload = _call_asgi(asgi_app, "POST", "/v1/notify", body)
+
+    assert status == 202
+    assert payload == {"message": "Request received and processing."}
+    handler.execute.assert_awaited_once_with(
+        AssistanceRequest(topic="sales", description="Async")
+    )
+
+
+def test_asgi_notify_reports_validation_errors_like_flask():
+    handler = AsyncMock(spec=AsyncHandleAssistanceRequestBase)
+    asgi_app = NotifierASGIApp(handler, channels={}, topics=("sales",))
+    body = json.dumps({"description": "Missing topic field"}).encode()
+
+    status, payload = _call_asgi(asgi_app, "POST", "/v1/notify/", body)
+
+    assert status == 400
+    assert "Topic is required." in payload["messages"]["json"]["topic"][0]
+    handler.execute.assert_not_awaited()
+
+
+def test_asgi_health_check():
+    asgi_app = NotifierASGIApp(AsyncMock(), channels={})
+    status, payload = _call_asgi(asgi_app, "GET", "/v1/health")
+    assert status == 200
+    assert payload["status"] == "ok"
+
+
+def test_asgi_channels_share_one_session_opened_on_startup():
+    from app.adapters.async_slack import AsyncSlackNotificationAdapter
+
+    channels = {
+        name: AsyncSlackNotificationAdapter(token="xoxb-test", channel_id=name)
+        for name in ("C1", "C2")
+    }
+    asgi_app = NotifierASGIApp(AsyncMock(), channels=channels)
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sessions = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        if message["type"] == "lifespan.startup.complete":
+            sessions.extend(channel.client.session for channel in channels.values())
+            sessions.append(asgi_app.session)
+
+    asyncio.run(asgi_app({"type": "lifespan"}, receive, send))
+
+    assert sessions[0] is sessions[1] is sessions[2]
+    assert sessions[0].closed
+    assert asgi_app.session is None
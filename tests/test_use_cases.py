@@ -1,10 +1,27 @@
+import asyncio
+import itertools
 import pytest
 import logging
-from unittest.mock import Mock
+import threading
+import time
+from unittest.mock import AsyncMock, Mock
 
+from app.adapters.memory_broker import InMemoryMessageBroker
+from app.logs import correlation_id
 from app.domain.models import AssistanceRequest
-from app.use_cases.handle_request import HandleAssistanceRequest
-from app.ports.notification import NotificationChannel
+from app.domain.routing import KeywordMatcher, RoutingRule, RoutingTable
+from app.use_cases.handle_request import (
+    AsyncHandleAssistanceRequest,
+    HandleAssistanceRequest,
+)
+from app.use_cases.publish import PublishAssistanceRequest
+from app.use_cases.lanes import PriorityLanes
+from app.use_cases.dispatch import (
+    DispatchQueueFullError,
+    QueuedAssistanceRequestDispatcher,
+)
+from app.ports.notification import AsyncNotificationChannel, NotificationChannel
+from app.ports.outbox import Outbox, OutboxEntry
 
 
 @pytest.fixture
@@ -94,3 +111,292 @@ def test_handle_request_logs_error_on_send_failure(handler, mock_sales_channel,
 
     assert "Failed to send notification for topic 'sales'" in caplog.text
     assert "Slack API error" in caplog.text
+
+
+def test_dispatcher_delivers_requests_on_worker_threads(mock_sales_channel):
+    """Verify queued requests reach the wrapped handler and drain on shutdown."""
+    inner = HandleAssistanceRequest(channels={"sales": mock_sales_channel})
+    dispatcher = QueuedAssistanceRequestDispatcher(inner, workers=2, queue_size=10)
+    dispatcher.start()
+
+    for index in range(5):
+        dispatcher.execute(AssistanceRequest(topic="sales", description=f"#{index}"))
+
+    assert dispatcher.shutdown(timeout=5) is True
+    assert mock_sales_channel.send.call_count == 5
+
+
+def test_dispatcher_runs_handler_with_the_callers_correlation_id(
+    mock_sales_channel,
+):
+    """Verify worker threads log with the ID of the request they deliver."""
+    seen = []
+    mock_sales_channel.send.side_effect = lambda **_: seen.append(correlation_id.get())
+    inner = HandleAssistanceRequest(channels={"sales": mock_sales_channel})
+    dispatcher = QueuedAssistanceRequestDispatcher(inner, workers=2, queue_size=10)
+    dispatcher.start()
+
+    token = correlation_id.set("req-1")
+    try:
+        dispatcher.execute(AssistanceRequest(topic="sales", description="single"))
+        dispatcher.execute_batch(
+            [AssistanceRequest(topic="sales", description=str(i)) for i in range(4)]
+        )
+    finally:
+        correlation_id.reset(token)
+
+    assert dispatcher.shutdown(timeout=5) is True
+    assert seen == ["req-1"] * 5
+
+
+def test_dispatcher_raises_when_queue_is_full():
+    """Verify the dispatcher rejects requests once its queue is full."""
+    release = threading.Event()
+    inner = Mock()
+    inner.execute.side_effect = lambda request: release.wait(5)
+    dispatcher = QueuedAssistanceRequestDispatcher(inner, workers=1, queue_size=1)
+    dispatcher.start()
+
+    request = AssistanceRequest(topic="sales", description="Busy")
+    dispatcher.execute(request)  # picked up by the worker
+    deadline = time.monotonic() + 5
+    while inner.execute.call_count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    dispatcher.execute(request)  # waits in the queue
+
+    with pytest.raises(DispatchQueueFullError):
+        dispatcher.execute(request)
+
+    release.set()
+    assert dispatcher.shutdown(timeout=5) is True
+    assert inner.execute.call_count == 2
+
+
+def test_priority_lanes_share_turns_by_weight_or_strictly():
+    """Verify weighted lanes interleave by weight and strict lanes drain in order."""
+    weighted = PriorityLanes({"high": 3, "low": 1}, capacity=10)
+    strict = PriorityLanes({"high": 3, "low": 1}, capacity=10, strict=True)
+    for lanes in (weighted, strict):
+        for i in range(4):
+            lanes.put("low", f"l{i}")
+            lanes.put("high", f"h{i}")
+        lanes.close()
+
+    assert [weighted.get()[1] for _ in range(8)] == [
+        "h0",
+        "h1",
+        "l0",
+        "h2",
+        "h3",
+        "l1",
+        "l2",
+        "l3",
+    ]
+    assert [strict.get()[1] for _ in range(8)] == [
+        "h0",
+        "h1",
+        "h2",
+        "h3",
+        "l0",
+        "l1",
+        "l2",
+        "l3",
+    ]
+    assert weighted.get() is None
+
+
+def test_dispatcher_serves_urgent_topics_ahead_of_a_backlog():
+    """Verify a high-priority request overtakes a queued low-priority backlog."""
+    release = threading.Event()
+    handled = []
+
+    def execute(request):
+        release.wait(5)
+        handled.append(request.description)
+
+    inner = Mock()
+    inner.execute.side_effect = execute
+    dispatcher = QueuedAssistanceRequestDispatcher(
+        inner,
+        workers=1,
+        queue_size=2,
+        topic_priorities={"sales": "high", "pricing": "low"},
+        strict_priority=True,
+    )
+    dispatcher.start()
+    for i in range(3):  # one picked up by the worker, two waiting
+        dispatcher.execute(AssistanceRequest(topic="pricing", description=f"p{i}"))
+        deadline = time.monotonic() + 5
+        while i == 0 and not inner.execute.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    with pytest.raises(DispatchQueueFullError):
+        dispatcher.execute(AssistanceRequest(topic="pricing", description="p3"))
+    dispatcher.execute(AssistanceRequest(topic="sales", description="s0"))
+    dispatcher.execute(
+        AssistanceRequest(topic="pricing", description="urgent", priority="high")
+    )
+    assert dispatcher.lane_depth("low") == 2
+    assert dispatcher.lane_depth("high") == 2
+
+    release.set()
+    assert dispatcher.shutdown(timeout=5) is True
+    assert handled == ["p0", "s0", "urgent", "p1", "p2"]
+
+
+def test_dispatcher_acks_outbox_entries_and_replays_undelivered(mock_sales_channel):
+    """Verify delivered requests are acknowledged and orphans are replayed."""
+    outbox = Mock(spec=Outbox)
+    outbox.append.return_value = 7
+    orphan = AssistanceRequest(topic="sales", description="From crash")
+    outbox.claim_undelivered.return_value = [OutboxEntry(entry_id=3, request=orphan)]
+    inner = HandleAssistanceRequest(channels={"sales": mock_sales_channel})
+    dispatcher = QueuedAssistanceRequestDispatcher(inner, workers=1, outbox=outbox)
+    dispatcher.start()
+
+    assert dispatcher.replay() == 1
+    dispatcher.execute(AssistanceRequest(topic="sales", description="Fresh"))
+    dispatcher.shutdown(timeout=5)
+
+    outbox.ack.assert_any_call(3)
+    outbox.ack.assert_any_call(7)
+    assert mock_sales_channel.send.call_count == 2
+    outbox.close.assert_called_once()
+
+
+def test_dispatcher_replays_entries_orphaned_while_it_runs(mock_sales_channel):
+    """Verify entries whose owner's lease expires later are still replayed."""
+    outbox = Mock(spec=Outbox)
+    orphan = AssistanceRequest(topic="sales", description="Lease expired")
+    outbox.claim_undelivered.side_effect = itertools.chain(
+        [[OutboxEntry(entry_id=5, request=orphan)]], itertools.repeat([])
+    )
+    inner = HandleAssistanceRequest(channels={"sales": mock_sales_channel})
+    dispatcher = QueuedAssistanceRequestDispatcher(
+        inner, workers=1, outbox=outbox, replay_interval=0.01
+    )
+    dispatcher.start()
+
+    deadline = time.monotonic() + 5
+    while not outbox.ack.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    dispatcher.shutdown(timeout=5)
+
+    outbox.ack.assert_called_once_with(5)
+    mock_sales_channel.send.assert_called_once()
+
+
+def test_published_requests_are_delivered_by_broker_consumer(mock_sales_channel):
+    """Verify requests published to the broker reach the channels via consume."""
+    broker = InMemoryMessageBroker(poll_interval=0.01)
+    publisher = PublishAssistanceRequest(broker)
+    consumer = HandleAssistanceRequest(channels={"sales": mock_sales_channel})
+
+    publisher.execute(AssistanceRequest(topic="sales", description="Via broker"))
+    mock_sales_channel.send.side_effect = lambda **kwargs: broker.stop()
+    thread = threading.Thread(target=broker.consume, args=(consumer.execute,))
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    mock_sales_channel.send.assert_called_once_with(topic="sales", message="Via broker")
+    assert broker.acked == 1
+
+
+def test_async_handler_routes_to_async_channel():
+    """Verify the asyncio use case awaits the channel for the request topic."""
+    sales = AsyncMock(spec=AsyncNotificationChannel)
+    handler = AsyncHandleAssistanceRequest(channels={"sales": sales})
+
+    asyncio.run(handler.execute(AssistanceRequest(topic="sales", description="Hi")))
+    asyncio.run(handler.execute(AssistanceRequest(topic="support", description="?")))
+
+    sales.send.assert_awaited_once_with(topic="sales", message="Hi")
+
+
+def test_keyword_matcher_finds_overlapping_keywords():
+    """Verify the automaton reports keywords that overlap or nest."""
+    matcher = KeywordMatcher({"he": [0], "she": [1], "hers": [2], "price": [3]})
+
+    assert matcher.find("ushers") == {0, 1, 2}
+    assert matcher.find("no match here") == {0}
+    assert matcher.find("") == set()
+
+
+def test_routing_table_applies_keywords_patterns_and_priority():
+    """Verify rules match on topic, keyword and regex, highest priority first."""
+    router = RoutingTable.from_config(
+        [
+            {"name": "sales", "topics": ["sales"], "channels": ["slack"]},
+            {
+                "name": "escalate",
+                "keywords": ["urgent", "outage"],
+                "channels": ["pager", "slack"],
+                "priority": 10,
+            },
+            {
+                "name": "invoices",
+                "topics": ["pricing"],
+                "pattern": r"INV-\d+",
+                "channels": ["billing"],
+                "priority": 5,
+                "final": True,
+            },
+            {"name": "pricing", "topics": ["pricing"], "channels": ["email"]},
+        ]
+    )
+
+    def route(topic, description):
+        return router.route(AssistanceRequest(topic=topic, description=description))
+
+    assert router.topics == ("sales", "pricing")
+    assert route("sales", "Need a quote") == ["slack"]
+    assert route("sales", "URGENT: site down") == ["pager", "slack"]
+    assert route("pricing", "Question on INV-42") == ["billing"]
+    assert route("pricing", "Urgent, INV-42 is wrong") == ["pager", "slack", "billing"]
+    assert route("pricing", "Discount?") == ["email"]
+    assert route("support", "An outage") == ["pager", "slack"]
+    assert route("support", "Hello") == []
+
+
+def test_handler_fans_out_to_every_routed_channel_in_parallel():
+    """Verify a request routed to two channels is sent to both concurrently."""
+    both_sending = threading.Barrier(2, timeout=5)
+    slack = Mock(spec=NotificationChannel)
+    email = Mock(spec=NotificationChannel)
+    slack.send.side_effect = lambda **kwargs: both_sending.wait()
+    email.send.side_effect = lambda **kwargs: both_sending.wait()
+    router = RoutingTable(
+        [RoutingRule(name="all", topics=("sales",), channels=("slack", "email"))]
+    )
+    handler = HandleAssistanceRequest(
+        channels={"slack": slack, "email": email}, router=router
+    )
+
+    handler.execute(AssistanceRequest(topic="sales", description="Everyone"))
+
+    slack.send.assert_called_once_with(topic="sales", message="Everyone")
+    email.send.assert_called_once_with(topic="sales", message="Everyone")
+
+
+def test_reconfigure_applies_to_later_requests_only():
+    """Verify a request in flight finishes on the channels it started with."""
+    sending = threading.Event()
+    release = threading.Event()
+    old, new = Mock(spec=NotificationChannel), Mock(spec=NotificationChannel)
+    old.send.side_effect = lambda **kwargs: (sending.set(), release.wait(5))
+    handler = HandleAssistanceRequest(channels={"sales": old})
+
+    in_flight = threading.Thread(
+        target=handler.execute,
+        args=(AssistanceRequest(topic="sales", description="Before"),),
+    )
+    in_flight.start()
+    assert sending.wait(5)
+    handler.reconfigure({"sales": new})
+    handler.execute(AssistanceRequest(topic="sales", description="After"))
+    release.set()
+    in_flight.join(5)
+
+    old.send.assert_called_once_with(topic="sales", message="Before")
+    new.send.assert_called_once_with(topic="sales", message="After")
@@ -0,0 +1,69 @@
+"""Compares POST /v1/notify/batch with the same requests sent one by one.
+
+Run from the repository root:
+
+    python -m utils.benchmarks.batch --requests 2000 --batch-size 500
+"""
+
+import argparse
+import json
+import logging
+import time
+
+from app import create_app
+from config import Config
+
+
+class BenchmarkConfig(Config):
+    SLACK_BOT_TOKEN = None
+    DISPATCH_MODE = "queue"
+    DISPATCH_QUEUE_SIZE = 1000000
+
+
+def timed(label: str, total: int, func) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {total / elapsed:>12,.0f} requests/s  ({elapsed:.3f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    logging.disable(logging.INFO)
+    client = app.test_client()
+    items = [
+        {"topic": "pricing", "description": f"Benchmark request {i}"}
+        for i in range(args.batch_size)
+    ]
+    batches = max(1, args.requests // args.batch_size)
+    total = batches * args.batch_size
+    ndjson = "\n".join(json.dumps(item) for item in items)
+
+    def single():
+        for _ in range(batches):
+            for item in items:
+                client.post("/v1/notify", json=item)
+
+    def json_batch():
+        for _ in range(batches):
+            client.post("/v1/notify/batch", json=items)
+
+    def ndjson_batch():
+        for _ in range(batches):
+            client.post(
+                "/v1/notify/batch", data=ndjson, content_type="application/x-ndjson"
+            )
+
+    timed("single posts", total, single)
+    timed("json batch", total, json_batch)
+    timed("ndjson batch", total, ndjson_batch)
+    app.assistance_request_handler.shutdown(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""Load test for /v1/notify and /v1/health with latency percentiles.
+
+Closed loop: ``--concurrency`` clients each send their next request as soon
+as the previous one is answered. Open loop: requests are started at a fixed
+``--rate`` whatever the response times, and latency is measured from the
+time each request was due, so a stalled server cannot hide its backlog.
+
+Without ``--url`` the app is served in-process (threaded werkzeug server)
+with the Slack and email adapters replaced by stubs that sleep for
+``--stub-latency-ms``, so the full HTTP, dispatch and channel path is
+exercised without talking to Slack. Run from the repository root:
+
+    python -m utils.benchmarks.load --mode closed --concurrency 32 --duration 10
+    python -m utils.benchmarks.load --mode open --rate 500 --duration 10
+    python -m utils.benchmarks.load --traffic requests.jsonl --output run.json
+    python -m utils.benchmarks.load --baseline run.json --tolerance 0.1
+
+Results are printed as JSON (or written to ``--output``). With
+``--baseline`` the run fails with exit code 1 if throughput dropped or p99
+latency grew by more than ``--tolerance`` compared to an earlier result.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from unittest.mock import patch
+
+import requests
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.ports.notification import NotificationChannel
+from config import Config
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+PERCENTILES = (("p50", 50.0), ("p95", 95.0), ("p99", 99.0), ("p999", 99.9))
+
+
+class BenchmarkConfig(Config):
+    SLACK_BOT_TOKEN = "stub-token"
+    SLACK_CHANNEL_ID = "stub-channel"
+    # Measure the service, not Slack's pacing; override with --set.
+    SLACK_RATE_LIMIT = 0
+    DISPATCH_MODE = "queue"
+
+
+class StubNotificationChannel(NotificationChannel):
+    """Channel that only waits, standing in for a remote service."""
+
+    def __init__(self, latency: float, jitter: float, error_rate: float):
+        """Initializes the stub.
+
+        Args:
+            latency: Seconds every send takes.
+            jitter: Extra random seconds (0 to jitter) added to each send.
+            error_rate: Fraction of sends that raise ``ConnectionError``.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    def send(self, topic: str, message: str) -> None:
+        """Sleeps for the configured latency, failing at the configured rate."""
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if self.error_rate and random.random() < self.error_rate:
+            raise ConnectionError("Injected stub failure")
+
+
+def load_traffic(path: str, default_topic: str) -> List[Request]:
+    """Reads requests to replay from a JSONL file.
+
+    Each line is either ``{"method", "path", "body"}``, a notification
+    (``{"topic", "description"}``) or any other object, whose
+    ``description``, ``body`` or ``title`` text is sent as a notification
+    for ``default_topic``.
+    """
+    traffic: List[Request] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if "path" in item:
+                traffic.append(
+                    (item.get("method", "GET").upper(), item["path"], item.get("body"))
+                )
+                continue
+            text = item.get("description") or item.get("body") or item.get("title")
+            if not isinstance(text, str):
+                continue
+            body = {"topic": item.get("topic", default_topic), "description": text}
+            traffic.append(("POST", "/v1/notify", body))
+    if not traffic:
+        raise ValueError(f"No replayable requests in {path}")
+    return traffic
+
+
+def synthetic_traffic(size: int, health_ratio: float) -> List[Request]:
+    """Builds a mix of notifications for both topics and health checks."""
+    traffic: List[Request] = []
+    for i in range(size):
+        if random.random() < health_ratio:
+            traffic.append(("GET", "/v1/health", None))
+            continue
+        topic = "sales" if i % 2 else "pricing"
+        body = {"topic": topic, "description": f"Load test request {i}"}
+        traffic.append(("POST", "/v1/notify", body))
+    return traffic
+
+
+class Recorder:
+    """Collects latencies and status codes from all client threads."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, status: str) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] += 1
+
+
+class Client:
+    """Sends requests over one keep-alive session per thread."""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def send(self, request: Request) -> str:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        method, path, body = request
+        try:
+            response = session.request(
+                method, self.base_url + path, json=body, timeout=self.timeout
+            )
+            return str(response.status_code)
+        except requests.RequestException as e:
+            return type(e).__name__
+
+
+def run_closed_loop(
+    client: Client,
+    traffic: Sequence[Request],
+    recorder: Recorder,
+    concurrency: int,
+    duration: float,
+) -> None:
+    deadline = time.perf_counter() + duration
+    counter = itertools.count()
+
+    def worker():
+        while time.perf_counter() < deadline:
+            request = traffic[next(counter) % len(traffic)]
+            start = time.perf_counter()
+            status = client.send(request)
+            recorder.record(time.perf_counter() - start, status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open_loop(
+    client: Client,
+    traffic: Sequence[Request],
+    recorder: Recorder,
+    concurrency: int,
+    duration: float,
+    rate: float,
+) -> None:
+    def one(request: Request, due: float) -> None:
+        status = client.send(request)
+        recorder.record(time.perf_counter() - due, status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(int(rate * duration)):
+            due = start + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, traffic[i % len(traffic)], due)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float, settings: Dict) -> Dict[str, Any]:
+    latencies = sorted(recorder.latencies)
+    total = len(latencies)
+    successes = sum(
+        count for status, count in recorder.statuses.items() if status[0] == "2"
+    )
+    latency_ms = {
+        name: round(percentile(latencies, pct) * 1000, 3) for name, pct in PERCENTILES
+    }
+    latency_ms["max"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+    latency_ms["mean"] = round(sum(latencies) / total * 1000, 3) if total else 0.0
+    return {
+        **settings,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": total,
+        "errors": total - successes,
+        "statuses": dict(recorder.statuses),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": latency_ms,
+    }
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Returns the regressions of ``result`` against ``baseline``."""
+    regressions = []
+    if result["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {result['throughput_rps']} rps < "
+            f"baseline {baseline['throughput_rps']} rps"
+        )
+    p99, baseline_p99 = result["latency_ms"]["p99"], baseline["latency_ms"]["p99"]
+    if p99 > baseline_p99 * (1 + tolerance):
+        regressions.append(f"p99 {p99} ms > baseline {baseline_p99} ms")
+    return regressions
+
+
+def parse_setting(assignment: str) -> Tuple[str, Any]:
+    key, _, raw = assignment.partition("=")
+    try:
+        return key, json.loads(raw)
+    except ValueError:
+        return key, raw
+
+
+def serve_in_process(args) -> Tuple[str, Any]:
+    """Starts the app with stub adapters and returns its URL and server."""
+
+    def stub(*_args, **_kwargs):
+        return StubNotificationChannel(
+            args.stub_latency_ms / 1000,
+            args.stub_jitter_ms / 1000,
+            args.stub_error_rate,
+        )
+
+    overrides = dict(parse_setting(setting) for setting in args.set)
+    config = type("LoadTestConfig", (BenchmarkConfig,), overrides)
+    with patch("app.factories.SlackNotificationAdapter", stub), patch(
+        "app.factories.EmailNotificationAdapter", stub
+    ):
+        app = create_app(config)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server.")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=200.0, help="Open loop rps.")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--traffic", help="JSONL file of requests to replay.")
+    parser.add_argument("--topic", default="pricing", help="Topic for replayed text.")
+    parser.add_argument("--health-ratio", type=float, default=0.0)
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--stub-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Config override for the in-process app, e.g. DISPATCH_MODE=inline.",
+    )
+    parser.add_argument("--output", help="Write the JSON result to this file.")
+    parser.add_argument("--baseline", help="Earlier JSON result to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url
+    else:
+        base_url, server = serve_in_process(args)
+        logging.disable(logging.INFO)
+
+    traffic = (
+        load_traffic(args.traffic, args.topic)
+        if args.traffic
+        else synthetic_traffic(1000, args.health_ratio)
+    )
+    client = Client(base_url, args.timeout)
+    recorder = Recorder()
+
+    start = time.perf_counter()
+    if args.mode == "closed":
+        run_closed_loop(client, traffic, recorder, args.concurrency, args.duration)
+    else:
+        run_open_loop(
+            client, traffic, recorder, args.concurrency, args.duration, args.rate
+        )
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+
+    settings = {
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "rate": args.rate if args.mode == "open" else None,
+        "target": args.url or "in-process",
+        "stub_latency_ms": None if args.url else args.stub_latency_ms,
+    }
+    result = summarize(recorder, elapsed, settings)
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
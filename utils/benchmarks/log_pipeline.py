@@ -0,0 +1,88 @@
+"""Measures the request latency spent on logging in each logging mode.
+
+Requests are delivered inline, so the use case and adapter log lines are
+written inside the request. Logs go to a temporary file; ``--sink-latency-us``
+makes every write block for that long, like a busy disk or a log collector
+applying backpressure. Run from the repository root:
+
+    python -m utils.benchmarks.log_pipeline --requests 5000 --sink-latency-us 100
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+from app import create_app
+from app.logs import configure_logging, flush_logging
+from config import Config
+from utils.benchmarks.load import percentile
+
+MODES = (
+    ("no INFO logs", {"LOG_ASYNC": False, "LOG_LEVEL": "WARNING"}),
+    ("sync text", {"LOG_ASYNC": False, "LOG_FORMAT": "text"}),
+    ("sync json", {"LOG_ASYNC": False, "LOG_FORMAT": "json"}),
+    ("async text", {"LOG_ASYNC": True, "LOG_FORMAT": "text"}),
+    ("async json", {"LOG_ASYNC": True, "LOG_FORMAT": "json"}),
+    (
+        "async json 10%",
+        {"LOG_ASYNC": True, "LOG_FORMAT": "json", "LOG_SAMPLE_RATE": 0.1},
+    ),
+)
+
+
+class SlowSink:
+    """File wrapper whose writes block for a fixed time."""
+
+    def __init__(self, file, latency: float):
+        self.file = file
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+
+class BenchmarkConfig(Config):
+    SLACK_BOT_TOKEN = None
+    DISPATCH_MODE = "inline"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sink-latency-us", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stdout = sys.stdout
+    # The log handlers write to stderr; send it to the file instead.
+    sys.stderr = SlowSink(tempfile.TemporaryFile("w"), args.sink_latency_us / 1e6)
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+    item = {"topic": "pricing", "description": "Benchmark request"}
+
+    print(f"{'mode':<16} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}", file=stdout)
+    for label, settings in MODES:
+        configure_logging({**app.config, **settings})
+        latencies = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client.post("/v1/notify", json=item)
+            latencies.append(time.perf_counter() - start)
+        flush_logging()
+        latencies.sort()
+        mean = sum(latencies) / len(latencies)
+        print(
+            f"{label:<16} {mean * 1e6:>9.1f} "
+            f"{percentile(latencies, 50) * 1e6:>9.1f} "
+            f"{percentile(latencies, 99) * 1e6:>9.1f}",
+            file=stdout,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measures the cost of the durable outbox on POST /v1/notify.
+
+Run from the repository root:
+
+    python -m utils.benchmarks.outbox --requests 5000 --threads 8
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from app import create_app
+from config import Config
+
+
+def build_config(outbox_path):
+    class BenchmarkConfig(Config):
+        SLACK_BOT_TOKEN = None
+        DISPATCH_MODE = "queue"
+        DISPATCH_QUEUE_SIZE = 100000
+        OUTBOX_PATH = outbox_path
+
+    return BenchmarkConfig
+
+
+def run(outbox_path, total: int, threads: int) -> float:
+    app = create_app(build_config(outbox_path))
+    logging.disable(logging.INFO)
+    payload = {"topic": "pricing", "description": "Benchmark request"}
+    per_thread = total // threads
+
+    def submit():
+        client = app.test_client()
+        for _ in range(per_thread):
+            client.post("/v1/notify", json=payload)
+
+    workers = [threading.Thread(target=submit) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    app.assistance_request_handler.shutdown(timeout=60)
+    logging.disable(logging.NOTSET)
+    return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    baseline = run(None, args.requests, args.threads)
+    with tempfile.TemporaryDirectory() as directory:
+        durable = run(os.path.join(directory, "outbox.db"), args.requests, args.threads)
+
+    print(f"without outbox: {baseline:,.0f} requests/s")
+    print(f"with outbox:    {durable:,.0f} requests/s")
+    print(f"cost:           {100 * (1 - durable / baseline):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
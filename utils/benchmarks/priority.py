@@ -0,0 +1,96 @@
+"""Measures how long "sales" requests wait while a "pricing" backlog builds.
+
+A flood of pricing requests is queued faster than the workers can deliver
+them while sales requests arrive at a steady rate. Each scheduler is run in
+turn: ``fifo`` (a single lane, as before priority lanes), ``weighted`` and
+``strict``. Run from the repository root:
+
+    python -m utils.benchmarks.priority --workers 4 --send-ms 5
+"""
+
+import argparse
+import logging
+import threading
+import time
+from typing import Dict, List
+
+from app.domain.models import AssistanceRequest
+from app.use_cases.dispatch import QueuedAssistanceRequestDispatcher
+from app.ports.use_cases import HandleAssistanceRequestBase
+from utils.benchmarks.load import percentile
+
+
+class SlowHandler(HandleAssistanceRequestBase):
+    """Takes ``send_seconds`` per request and records sales latencies."""
+
+    def __init__(self, send_seconds: float):
+        self.send_seconds = send_seconds
+        self.sales_latencies: List[float] = []
+        self.queued_at: Dict[str, float] = {}
+
+    def execute(self, request: AssistanceRequest) -> None:
+        if request.topic == "sales":
+            started = time.perf_counter()
+            self.sales_latencies.append(started - self.queued_at[request.description])
+        time.sleep(self.send_seconds)
+
+
+def run(scheduler: str, args) -> Dict[str, float]:
+    handler = SlowHandler(args.send_ms / 1000)
+    options = {
+        "fifo": {"lane_weights": {"normal": 1}},
+        "weighted": {"topic_priorities": {"sales": "high", "pricing": "low"}},
+        "strict": {
+            "topic_priorities": {"sales": "high", "pricing": "low"},
+            "strict_priority": True,
+        },
+    }[scheduler]
+    dispatcher = QueuedAssistanceRequestDispatcher(
+        handler, workers=args.workers, queue_size=args.backlog * 2, **options
+    )
+    dispatcher.start()
+
+    def flood():
+        for i in range(args.backlog):
+            dispatcher.execute(AssistanceRequest(topic="pricing", description=str(i)))
+
+    flooder = threading.Thread(target=flood)
+    flooder.start()
+    for i in range(args.sales):
+        key = f"s{i}"
+        handler.queued_at[key] = time.perf_counter()
+        dispatcher.execute(AssistanceRequest(topic="sales", description=key))
+        time.sleep(args.sales_interval_ms / 1000)
+    flooder.join()
+    backlog = dispatcher.queue_depth
+    dispatcher.shutdown(timeout=None)
+
+    latencies = sorted(handler.sales_latencies)
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "backlog": backlog,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--send-ms", type=float, default=5.0)
+    parser.add_argument("--backlog", type=int, default=2000)
+    parser.add_argument("--sales", type=int, default=100)
+    parser.add_argument("--sales-interval-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    for scheduler in ("fifo", "weighted", "strict"):
+        result = run(scheduler, args)
+        print(
+            f"{scheduler:<9} sales wait p50 {result['p50_ms']:>9.2f} ms  "
+            f"p99 {result['p99_ms']:>9.2f} ms  "
+            f"(pricing backlog left {result['backlog']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Measures import time, cold start and per-worker memory of the Flask app.
+
+Every measurement runs in a fresh interpreter. ``per-worker app`` forks
+workers that each import and build the app, as Gunicorn does by default;
+``preloaded`` builds it once with ``PREFORK`` and forks workers that only
+start their channels, as ``PREFORK=true gunicorn -c gunicorn.conf.py``
+does. Memory figures are read from ``/proc`` (Linux). Run from the
+repository root:
+
+    python -m utils.benchmarks.startup --runs 5 --workers 4
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from config import Config
+
+
+class BenchmarkConfig(Config):
+    # A configured Slack channel, so its client library is part of startup.
+    SLACK_BOT_TOKEN = "xoxb-benchmark"
+    SLACK_CHANNEL_ID = "C0BENCHMARK"
+    LOG_LEVEL = "WARNING"
+
+
+def memory() -> dict:
+    """Returns the RSS, PSS and USS of this process in MiB."""
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def probe_cold_start(prefork: bool) -> dict:
+    started = time.perf_counter()
+    from app import create_app
+
+    imported = time.perf_counter()
+    settings = type("Settings", (BenchmarkConfig,), {"PREFORK": prefork})
+    app = create_app(settings)
+    created = time.perf_counter()
+    app.test_client().get("/v1/health/")
+    served = time.perf_counter()
+    return {
+        "import": imported - started,
+        "create_app": created - imported,
+        "first_request": served - created,
+        **memory(),
+    }
+
+
+def worker(read_fd: int, write_fd: int, serve) -> None:
+    os.close(read_fd)
+    code = 1
+    try:
+        serve()
+        os.write(write_fd, (json.dumps(memory()) + "\n").encode())
+        code = 0
+    finally:
+        os._exit(code)
+
+
+def probe_workers(preload: bool, workers: int) -> dict:
+    if preload:
+        from app import create_app
+
+        app = create_app(type("Settings", (BenchmarkConfig,), {"PREFORK": True}))
+        gc.freeze()
+
+        def serve():
+            app.start()
+            app.test_client().get("/v1/health/")
+
+    else:
+
+        def serve():
+            from app import create_app
+
+            create_app(BenchmarkConfig).test_client().get("/v1/health/")
+
+    read_fd, write_fd = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            worker(read_fd, write_fd, serve)
+        pids.append(pid)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as reports:
+        samples = [json.loads(line) for line in reports]
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return {
+        key: statistics.mean(sample[key] for sample in samples)
+        for key in ("rss", "pss", "uss")
+        if samples and key in samples[0]
+    }
+
+
+def run(args, probe: str) -> dict:
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "utils.benchmarks.startup", "--probe", probe]
+            + ["--workers", str(args.workers)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--probe", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probes = {
+            "eager": lambda: probe_cold_start(prefork=False),
+            "prefork": lambda: probe_cold_start(prefork=True),
+            "per-worker": lambda: probe_workers(False, args.workers),
+            "preloaded": lambda: probe_workers(True, args.workers),
+        }
+        print(json.dumps(probes[args.probe]()))
+        return
+
+    print(f"Cold start, median of {args.runs} runs:")
+    for label, probe in (("eager", "eager"), ("PREFORK", "prefork")):
+        result = run(args, probe)
+        print(
+            f"  {label:<8} import {result['import'] * 1000:6.1f}ms"
+            f"  create_app {result['create_app'] * 1000:6.1f}ms"
+            f"  first request {result['first_request'] * 1000:6.1f}ms"
+            f"  RSS {result.get('rss', 0):5.1f}MiB"
+        )
+    print(f"Memory per worker ({args.workers} workers), median of {args.runs} runs:")
+    for label, probe in (("per-worker app", "per-worker"), ("preloaded", "preloaded")):
+        result = run(args, probe)
+        print(
+            f"  {label:<15} RSS {result.get('rss', 0):5.1f}MiB"
+            f"  PSS {result.get('pss', 0):5.1f}MiB"
+            f"  USS {result.get('uss', 0):5.1f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
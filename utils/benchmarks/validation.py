@@ -0,0 +1,66 @@
+"""Compares the marshmallow and compiled paths of a /v1/notify request body.
+
+Each path parses a JSON body, validates it and serializes the 202 body:
+marshmallow with ``json`` and ``schema.load``/``schema.dumps``, the other
+with ``CompiledSchema``, ``validation.loads`` (orjson when installed) and
+the prebuilt response bytes. Run from the repository root:
+
+    python -m utils.benchmarks.validation --requests 200000
+"""
+
+import argparse
+import json
+import logging
+import time
+
+from app.api.notify import _accepted_json
+from app.api.schemas.schemas import AssistanceRequestSchema, NotificationResponseSchema
+from app.api.validation import CompiledSchema, loads
+
+
+def timed(label: str, total: int, func) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<12} {total / elapsed:>12,.0f} requests/s  "
+        f"({elapsed / total * 1e6:.2f}us per request)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    schema = AssistanceRequestSchema(topics=["sales", "pricing"])
+    response_schema = NotificationResponseSchema()
+    compiled = CompiledSchema(schema)
+    bodies = [
+        json.dumps({"topic": "sales", "description": f"Benchmark request {i}"}).encode()
+        for i in range(1000)
+    ]
+    request_id = "0f3a9c21-1b"
+
+    def marshmallow():
+        for i in range(args.requests):
+            schema.load(json.loads(bodies[i % 1000]))
+            response_schema.dumps(
+                {
+                    "message": "Request received and processing.",
+                    "request_id": request_id,
+                }
+            ).encode()
+
+    def fast_path():
+        for i in range(args.requests):
+            compiled.load(loads(bodies[i % 1000]))
+            _accepted_json(request_id)
+
+    timed("marshmallow", args.requests, marshmallow)
+    timed("compiled", args.requests, fast_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measures webhook sends per second against a local stub endpoint.
+
+Compares a new connection per message (plain ``requests.post``), the
+pooled keep-alive adapter, and the adapter posting batches of
+``--batch-size`` messages. Run from the repository root:
+
+    python -m utils.benchmarks.webhook --messages 2000 --concurrency 8
+"""
+
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.adapters.webhook import WebhookNotificationAdapter, WebhookPool
+
+
+class StubEndpoint(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def timed(label: str, calls: int, per_call: int, concurrency: int, send) -> None:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(calls)))
+    elapsed = time.perf_counter() - start
+    messages = calls * per_call
+    print(f"{label:<22} {messages / elapsed:>10,.0f} messages/s  ({elapsed:.3f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubEndpoint)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/hook"
+
+    timed(
+        "connection per message",
+        args.messages,
+        1,
+        args.concurrency,
+        lambda i: requests.post(
+            url, json={"topic": "sales", "message": f"Message {i}"}, timeout=5
+        ),
+    )
+
+    adapter = WebhookNotificationAdapter(
+        url,
+        WebhookPool(max_per_host=args.concurrency),
+        secret="benchmark",
+        batch_size=args.batch_size,
+    )
+    timed(
+        "pooled keep-alive",
+        args.messages,
+        1,
+        args.concurrency,
+        lambda i: adapter.send(topic="sales", message=f"Message {i}"),
+    )
+    timed(
+        f"batches of {args.batch_size}",
+        args.messages // args.batch_size,
+        args.batch_size,
+        args.concurrency,
+        lambda i: adapter.send_batch(
+            topic="sales",
+            messages=[f"Message {i}.{j}" for j in range(args.batch_size)],
+        ),
+    )
+    adapter.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
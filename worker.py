@@ -0,0 +1,73 @@
+import logging
+import os
+import signal
+
+from flask import Config as Settings
+
+from app.adapters.dead_letter import InMemoryDeadLetterStore
+from app.logs import configure_logging
+from app.reload import ConfigWatcher, RoutingReloader
+from app.factories import (
+    build_message_broker,
+    build_notification_channels,
+    build_router,
+    close_notification_channels,
+)
+from app.use_cases.handle_request import HandleAssistanceRequest
+from config import config
+
+logger = logging.getLogger("worker")
+
+
+def main():
+    settings = Settings(os.path.dirname(os.path.abspath(__file__)))
+    settings.from_object(config[os.getenv("FLASK_CONFIG") or "default"])
+    configure_logging(settings)
+
+    dead_letters = InMemoryDeadLetterStore(settings["DEAD_LETTER_MAX_ENTRIES"])
+    channels = build_notification_channels(settings, dead_letters)
+    handler = HandleAssistanceRequest(
+        channels,
+        router=build_router(settings),
+        fan_out_workers=settings["ROUTING_FAN_OUT_WORKERS"],
+    )
+    broker = build_message_broker(settings)
+
+    watcher = None
+    if settings.get("CONFIG_RELOAD_PATH"):
+        reloader = RoutingReloader(
+            handler,
+            settings,
+            dead_letters,
+            drain_seconds=settings["CONFIG_RELOAD_DRAIN_SECONDS"],
+        )
+        watcher = ConfigWatcher(
+            settings["CONFIG_RELOAD_PATH"],
+            reloader.apply,
+            settings["CONFIG_RELOAD_INTERVAL"],
+        )
+        watcher.start()
+        watcher.install_signal_handler()
+
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping consumer")
+        broker.stop()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    try:
+        broker.consume(
+            handler.execute,
+            prefetch_count=settings["BROKER_PREFETCH"],
+            ack_batch_size=settings["BROKER_ACK_BATCH_SIZE"],
+        )
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        broker.close()
+        close_notification_channels(handler.channels)
+
+
+if __name__ == "__main__":
+    main()